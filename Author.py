@@ -1,24 +1,36 @@
 # -*- coding: utf-8 -*-
 
+from array import array
+
 class Author:
     
-    def __init__(self, name):
+    def __init__(self, name, documents=None):
         self.name = name          
         self.ndoc = 0             # Nombre de documents publiés
-        self.production = {}      # Dictionnaire des documents (id -> objet Document)
+        # ids des documents publiés ; les documents sont lus dans documents (id2doc du corpus),
+        # ou gardés par l'auteur lui-même s'il n'est rattaché à aucun corpus
+        self.doc_ids = array("q")
+        self._documents = {} if documents is None else documents
+        self._garder_documents = documents is None
     
     def __str__(self):
         return self.name          # Affiche uniquement le nom
     
+    @property
+    def production(self): # Dictionnaire des documents (id -> objet Document)
+        return {cle: self._documents[cle] for cle in self.doc_ids}
+    
     def add(self, cle, document):
         # Ajoute un document à la production et incrémente le compteur
-        self.production[cle] = document
+        self.doc_ids.append(cle)
+        if self._garder_documents:
+            self._documents[cle] = document
         self.ndoc += 1
         
     def tailleMoy(self): # Calcule la taille moyenne des textes de l’auteur
-        if len(self.production) == 0:
+        if len(self.doc_ids) == 0:
             return 0
         s = 0
-        for e in self.production.values():
-            s += len(e.texte)
-        return s / len(self.production)
\ No newline at end of file
+        for cle in self.doc_ids:
+            s += len(self._documents[cle].texte)
+        return s / len(self.doc_ids)
\ No newline at end of file
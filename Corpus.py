@@ -2,8 +2,18 @@
 
 from Document import Document
 from Author import Author
+from StockDocuments import StockDocuments
+from Segment import lister_segments, ajouter_segment, compacter
+from Deduplication import Deduplicateur, Doublon
 from DocumentFactory import DocumentFactory
+from Instrumentation import instrumentation
+from datetime import datetime
 import pandas as pd
+import numpy as np
+import bisect
+import csv
+import math
+import os
 import re
 
 # --- Stopwords EN (petite liste, facile à étendre) ---
@@ -18,43 +28,152 @@ STOPWORDS_EN = {
     "can","could","should","would","will","just"
 }
 
-class Corpus:
-    _instance = None # Variable de classe pour le singleton
-    
-    def __new__(cls, nom):
-        if cls._instance is None:
-            cls._instance = super(Corpus, cls).__new__(cls)
-            cls._instance.nom = nom
-            cls._instance.authors = {} # dictionnaire nom_auteur -> Author
-            cls._instance.id2doc = {} # dictionnaire id_doc -> Document
-            cls._instance.ndoc = 0
-            cls._instance.naut = 0
-            cls._instance._texte_total = None # cache du texte combiné de tout le corpus
-            cls._instance._vocabulaire = None 
-            cls._instance._freq = None
-            cls._instance.stopwords_enabled = False
-            cls._instance.stopwords = STOPWORDS_EN
-        return cls._instance
+# --- Nettoyage : expressions précompilées ---
+_RE_NON_MOT = re.compile(r'[^\w\s]') # ponctuation -> espace
+_RE_CHIFFRES = re.compile(r'\d+') # chiffres supprimés
+
+# Texte ASCII : une seule passe str.translate (chiffres supprimés, ponctuation -> espace)
+def _table_ascii():
+    table = {}
+    for c in range(128):
+        car = chr(c)
+        if car.isdigit():
+            table[c] = None
+        elif not (car.isalnum() or car == "_" or car.isspace()):
+            table[c] = " "
+    return str.maketrans(table)
+
+_TABLE_ASCII = _table_ascii()
+
+def tokeniser_texte(texte, stopwords=None):
+    """Nettoie un texte en une passe et retourne la liste de ses mots (sans les stopwords donnés)"""
+    texte = texte.lower()
+    if texte.isascii():
+        mots = texte.translate(_TABLE_ASCII).split()
+    else:
+        mots = _RE_CHIFFRES.sub('', _RE_NON_MOT.sub(' ', texte)).split()
     
+    if stopwords:
+        mots = [w for w in mots if w not in stopwords]
+    
+    return mots
+
+def _valeur_tsv(valeur):
+    # valeur manquante (None / NaN) -> champ vide, comme pandas.to_csv
+    if valeur is None or (isinstance(valeur, float) and math.isnan(valeur)):
+        return ""
+    return valeur
+
+class Corpus:
+    # instances indépendantes : chaque corpus (ou shard d'un MoteurDistribue) a ses documents et ses caches
     def __init__(self, nom):
-        pass # __init__ ne fait rien car tout est déjà initialisé dans __new__
+        self.nom = nom
+        self.authors = {} # dictionnaire nom_auteur -> Author
+        self.id2doc = StockDocuments() # id_doc -> Document (colonnes compactes, vues à la lecture)
+        self.ndoc = 0
+        self.version = 0 # incrémenté à chaque modification (ajout, liste de stopwords)
+        self.naut = 0
+        # détection des quasi-doublons à l'ajout (désactivée par défaut, voir set_deduplication)
+        self.deduplicateur = None
+        self.mode_doublons = None # "supprimer" ou "regrouper"
+        self.doublons = {} # id canonique -> quasi-doublons regroupés (Doublon)
+        self.nb_doublons = 0
+        self._vocabulaire = None 
+        self._freq = None
+        self._freq_termes = None # (fréquence totale, fréquence par document) de chaque terme
+        # réglage par défaut des requêtes et des stats : les stopwords sont toujours tokenisés et indexés
+        self.stopwords_enabled = False
+        self.stopwords = frozenset(STOPWORDS_EN) # remplacée (jamais modifiée) par set_liste_stopwords
+        # cache de tokenisation partagé avec le SearchEngine (tous les mots, stopwords compris)
+        self._termes = [] # id_terme -> mot
+        self._terme2id = {} # mot -> id_terme
+        self._tokens = {} # id_doc -> tableau des id_terme du document
+        self._generation_tokens = 0 # incrémenté à chaque invalidation du cache
+        # postings terme -> documents (pour search / concorde), triés par terme puis document
+        self._postings_termes = np.array([], dtype=np.int32)
+        self._postings_docs = np.array([], dtype=np.int64)
+        self._nb_docs_postings = 0
+        # termes triés, termes retournés triés et termes joints par "\n" (termes d'une expression de
+        # concordance), complétés à la demande avec les nouveaux termes
+        self._termes_tries = []
+        self._termes_retournes = []
+        self._termes_joints = "\n"
+        self._nb_termes_tries = 0
+        
+    def add(self, doc): # Ajoute un document au corpus ; retourne son id (ou celui de son canonique)
+        if self.deduplicateur is not None:
+            return self.add_documents([doc])[0]
+        return self._ajouter(doc)
+    
+    def add_documents(self, docs):
+        """Ajoute des documents par lot (signatures MinHash calculées ensemble) ; retourne leurs ids"""
+        docs = list(docs)
+        if self.deduplicateur is None:
+            return [self._ajouter(doc) for doc in docs]
         
-    def add(self, doc): # Ajoute un document au corpus
+        with instrumentation.etape("corpus.deduplication"):
+            mots = [tokeniser_texte(doc.texte if isinstance(doc.texte, str) else "") for doc in docs]
+            signatures = self.deduplicateur.signatures(mots)
+            cles = self.deduplicateur.cles_bandes(signatures)
+        ids = []
+        for doc, mots_doc, signature, cles_doc in zip(docs, mots, signatures, cles):
+            canonique = self.deduplicateur.chercher(signature, cles_doc)
+            if canonique is None:
+                cle = self._ajouter(doc)
+                self.deduplicateur.indexer(cle, signature, cles_doc)
+                # mots déjà découpés : mis dans le cache de tokens
+                self._tokens[cle] = self._ids_termes(mots_doc)
+                instrumentation.compter("corpus.documents_tokenises")
+            else:
+                # quasi-doublon : jamais indexé, supprimé ou rattaché à son document canonique
+                cle = canonique
+                self.nb_doublons += 1
+                instrumentation.compter("corpus.doublons")
+                if self.mode_doublons == "regrouper":
+                    self.doublons.setdefault(canonique, []).append(
+                        Doublon(doc.titre, doc.auteur, doc.date, doc.url, doc.getType()))
+            ids.append(cle)
+        return ids
+    
+    def set_deduplication(self, mode="regrouper", **options):
+        """Détection des quasi-doublons à l'ajout : "supprimer" les ignore, "regrouper" les rattache à leur
+        document canonique (Corpus.doublons), None la désactive ; options : voir Deduplicateur. Les documents
+        déjà présents sont indexés (sans être dédoublonnés entre eux)"""
+        if mode not in (None, "supprimer", "regrouper"):
+            raise ValueError(f"mode de déduplication inconnu : {mode}")
+        self.mode_doublons = mode
+        self.deduplicateur = None if mode is None else Deduplicateur(**options)
+        if self.deduplicateur is not None:
+            self._indexer_doublons(range(len(self.id2doc)))
+    
+    def _indexer_doublons(self, doc_ids, taille_lot=10000):
+        # signatures des documents donnés, ajoutées par lots à l'index de déduplication
+        with instrumentation.etape("corpus.deduplication"):
+            for debut in range(0, len(doc_ids), taille_lot):
+                lot = doc_ids[debut:debut + taille_lot]
+                signatures = self.deduplicateur.signatures([tokeniser_texte(self.id2doc[i].texte) for i in lot])
+                for doc_id, signature, cles in zip(lot, signatures, self.deduplicateur.cles_bandes(signatures)):
+                    self.deduplicateur.indexer(doc_id, signature, cles)
+    
+    def _ajouter(self, doc):
         cle = self.ndoc
         self.id2doc[cle] = doc
         self.ndoc += 1
         # Ajouter l'auteur si il n'existe pas encore
         auteur_nom = doc.auteur
         if auteur_nom not in self.authors:
-            self.authors[auteur_nom] = Author(auteur_nom)
+            self.authors[auteur_nom] = Author(auteur_nom, self.id2doc)
             self.naut += 1
         
         self.authors[auteur_nom].add(cle, doc)
         
-        # Réinitialiser les caches
-        self._texte_total = None
+        self.version += 1
+        
+        # Réinitialiser les caches (le cache de tokens et les postings restent valides : le nouveau
+        # document sera tokenisé et indexé à la première demande)
         self._vocabulaire = None
         self._freq = None
+        self._freq_termes = None
         
         return cle
     
@@ -62,7 +181,7 @@ class Corpus:
         docs_list = list(self.id2doc.values())
         
         if tri == "date":
-            docs_list.sort(key=lambda x: x.date)
+            docs_list.sort(key=lambda x: (x.date is None, x.date or datetime.min)) # dates absentes à la fin
         elif tri == "titre":
             docs_list.sort(key=lambda x: x.titre)
         
@@ -90,115 +209,335 @@ class Corpus:
             data.append(row)
         return pd.DataFrame(data)
     
-    def save(self, filename):
-        df = self.to_dataframe()
-        df.to_csv(filename, sep="\t", index=False)
+    # colonnes du fichier TSV (même ordre que to_dataframe)
+    COLONNES_TSV = ["id", "titre", "auteur", "date", "url", "texte", "type"]
+    
+    def save(self, filename, depuis=0):
+        """Sauvegarde le corpus en TSV, document par document (sans DataFrame intermédiaire) ; avec depuis > 0,
+        ajoute seulement les documents d'id >= depuis à la fin d'un fichier qui contient déjà les précédents"""
+        mode = "a" if depuis else "w"
+        with instrumentation.etape("corpus.save"), open(filename, mode, encoding="utf-8", newline="") as f:
+            debut = f.tell()
+            writer = csv.writer(f, delimiter="\t", lineterminator=os.linesep)
+            if not depuis:
+                writer.writerow(self.COLONNES_TSV)
+            for doc_id in range(depuis, len(self.id2doc)):
+                doc = self.id2doc[doc_id]
+                writer.writerow([_valeur_tsv(v) for v in (
+                    doc_id, doc.titre, doc.auteur, doc.date, doc.url, doc.texte, doc.getType()
+                )])
+            instrumentation.compter("corpus.octets_ecrits", f.tell() - debut)
+    
+    @staticmethod
+    def iter_tsv(filename, chunksize=10000):
+        """Lit un fichier TSV par blocs et produit les documents un par un"""
+        # dtype=str : chaque bloc est lu comme le fichier entier (pas d'inférence de type par bloc)
+        for bloc in pd.read_csv(filename, sep="\t", dtype=str, chunksize=chunksize):
+            a_type = 'type' in bloc.columns
+            a_url = 'url' in bloc.columns
+            for row in bloc.itertuples(index=False):
+                yield DocumentFactory.create_document(
+                    doc_type=(row.type if a_type else 'document').lower(),
+                    titre=row.titre,
+                    auteur=row.auteur,
+                    date=row.date,
+                    url=row.url if a_url else '',
+                    texte=row.texte
+                )
     
     @classmethod
-    def load(cls, filename, nom="Corpus chargé"):
-        """Charge un corpus depuis un fichier TSV et retourne un objet Corpus"""
-        df = pd.read_csv(filename, sep="\t")
+    def load(cls, filename, nom="Corpus chargé", chunksize=10000):
+        """Charge un corpus depuis un fichier TSV (lecture par blocs) et retourne un objet Corpus"""
         corpus = cls(nom)
-        for _, row in df.iterrows():
-            doc = DocumentFactory.create_document(
-                doc_type=row.get('type', 'document').lower(),
-                titre=row['titre'],
-                auteur=row['auteur'],
-                date=row['date'],
-                url=row.get('url', ''),
-                texte=row['texte']
-            )
-            corpus.add(doc)
+        with instrumentation.etape("corpus.load"):
+            lot = []
+            for doc in cls.iter_tsv(filename, chunksize):
+                lot.append(doc)
+                if len(lot) == chunksize:
+                    corpus.add_documents(lot)
+                    lot = []
+            corpus.add_documents(lot)
+        instrumentation.compter("corpus.octets_lus", os.path.getsize(filename))
         return corpus
     
-    def _construire_texte_total(self): # Concatène tous les textes des documents
-        if self._texte_total is None:
-            self._texte_total = " ".join([doc.texte for doc in self.id2doc.values()])
-        return self._texte_total
+    # --- Segments binaires (voir Segment.py) ---
     
-    def search(self, mot_clef): # Recherche des passages contenant le mot-clé et renvoie les extraits
-        texte_total = self._construire_texte_total()
-        passages = re.findall(r'.{0,50}' + re.escape(mot_clef) + r'.{0,50}', texte_total, re.IGNORECASE)
-        return passages
+    def save_segment(self, dossier):
+        """Écrit dans un nouveau segment du dossier les documents qui n'y sont pas encore (les segments déjà
+        écrits ne sont pas réécrits) ; retourne son chemin, None s'il n'y a rien de nouveau"""
+        with instrumentation.etape("corpus.save_segment"):
+            chemin = ajouter_segment(dossier, self.id2doc)
+        if chemin is not None:
+            instrumentation.compter("corpus.octets_ecrits", os.path.getsize(chemin))
+        return chemin
     
-    def concorde(self, expression, taille_contexte=30):
-        texte_total = self._construire_texte_total()
-        
-        pattern = r'(.{0,' + str(taille_contexte) + r'})(' + re.escape(expression) + r')(.{0,' + str(taille_contexte) + r'})'
-        matches = re.finditer(pattern, texte_total, re.IGNORECASE)
-        
-        resultats = []
-        for match in matches:
-            contexte_gauche = match.group(1)
-            motif_trouve = match.group(2)
-            contexte_droit = match.group(3)
-            resultats.append({
-                'contexte gauche': contexte_gauche,
-                'motif trouvé': motif_trouve,
-                'contexte droit': contexte_droit
-            })
+    @classmethod
+    def load_segment(cls, dossier, nom="Corpus chargé"):
+        """Charge un corpus depuis les segments d'un dossier : fichiers ouverts avec mmap, colonnes fixes
+        copiées, titres, urls et textes décodés seulement quand un document est lu"""
+        corpus = cls(nom)
+        with instrumentation.etape("corpus.load_segment"):
+            for segment in lister_segments(dossier):
+                premier = corpus.id2doc.ajouter_segment(segment)
+                # auteurs des nouveaux documents (ids du stock -> objets Author)
+                auteurs = corpus.id2doc.colonne("auteurs", range(premier, len(corpus.id2doc)))
+                for cle, id_auteur in enumerate(auteurs.tolist(), premier):
+                    auteur_nom = corpus.id2doc.noms_auteurs[id_auteur]
+                    if auteur_nom not in corpus.authors:
+                        corpus.authors[auteur_nom] = Author(auteur_nom, corpus.id2doc)
+                        corpus.naut += 1
+                    corpus.authors[auteur_nom].add(cle, None)
+                if corpus.deduplicateur is not None:
+                    corpus._indexer_doublons(range(premier, len(corpus.id2doc)))
+                instrumentation.compter("corpus.octets_lus", os.path.getsize(segment.chemin))
+        corpus.ndoc = len(corpus.id2doc)
+        corpus.version += 1
+        corpus._vocabulaire = None
+        corpus._freq = None
+        corpus._freq_termes = None
+        return corpus
+    
+    @staticmethod
+    def compacter_segments(dossier):
+        """Fusionne les segments d'un dossier en un seul ; retourne son chemin"""
+        with instrumentation.etape("corpus.compacter_segments"):
+            return compacter(dossier)
+    
+    def _mettre_a_jour_postings(self):
+        # ajoute aux postings les couples (terme, document) des documents pas encore indexés
+        doc_ids = list(self.id2doc.keys())[self._nb_docs_postings:]
+        if not doc_ids:
+            return
+        uniques = [np.unique(t) for t in self.tokens_documents(doc_ids)]
+        termes = np.concatenate(uniques).astype(np.int32)
+        docs = np.repeat(np.array(doc_ids, dtype=np.int64), [len(u) for u in uniques])
+        # seuls les nouveaux postings sont triés (tri stable : documents croissants pour un même terme), puis
+        # fusionnés : leurs documents sont plus récents, donc placés après ceux du même terme
+        ordre = np.argsort(termes, kind="stable")
+        termes, docs = termes[ordre], docs[ordre]
+        positions = np.searchsorted(self._postings_termes, termes, side="right")
+        self._postings_termes = np.insert(self._postings_termes, positions, termes)
+        self._postings_docs = np.insert(self._postings_docs, positions, docs)
+        self._nb_docs_postings += len(doc_ids)
+    
+    def _mettre_a_jour_termes_tries(self):
+        # ajoute les nouveaux termes aux tables triées (tout est retrié s'ils sont plus nombreux que les anciens)
+        nouveaux = self._termes[self._nb_termes_tries:]
+        if not nouveaux:
+            return
+        if len(nouveaux) > len(self._termes_tries):
+            self._termes_tries = sorted(self._termes)
+            self._termes_retournes = sorted(terme[::-1] for terme in self._termes)
+        else:
+            for terme in nouveaux:
+                bisect.insort(self._termes_tries, terme)
+                bisect.insort(self._termes_retournes, terme[::-1])
+        self._termes_joints += "\n".join(nouveaux) + "\n"
+        self._nb_termes_tries = len(self._termes)
+    
+    @staticmethod
+    def _tranche_prefixe(tries, debut):
+        # termes d'une liste triée qui commencent par debut (deux recherches dichotomiques)
+        return tries[bisect.bisect_left(tries, debut):bisect.bisect_left(tries, debut + "\U0010ffff")]
+    
+    def _termes_possibles(self, mot, debut_libre, fin_libre):
+        """Ids des termes où peut tomber un mot de l'expression : le premier peut commencer au milieu d'un
+        terme (terme finissant par le mot), le dernier s'y arrêter (terme commençant par le mot), un mot seul
+        être n'importe où dans un terme ; les autres sont des termes entiers"""
+        if debut_libre and fin_libre:
+            ids, joints = [], self._termes_joints
+            position = joints.find(mot)
+            while position >= 0:
+                fin = joints.find("\n", position)
+                ids.append(self._terme2id[joints[joints.rfind("\n", 0, position) + 1:fin]])
+                position = joints.find(mot, fin)
+        elif debut_libre:
+            ids = [self._terme2id[t[::-1]] for t in self._tranche_prefixe(self._termes_retournes, mot[::-1])]
+        elif fin_libre:
+            ids = [self._terme2id[t] for t in self._tranche_prefixe(self._termes_tries, mot)]
+        else:
+            ids = [self._terme2id[mot]] if mot in self._terme2id else []
+        return np.array(ids, dtype=np.int32)
+    
+    def _documents_candidats(self, expression):
+        """Documents pouvant contenir l'expression (sur-ensemble trié), ou None s'il faut tout parcourir"""
+        with instrumentation.etape("corpus.postings"):
+            self._mettre_a_jour_postings()
+            self._mettre_a_jour_termes_tries()
+        candidats = None
+        mots = tokeniser_texte(expression)
+        for rang, mot in enumerate(mots):
+            # l'expression peut commencer ou finir au milieu d'un mot
+            termes = self._termes_possibles(mot, rang == 0, rang == len(mots) - 1)
+            debuts = np.searchsorted(self._postings_termes, termes, side="left")
+            fins = np.searchsorted(self._postings_termes, termes, side="right")
+            docs = np.unique(np.concatenate([self._postings_docs[d:f] for d, f in zip(debuts, fins)]
+                                            + [np.array([], dtype=np.int64)]))
+            candidats = docs if candidats is None else np.intersect1d(candidats, docs, assume_unique=True)
+            if len(candidats) == 0:
+                break
+        return candidats
+    
+    def _iter_occurrences(self, expression, limite=None):
+        # (doc_id, texte, début, fin) de chaque occurrence, document par document
+        if limite is not None and limite <= 0:
+            return
+        motif = re.compile(re.escape(expression), re.IGNORECASE)
+        candidats = self._documents_candidats(expression)
+        doc_ids = self.id2doc.keys() if candidats is None else candidats.tolist()
         
-        return pd.DataFrame(resultats)
+        nb = 0
+        for doc_id in doc_ids:
+            texte = self.id2doc[doc_id].texte
+            for match in motif.finditer(texte):
+                yield doc_id, texte, match.start(), match.end()
+                nb += 1
+                if limite is not None and nb >= limite:
+                    return
     
-    def nettoyer_texte(self, texte, remove_stopwords=None):
-        texte = texte.lower()
-        texte = texte.replace('\n', ' ')
-        texte = re.sub(r'[^\w\s]', ' ', texte)
-        texte = re.sub(r'\d+', '', texte)
-        texte = re.sub(r'\s+', ' ', texte)
-
+    @staticmethod
+    def _contexte(texte, debut, fin, taille_contexte):
+        # bornes du contexte : taille_contexte caractères, sans dépasser la ligne ni le document
+        gauche = max(debut - taille_contexte, texte.rfind("\n", 0, debut) + 1)
+        fin_ligne = texte.find("\n", fin)
+        droite = min(fin + taille_contexte, len(texte) if fin_ligne == -1 else fin_ligne)
+        return gauche, droite
+    
+    def iter_search(self, mot_clef, limite=None, taille_contexte=50):
+        """Générateur (doc_id, passage) des passages contenant le mot-clé"""
+        for doc_id, texte, debut, fin in self._iter_occurrences(mot_clef, limite):
+            gauche, droite = self._contexte(texte, debut, fin, taille_contexte)
+            yield doc_id, texte[gauche:droite]
+    
+    def search(self, mot_clef, limite=None): # Recherche des passages contenant le mot-clé et renvoie les extraits
+        with instrumentation.etape("corpus.search"):
+            return [passage for _, passage in self.iter_search(mot_clef, limite)]
+    
+    def iter_concorde(self, expression, taille_contexte=30, limite=None):
+        """Générateur (doc_id, contexte gauche, motif trouvé, contexte droit) des occurrences de l'expression"""
+        for doc_id, texte, debut, fin in self._iter_occurrences(expression, limite):
+            gauche, droite = self._contexte(texte, debut, fin, taille_contexte)
+            yield doc_id, texte[gauche:debut], texte[debut:fin], texte[fin:droite]
+    
+    def concorde(self, expression, taille_contexte=30, limite=None):
+        with instrumentation.etape("corpus.concorde"):
+            resultats = []
+            for doc_id, contexte_gauche, motif_trouve, contexte_droit in self.iter_concorde(expression, taille_contexte, limite):
+                resultats.append({
+                    'doc_id': doc_id,
+                    'contexte gauche': contexte_gauche,
+                    'motif trouvé': motif_trouve,
+                    'contexte droit': contexte_droit
+                })
+            
+            return pd.DataFrame(resultats, columns=['doc_id', 'contexte gauche', 'motif trouvé', 'contexte droit'])
+    
+    def tokeniser(self, texte, remove_stopwords=None):
+        """Nettoie un texte en une passe et retourne la liste de ses mots"""
         # Stopwords (optionnel)
         if remove_stopwords is None:
             remove_stopwords = self.stopwords_enabled
-
-        if remove_stopwords:
-            tokens = [w for w in texte.split() if w not in self.stopwords]
-            texte = " ".join(tokens)
-
-        return texte.strip()
+        
+        return tokeniser_texte(texte, self.stopwords if remove_stopwords else None)
+    
+    def nettoyer_texte(self, texte, remove_stopwords=None):
+        return " ".join(self.tokeniser(texte, remove_stopwords))
+    
+    def tokens_document(self, doc_id):
+        """Tableau des ids de termes d'un document (tokenisé une seule fois puis mis en cache)"""
+        tokens = self._tokens.get(doc_id)
+        if tokens is None:
+            tokens = self._tokens[doc_id] = self._ids_termes(tokeniser_texte(self.id2doc[doc_id].texte))
+            instrumentation.compter("corpus.documents_tokenises")
+        return tokens
+    
+    def _ids_termes(self, mots):
+        # mots -> tableau des ids de termes (les nouveaux termes sont ajoutés à la table)
+        ids = []
+        for mot in mots:
+            terme_id = self._terme2id.get(mot)
+            if terme_id is None:
+                terme_id = len(self._termes)
+                self._terme2id[mot] = terme_id
+                self._termes.append(mot)
+            ids.append(terme_id)
+        return np.array(ids, dtype=np.int32)
+    
+    def tokens_documents(self, doc_ids=None):
+        """Liste des tableaux de tokens des documents demandés (tous par défaut)"""
+        if doc_ids is None:
+            doc_ids = self.id2doc.keys()
+        return [self.tokens_document(doc_id) for doc_id in doc_ids]
+    
+    def _integrer_tokens(self, doc_ids, termes_locaux, ids_locaux, longueurs):
+        """Ajoute au cache des tokens calculés ailleurs (ids locaux) ; retourne la table id local -> id de terme"""
+        remap = np.empty(len(termes_locaux), dtype=np.int32)
+        for i, mot in enumerate(termes_locaux):
+            terme_id = self._terme2id.get(mot)
+            if terme_id is None:
+                terme_id = len(self._termes)
+                self._terme2id[mot] = terme_id
+                self._termes.append(mot)
+            remap[i] = terme_id
+        
+        ids = remap[ids_locaux]
+        instrumentation.compter("corpus.documents_tokenises", len(longueurs))
+        fins = np.cumsum(longueurs).tolist()
+        debuts = [0] + fins[:-1]
+        for doc_id, debut, fin in zip(doc_ids, debuts, fins):
+            self._tokens[doc_id] = ids[debut:fin]
+        return remap
+    
+    def _invalider_tokens(self):
+        self._termes = []
+        self._terme2id = {}
+        self._tokens = {}
+        self._freq_termes = None
+        self._generation_tokens += 1
+        self._postings_termes = np.array([], dtype=np.int32)
+        self._postings_docs = np.array([], dtype=np.int64)
+        self._nb_docs_postings = 0
+        self._termes_tries = []
+        self._termes_retournes = []
+        self._termes_joints = "\n"
+        self._nb_termes_tries = 0
+    
+    def _frequences_termes(self):
+        # fréquences de tous les termes (stopwords compris), calculées une fois pour les deux réglages
+        if self._freq_termes is None:
+            tokens = self.tokens_documents()
+            nb_termes = len(self._termes)
+            tous = np.concatenate(tokens) if tokens else np.array([], dtype=np.int32)
+            
+            # fréquence totale dans le corpus
+            freq = np.bincount(tous, minlength=nb_termes)
+            # fréquence par document : couples (document, terme) distincts
+            num_doc = np.repeat(np.arange(len(tokens), dtype=np.int64), [len(t) for t in tokens])
+            couples = np.unique(num_doc * nb_termes + tous)
+            doc_freq = np.bincount(couples % max(nb_termes, 1), minlength=nb_termes)
+            self._freq_termes = (freq, doc_freq)
+        return self._freq_termes
     
     def _construire_vocabulaire_et_freq(self):
         if self._vocabulaire is not None and self._freq is not None:
             return
         
-        freq_dict = {}
-        doc_freq_dict = {}
-        vocabulaire = set()
+        freq, doc_freq = self._frequences_termes()
+        presents = freq > 0
+        if self.stopwords_enabled:
+            # réglage stopwords : simple sous-ensemble des tableaux de fréquences
+            presents &= ~np.fromiter((terme in self.stopwords for terme in self._termes), dtype=bool,
+                                     count=len(self._termes))
+        presents = np.flatnonzero(presents)
+        mots = [self._termes[i] for i in presents]
+        self._vocabulaire = set(mots)
         
-        for doc in self.id2doc.values():
-            texte_nettoye = self.nettoyer_texte(doc.texte)
-            mots = texte_nettoye.split()
-            
-            mots_uniques_doc = set()
-            
-            for mot in mots:
-                if mot:
-                    vocabulaire.add(mot)
-                    mots_uniques_doc.add(mot)
-                    # fréquence totale dans le corpus
-                    if mot in freq_dict:
-                        freq_dict[mot] += 1
-                    else:
-                        freq_dict[mot] = 1
-            # fréquence par document
-            for mot in mots_uniques_doc:
-                if mot in doc_freq_dict:
-                    doc_freq_dict[mot] += 1
-                else:
-                    doc_freq_dict[mot] = 1
-        
-        self._vocabulaire = vocabulaire
-        
-        data = []
-        for mot in vocabulaire:
-            data.append({
-                'mot': mot,
-                'term_frequency': freq_dict.get(mot, 0),
-                'document_frequency': doc_freq_dict.get(mot, 0)
-            })
-        
-        self._freq = pd.DataFrame(data)
-        self._freq = self._freq.sort_values(by='term_frequency', ascending=False).reset_index(drop=True)
+        self._freq = pd.DataFrame({
+            'mot': mots,
+            'term_frequency': freq[presents],
+            'document_frequency': doc_freq[presents]
+        })
+        self._freq = self._freq.sort_values(by='term_frequency', ascending=False, kind='stable').reset_index(drop=True)
     
     def stats(self, n=10):
         self._construire_vocabulaire_et_freq()
@@ -210,7 +549,17 @@ class Corpus:
         return self._freq
 
     def set_stopwords(self, enabled: bool):
-        """Active/désactive la suppression des stopwords (impacte stats + moteur)"""
+        """Active/désactive la suppression des stopwords (réglage par défaut des stats et des requêtes)"""
+        # les stopwords restent dans le cache de tokens et dans l'index : rien à re-tokeniser
         self.stopwords_enabled = bool(enabled)
         self._vocabulaire = None
         self._freq = None
+    
+    def set_liste_stopwords(self, mots):
+        """Remplace la liste des stopwords (sans re-tokeniser : le moteur recalcule seulement ses poids)"""
+        mots = frozenset(mot.lower() for mot in mots)
+        if mots != self.stopwords:
+            self.stopwords = mots
+            self.version += 1 # résultats du réglage stopwords périmés
+        self._vocabulaire = None
+        self._freq = None
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Générateur de corpus synthétiques pour les mesures de performance.
+
+Le vocabulaire suit une loi de Zipf (les mots les plus fréquents sont les stopwords anglais) et les longueurs
+des documents reproduisent le mélange du corpus réel : posts Reddit courts et très variables, résumés Arxiv
+plus longs et réguliers (lois log-normales ajustées sur corpus.tsv, en nombre de mots).
+"""
+
+import csv
+import os
+import numpy as np
+from Corpus import Corpus, STOPWORDS_EN
+from DocumentFactory import DocumentFactory
+
+# log-normales (moyenne, écart-type du log du nombre de mots) mesurées sur corpus.tsv
+LONGUEURS = {
+    "reddit": (3.14, 1.57),
+    "arxiv": (5.09, 0.34),
+}
+LONGUEUR_MAX = 3000
+# premiers rangs du vocabulaire : mots anglais les plus fréquents (puis le reste des stopwords)
+MOTS_FREQUENTS = ["the", "and", "to", "of", "a", "in", "is", "i", "it", "for", "that", "on", "with",
+                  "this", "you", "are", "as", "be", "my", "not"]
+DEBUT_DATES = np.datetime64("2017-01-01T00:00:00")
+FIN_DATES = np.datetime64("2025-12-31T23:59:59")
+
+
+class GenerateurCorpus:
+    """Produit des documents synthétiques reproductibles (même graine -> mêmes documents)"""
+
+    def __init__(self, nb_mots=50000, exposant=1.0, part_arxiv=0.5, nb_auteurs=None, graine=0):
+        self.nb_mots = nb_mots
+        self.exposant = exposant # exposant de la loi de Zipf du vocabulaire
+        self.part_arxiv = part_arxiv
+        self.nb_auteurs = nb_auteurs
+        self.graine = graine
+
+        hasard = np.random.default_rng(graine)
+        self.mots = self._vocabulaire(hasard)
+        # probabilités cumulées des rangs : p(r) proportionnelle à 1 / r^exposant
+        poids = 1.0 / np.arange(1, nb_mots + 1) ** exposant
+        self._cumul = np.cumsum(poids / poids.sum())
+
+    def _vocabulaire(self, hasard):
+        # stopwords aux premiers rangs, puis mots aléatoires distincts (longueur 2 à 12 lettres)
+        mots = MOTS_FREQUENTS + sorted(STOPWORDS_EN - set(MOTS_FREQUENTS))
+        vus = set(mots)
+        lettres = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+        while len(mots) < self.nb_mots:
+            for longueur in hasard.integers(2, 13, size=self.nb_mots):
+                mot = "".join(hasard.choice(lettres, size=longueur))
+                if mot not in vus:
+                    vus.add(mot)
+                    mots.append(mot)
+                    if len(mots) == self.nb_mots:
+                        break
+        return np.array(mots[:self.nb_mots], dtype=object)
+
+    def iter_lignes(self, nb_docs, taille_bloc=10000):
+        """Produit des tuples (titre, auteur, date, url, texte, type), par blocs tirés d'un coup"""
+        hasard = np.random.default_rng(self.graine + 1)
+        nb_auteurs = self.nb_auteurs or max(nb_docs // 3, 1)
+        for debut in range(0, nb_docs, taille_bloc):
+            n = min(taille_bloc, nb_docs - debut)
+            arxiv = hasard.random(n) < self.part_arxiv
+            moyennes = np.where(arxiv, LONGUEURS["arxiv"][0], LONGUEURS["reddit"][0])
+            ecarts = np.where(arxiv, LONGUEURS["arxiv"][1], LONGUEURS["reddit"][1])
+            longueurs = np.clip(np.exp(hasard.normal(moyennes, ecarts)).astype(np.int64), 1, LONGUEUR_MAX)
+
+            # tous les mots du bloc en un seul tirage
+            rangs = np.searchsorted(self._cumul, hasard.random(longueurs.sum()))
+            mots = self.mots[np.minimum(rangs, self.nb_mots - 1)]
+            fins = np.cumsum(longueurs)
+
+            auteurs = np.minimum(hasard.zipf(1.5, size=n), nb_auteurs) - 1
+            secondes = int((FIN_DATES - DEBUT_DATES) / np.timedelta64(1, "s"))
+            dates = DEBUT_DATES + hasard.integers(0, secondes, size=n).astype("timedelta64[s]")
+
+            for i in range(n):
+                texte = " ".join(mots[fins[i] - longueurs[i]:fins[i]])
+                doc_id = debut + i
+                if arxiv[i]:
+                    yield (f"Paper {doc_id}", f"Author {auteurs[i]}", str(dates[i]).replace("T", " "),
+                           f"http://arxiv.org/abs/{doc_id}", texte, "Arxiv")
+                else:
+                    yield (f"Post {doc_id}", f"user_{auteurs[i]}", str(dates[i]).replace("T", " "),
+                           f"https://reddit.com/r/synth/{doc_id}", texte, "Reddit")
+
+    def iter_lignes_avec_doublons(self, nb_docs, part_doublons=0.2, part_modifies=0.5, taux_modification=0.02):
+        """Comme iter_lignes, avec des quasi-doublons injectés (reposts d'un document précédent, identiques ou
+        avec quelques mots remplacés) ; produit des couples (ligne, True si la ligne est un doublon injecté)"""
+        hasard = np.random.default_rng(self.graine + 2)
+        originaux = []
+        lignes = self.iter_lignes(nb_docs)
+        for doc_id in range(nb_docs):
+            if originaux and hasard.random() < part_doublons:
+                _, _, date, _, texte, _ = originaux[hasard.integers(len(originaux))]
+                mots = texte.split()
+                if hasard.random() < part_modifies:
+                    nb = max(1, int(taux_modification * len(mots)))
+                    for i, rang in zip(hasard.integers(0, len(mots), size=nb), hasard.integers(0, self.nb_mots, size=nb)):
+                        mots[i] = self.mots[rang]
+                yield (f"Repost {doc_id}", f"user_r{doc_id}", date, f"https://reddit.com/r/synth/{doc_id}",
+                       " ".join(mots), "Reddit"), True
+            else:
+                ligne = next(lignes)
+                originaux.append(ligne)
+                yield ligne, False
+
+    def iter_documents(self, nb_docs):
+        for titre, auteur, date, url, texte, type_doc in self.iter_lignes(nb_docs):
+            yield DocumentFactory.create_document(type_doc.lower(), titre, auteur, date, url, texte)
+
+    def creer_corpus(self, nb_docs, nom="Corpus synthétique"):
+        corpus = Corpus(nom)
+        for doc in self.iter_documents(nb_docs):
+            corpus.add(doc)
+        return corpus
+
+    def ecrire_tsv(self, fichier, nb_docs):
+        """Écrit directement un fichier au format de Corpus.save (sans construire de corpus en mémoire)"""
+        with open(fichier, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, delimiter="\t", lineterminator=os.linesep)
+            writer.writerow(Corpus.COLONNES_TSV)
+            for doc_id, ligne in enumerate(self.iter_lignes(nb_docs)):
+                writer.writerow((doc_id,) + ligne)
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+Détection des quasi-doublons à l'ajout des documents (reposts, cross-posts, phrases répétées).
+
+Chaque document est réduit à l'ensemble de ses shingles (suites de k mots consécutifs). Sa signature MinHash
+(minimum de chaque permutation sur les shingles) estime la similarité de Jaccard entre deux ensembles : part
+des composantes égales. Les signatures sont découpées en bandes ; deux documents ne sont comparés que s'ils
+partagent une bande entière (LSH), ce qui évite de comparer chaque nouveau document à tout le corpus.
+Les mots sont hachés avec hash(), qui dépend du processus : l'index est recalculé, jamais sauvegardé.
+"""
+
+from array import array
+from collections import namedtuple
+import numpy as np
+
+# quasi-doublon regroupé sous son document canonique (métadonnées seulement, le texte n'est pas gardé)
+Doublon = namedtuple("Doublon", ["titre", "auteur", "date", "url", "type"])
+
+_VIDE = np.uint32(0xFFFFFFFF) # composante de la signature d'un document sans mot
+
+
+def _entiers_64(hasard, nombre):
+    return hasard.integers(0, 2**64 - 1, size=nombre, dtype=np.uint64, endpoint=True)
+
+
+class Deduplicateur:
+    """Index MinHash / LSH des documents canoniques. Un document est un doublon si la similarité de Jaccard
+    estimée avec l'un d'eux atteint seuil."""
+
+    def __init__(self, seuil=0.8, nb_permutations=64, nb_bandes=16, taille_shingle=3, graine=0):
+        if nb_permutations % nb_bandes:
+            raise ValueError("nb_permutations doit être un multiple de nb_bandes")
+        self.seuil = seuil
+        self.nb_permutations = nb_permutations
+        self.nb_bandes = nb_bandes
+        self.taille_shingle = taille_shingle
+        hasard = np.random.default_rng(graine)
+        # permutations h(x) = (a x + b) mod 2^64 (a impair), dont les 32 bits de poids fort sont gardés
+        self._a = _entiers_64(hasard, nb_permutations) | np.uint64(1)
+        self._b = _entiers_64(hasard, nb_permutations)
+        # coefficients des mots d'un shingle et des composantes d'une bande (combinaisons mod 2^64)
+        self._coefs_shingle = _entiers_64(hasard, taille_shingle) | np.uint64(1)
+        self._coefs_bande = _entiers_64(hasard, nb_permutations // nb_bandes) | np.uint64(1)
+
+        self._signatures = array("I") # signature de chaque document indexé, à la suite
+        self._ids = array("q") # id (dans le corpus) de chaque document indexé
+        self._bandes = [{} for _ in range(nb_bandes)] # clé de bande -> rang du document (liste si plusieurs)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def nbytes(self):
+        """Taille (octets) des signatures gardées ; les dictionnaires des bandes s'y ajoutent"""
+        return len(self._signatures) * self._signatures.itemsize + len(self._ids) * self._ids.itemsize
+
+    def signatures(self, listes_mots):
+        """Signatures MinHash d'un lot de documents (listes de mots), en une matrice uint32 (une ligne par
+        document) ; les shingles de tout le lot sont hachés ensemble"""
+        k = self.taille_shingle
+        longueurs = np.fromiter((len(mots) for mots in listes_mots), dtype=np.int64, count=len(listes_mots))
+        mots = np.fromiter((hash(mot) for liste in listes_mots for mot in liste), dtype=np.int64,
+                           count=int(longueurs.sum())).view(np.uint64)
+        fins = np.cumsum(longueurs)
+
+        # shingles : suites de k mots d'un même document (un seul, avec tous ses mots, pour un document court)
+        nb_shingles = np.where(longueurs >= k, longueurs - k + 1, np.minimum(longueurs, 1))
+        premiers = np.repeat(fins - longueurs, nb_shingles)
+        rangs = np.arange(len(premiers)) - np.repeat(np.cumsum(nb_shingles) - nb_shingles, nb_shingles)
+        debuts = premiers + rangs
+        limites = np.repeat(fins, nb_shingles)
+        shingles = np.zeros(len(debuts), dtype=np.uint64)
+        for j in range(k):
+            positions = debuts + j
+            valides = positions < limites
+            shingles[valides] += mots[positions[valides]] * self._coefs_shingle[j]
+
+        signatures = np.full((len(listes_mots), self.nb_permutations), _VIDE, dtype=np.uint32)
+        non_vides = nb_shingles > 0
+        if not non_vides.any():
+            return signatures
+        decalages = (np.cumsum(nb_shingles) - nb_shingles)[non_vides]
+        # minimum par document de chaque permutation, une permutation à la fois (tableaux 1D réutilisés, plus
+        # rapide qu'une matrice shingles x permutations qui ne tient pas dans le cache)
+        valeurs = np.empty(len(shingles), dtype=np.uint64)
+        for p in range(self.nb_permutations):
+            np.multiply(shingles, self._a[p], out=valeurs)
+            valeurs += self._b[p]
+            valeurs >>= np.uint64(32)
+            signatures[non_vides, p] = np.minimum.reduceat(valeurs, decalages)
+        return signatures
+
+    def cles_bandes(self, signatures):
+        """Clé de chaque bande de chaque signature (une ligne d'entiers par document)"""
+        bandes = signatures.reshape(len(signatures), self.nb_bandes, -1).astype(np.uint64)
+        return (bandes * self._coefs_bande).sum(axis=2, dtype=np.uint64).tolist()
+
+    def chercher(self, signature, cles):
+        """Id du document indexé le plus semblable si sa similarité atteint le seuil, sinon None"""
+        if (signature == _VIDE).all():
+            return None
+        candidats = set()
+        for bande, cle in zip(self._bandes, cles):
+            rangs = bande.get(cle)
+            if isinstance(rangs, list):
+                candidats.update(rangs)
+            elif rangs is not None:
+                candidats.add(rangs)
+        if not candidats:
+            return None
+        rangs = np.fromiter(candidats, dtype=np.int64, count=len(candidats))
+        indexees = np.frombuffer(self._signatures, dtype=np.uint32).reshape(-1, self.nb_permutations)
+        similarites = (indexees[rangs] == signature).mean(axis=1)
+        meilleur = int(np.argmax(similarites))
+        if similarites[meilleur] < self.seuil:
+            return None
+        return self._ids[rangs[meilleur]]
+
+    def indexer(self, doc_id, signature, cles):
+        """Ajoute un document canonique à l'index (un document sans mot n'est pas indexé)"""
+        if (signature == _VIDE).all():
+            return
+        rang = len(self._ids)
+        self._ids.append(doc_id)
+        self._signatures.frombytes(signature.tobytes())
+        for bande, cle in zip(self._bandes, cles):
+            rangs = bande.get(cle)
+            if rangs is None:
+                bande[cle] = rang
+            elif isinstance(rangs, list):
+                rangs.append(rang)
+            else:
+                bande[cle] = [rangs, rang]
@@ -1,16 +1,20 @@
 # -*- coding: utf-8 -*-
 
+import sys
 from datetime import datetime
 
 class Document:
+    # __slots__ : pas de __dict__ par document ; le type est un attribut de classe
+    __slots__ = ("titre", "auteur", "date", "url", "texte")
+    type = "Document"
     
     def __init__(self, titre, auteur, date, url, texte):
         self.titre = titre
-        self.auteur = auteur
+        # nom d'auteur interné : une seule chaîne par auteur, partagée par tous ses documents
+        self.auteur = sys.intern(auteur) if isinstance(auteur, str) else auteur
         self.date = date
         self.url = url
         self.texte = texte
-        self.type = "Document"
     
     def __str__(self):
         return self.titre
@@ -27,11 +31,12 @@ class Document:
 
 
 class RedditDocument(Document):
+    __slots__ = ("num_comments",)
+    type = "Reddit"
     
     def __init__(self, titre, auteur, date, url, texte, num_comments):
         super().__init__(titre, auteur, date, url, texte)
         self.num_comments = num_comments
-        self.type = "Reddit"
     
     def __str__(self):
         return f"[Reddit] {self.titre}"
@@ -48,11 +53,12 @@ class RedditDocument(Document):
 
 
 class ArxivDocument(Document):
+    __slots__ = ("co_auteurs",)
+    type = "Arxiv"
     
     def __init__(self, titre, auteur, date, url, texte, co_auteurs):
         super().__init__(titre, auteur, date, url, texte)
         self.co_auteurs = co_auteurs
-        self.type = "Arxiv"
     
     def __str__(self):
         return f"[Arxiv] {self.titre}"
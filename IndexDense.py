@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Index dense (LSA) : SVD tronquée de la matrice TF-IDF normalisée.
+
+Chaque document devient un vecteur float32 de dimension k (tableau contigu, projetable en mémoire).
+Une requête est projetée dans le même espace puis comparée aux documents par blocs (produit
+matrice-vecteur), ou seulement aux documents des clusters les plus proches (pré-filtre IVF, k-means).
+Les meilleurs candidats sont ensuite reclassés par SearchEngine avec le score exact du scoreur.
+"""
+
+import json
+import os
+import time
+import numpy as np
+from scipy.sparse.linalg import svds
+from Instrumentation import instrumentation
+
+
+def _normaliser_lignes(mat):
+    # normalisation L2 de chaque ligne (les lignes nulles restent nulles)
+    normes = np.linalg.norm(mat, axis=1)
+    normes[normes == 0] = 1
+    return np.ascontiguousarray(mat / normes[:, np.newaxis], dtype=np.float32)
+
+
+def _meilleurs(docs, scores, nb):
+    # les nb plus grands scores (non triés)
+    if len(scores) <= nb:
+        return docs, scores
+    meilleurs = np.argpartition(-scores, nb - 1)[:nb]
+    return docs[meilleurs], scores[meilleurs]
+
+
+class IndexDense:
+    """Vecteurs LSA des documents, projection des mots et pré-filtre IVF optionnel"""
+
+    def __init__(self, moteur, dimension=128, nb_clusters=0, nb_sondes=8, nb_candidats=100,
+                 taille_bloc=65536, graine=0, construire=True):
+        self.moteur = moteur
+        self.dimension = dimension # dimension demandée (bornée par la taille de la matrice)
+        self.nb_clusters = nb_clusters # 0 : pas de pré-filtre, tous les documents sont comparés
+        self.nb_sondes = nb_sondes # clusters parcourus par requête
+        self.nb_candidats = nb_candidats # documents transmis au reclassement exact
+        self.taille_bloc = taille_bloc # documents par produit matrice-vecteur
+        self.graine = graine
+
+        self.vecteurs = np.zeros((0, 0), dtype=np.float32) # (documents x k), lignes normalisées
+        self.projection = np.zeros((0, 0), dtype=np.float32) # (mots x k) : vecteurs singuliers droits
+        self.valeurs_singulieres = np.array([], dtype=np.float32)
+        self.centroides = np.zeros((0, 0), dtype=np.float32) # (clusters x k)
+        self.clusters = np.array([], dtype=np.int32) # cluster de chaque document
+        self._ordre = np.array([], dtype=np.int64) # documents triés par cluster
+        self._debuts = np.zeros(1, dtype=np.int64) # documents du cluster c : _ordre[_debuts[c]:_debuts[c + 1]]
+        self.duree_construction = None
+
+        if construire:
+            self.construire()
+
+    @property
+    def nb_docs(self):
+        return self.vecteurs.shape[0]
+
+    def nbytes(self):
+        """Taille en mémoire (octets) des tableaux de l'index dense"""
+        return sum(t.nbytes for t in (self.vecteurs, self.projection, self.valeurs_singulieres,
+                                      self.centroides, self.clusters, self._ordre, self._debuts))
+
+    # --- Construction ---
+
+    def construire(self):
+        """SVD tronquée de la matrice TF-IDF normalisée du moteur, puis clusters si demandés"""
+        with instrumentation.etape("dense.construction"):
+            debut = time.perf_counter()
+            mat = self.moteur.mat_TFxIDF_norm
+            k = min(self.dimension, min(mat.shape) - 1)
+            if k < 1:
+                self.projection = np.zeros((mat.shape[1], 0), dtype=np.float32)
+                self.valeurs_singulieres = np.array([], dtype=np.float32)
+                self.vecteurs = np.zeros((mat.shape[0], 0), dtype=np.float32)
+            else:
+                with instrumentation.etape("dense.svd"):
+                    u, s, vt = svds(mat.astype(np.float32), k=k, random_state=self.graine)
+                # svds rend les valeurs singulières par ordre croissant
+                ordre = np.argsort(-s)
+                self.valeurs_singulieres = s[ordre].astype(np.float32)
+                self.projection = np.ascontiguousarray(vt[ordre].T, dtype=np.float32)
+                self.vecteurs = _normaliser_lignes(u[:, ordre] * s[ordre])
+            self._construire_clusters()
+            self.duree_construction = time.perf_counter() - debut
+
+    def _construire_clusters(self):
+        # k-means sphérique (produit scalaire sur vecteurs normalisés), quelques itérations de Lloyd
+        nb_clusters = min(self.nb_clusters, self.nb_docs)
+        if nb_clusters < 2 or self.vecteurs.shape[1] == 0:
+            self.centroides = np.zeros((0, self.vecteurs.shape[1]), dtype=np.float32)
+            self.clusters = np.array([], dtype=np.int32)
+            self._ordre = np.array([], dtype=np.int64)
+            self._debuts = np.zeros(1, dtype=np.int64)
+            return
+
+        with instrumentation.etape("dense.kmeans"):
+            hasard = np.random.default_rng(self.graine)
+            self.centroides = self.vecteurs[hasard.choice(self.nb_docs, nb_clusters, replace=False)].copy()
+            for _ in range(10):
+                clusters = self._assigner(self.vecteurs)
+                sommes = np.zeros_like(self.centroides)
+                np.add.at(sommes, clusters, self.vecteurs)
+                vides = np.bincount(clusters, minlength=nb_clusters) == 0
+                sommes[vides] = self.centroides[vides] # un cluster vide garde son centroïde
+                centroides = _normaliser_lignes(sommes)
+                if np.array_equal(centroides, self.centroides):
+                    break
+                self.centroides = centroides
+            self.clusters = self._assigner(self.vecteurs)
+        self._trier_par_cluster()
+
+    def _assigner(self, vecteurs):
+        # cluster le plus proche de chaque vecteur (par blocs pour borner la matrice des similarités)
+        clusters = np.empty(len(vecteurs), dtype=np.int32)
+        for debut in range(0, len(vecteurs), self.taille_bloc):
+            bloc = vecteurs[debut:debut + self.taille_bloc]
+            clusters[debut:debut + len(bloc)] = np.argmax(bloc @ self.centroides.T, axis=1)
+        return clusters
+
+    def _trier_par_cluster(self):
+        self._ordre = np.argsort(self.clusters, kind="stable")
+        self._debuts = np.concatenate([[0], np.cumsum(np.bincount(self.clusters,
+                                                                  minlength=len(self.centroides)))])
+
+    def ajouter_documents(self):
+        """Projette les documents indexés depuis la construction (fold-in, sans refaire la SVD)"""
+        mat = self.moteur.mat_TFxIDF_norm
+        if mat.shape[0] <= self.nb_docs:
+            return
+        with instrumentation.etape("dense.ajout"):
+            # les mots apparus après la construction n'ont pas de coordonnées : ils sont ignorés
+            nouvelles = mat[self.nb_docs:, :self.projection.shape[0]]
+            vecteurs = _normaliser_lignes(np.asarray(nouvelles @ self.projection))
+            self.vecteurs = np.concatenate([self.vecteurs, vecteurs])
+            if len(self.centroides):
+                self.clusters = np.concatenate([self.clusters, self._assigner(vecteurs)])
+                self._trier_par_cluster()
+
+    # --- Requêtes ---
+
+    def projeter(self, colonnes, poids):
+        """Vecteur normalisé d'une requête (ids de colonne et poids des mots)"""
+        connus = colonnes < self.projection.shape[0]
+        requete = poids[connus].astype(np.float32) @ self.projection[colonnes[connus]]
+        norme = np.linalg.norm(requete)
+        return requete / norme if norme > 0 else requete
+
+    def candidats(self, requete, nb=None, masque=None):
+        """Documents les plus proches du vecteur de requête : (doc_ids, scores denses) non triés"""
+        nb = nb or self.nb_candidats
+        if not np.any(requete):
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+
+        if len(self.centroides):
+            # pré-filtre IVF : seuls les documents des clusters les plus proches sont comparés
+            sondes = np.argsort(-(self.centroides @ requete))[:self.nb_sondes]
+            docs = np.concatenate([self._ordre[self._debuts[c]:self._debuts[c + 1]] for c in sondes])
+            if masque is not None:
+                docs = docs[masque[docs]]
+            scores = np.concatenate([self.vecteurs[docs[i:i + self.taille_bloc]] @ requete
+                                     for i in range(0, len(docs), self.taille_bloc)] or [np.array([])])
+            return _meilleurs(docs, scores, nb)
+
+        # parcours exhaustif par blocs contigus ; on ne garde que les nb meilleurs au fil des blocs
+        docs_acc = np.array([], dtype=np.int64)
+        scores_acc = np.array([], dtype=np.float32)
+        for debut in range(0, self.nb_docs, self.taille_bloc):
+            scores = self.vecteurs[debut:debut + self.taille_bloc] @ requete
+            docs = np.arange(debut, debut + len(scores))
+            if masque is not None:
+                autorises = masque[debut:debut + len(scores)]
+                docs, scores = docs[autorises], scores[autorises]
+            docs_acc, scores_acc = _meilleurs(np.concatenate([docs_acc, docs]),
+                                              np.concatenate([scores_acc, scores]), nb)
+        return docs_acc, scores_acc
+
+    # --- Sauvegarde / chargement ---
+
+    TABLEAUX = ("vecteurs", "projection", "valeurs_singulieres", "centroides", "clusters")
+
+    def parametres(self):
+        return {"dimension": self.dimension, "nb_clusters": self.nb_clusters, "nb_sondes": self.nb_sondes,
+                "nb_candidats": self.nb_candidats, "taille_bloc": self.taille_bloc, "graine": self.graine}
+
+    def save(self, chemin):
+        """Écrit les tableaux (dense.<nom>.npy) et les paramètres (dense.json) dans un dossier d'index"""
+        os.makedirs(chemin, exist_ok=True)
+        for nom in self.TABLEAUX:
+            np.save(os.path.join(chemin, f"dense.{nom}.npy"), np.ascontiguousarray(getattr(self, nom)))
+        with open(os.path.join(chemin, "dense.json"), "w", encoding="utf-8") as f:
+            json.dump(self.parametres(), f)
+
+    @classmethod
+    def load(cls, chemin, moteur):
+        """Recharge un index dense (vecteurs projetés en mémoire avec np.memmap)"""
+        with open(os.path.join(chemin, "dense.json"), encoding="utf-8") as f:
+            parametres = json.load(f)
+        index = cls(moteur, construire=False, **parametres)
+        for nom in cls.TABLEAUX:
+            setattr(index, nom, np.load(os.path.join(chemin, f"dense.{nom}.npy"), mmap_mode="r"))
+        if len(index.centroides):
+            index._trier_par_cluster()
+        return index
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+
+def _encoder_deltas(valeurs, debuts):
+    # première valeur de chaque segment absolue, puis écarts avec la valeur précédente
+    deltas = np.diff(valeurs, prepend=0)
+    deltas[debuts] = valeurs[debuts]
+    # plus petit type entier non signé suffisant
+    type_min = np.min_scalar_type(int(deltas.max())) if len(deltas) else np.uint8
+    return deltas.astype(type_min)
+
+
+def _plages(debuts, longueurs):
+    # concaténation des plages [debut, debut + longueur)
+    decalages = np.cumsum(longueurs) - longueurs
+    return np.repeat(debuts - decalages, longueurs) + np.arange(longueurs.sum())
+
+
+def _decoder_deltas(deltas, debuts, longueurs):
+    # somme cumulée remise à zéro au début de chaque segment
+    cumul = np.cumsum(deltas, dtype=np.int64)
+    base = cumul[debuts] - deltas[debuts]
+    return cumul - np.repeat(base, longueurs)
+
+
+def _voisines(cles, cles_voisines, distance):
+    # occurrences (clés triées) ayant une des occurrences cles_voisines à au plus `distance` positions, dans le
+    # même document : celles juste avant et juste après suffisent
+    if len(cles_voisines) == 0:
+        return cles[:0]
+    pos = np.searchsorted(cles_voisines, cles)
+    trouves = np.zeros(len(cles), dtype=bool)
+    for voisin in (pos - 1, pos):
+        dans_bornes = (voisin >= 0) & (voisin < len(cles_voisines))
+        proches = cles_voisines[np.clip(voisin, 0, len(cles_voisines) - 1)]
+        trouves |= dans_bornes & ((proches >> 32) == (cles >> 32)) & (np.abs(proches - cles) <= distance)
+    return cles[trouves]
+
+
+class IndexPositionnel:
+    """Positions des mots dans chaque document, stockées par mot en tableaux delta-encodés"""
+
+    def __init__(self, tokens, premier_doc=0, nb_mots=None):
+        # tokens : un tableau d'ids de colonne par document (documents premier_doc, premier_doc + 1, ...)
+        self.premier_doc = premier_doc
+        self.nb_docs = len(tokens)
+        longueurs = np.array([len(t) for t in tokens], dtype=np.int64)
+        colonnes = np.concatenate(tokens).astype(np.int64) if len(tokens) else np.array([], dtype=np.int64)
+        if nb_mots is None:
+            nb_mots = int(colonnes.max()) + 1 if len(colonnes) else 0
+        self.nb_mots = nb_mots
+
+        docs = np.repeat(np.arange(premier_doc, premier_doc + self.nb_docs, dtype=np.int64), longueurs)
+        debuts_docs = np.cumsum(longueurs) - longueurs
+        positions = np.arange(len(colonnes), dtype=np.int64) - np.repeat(debuts_docs, longueurs)
+
+        # tri stable par mot : à l'intérieur d'un mot, documents puis positions restent croissants
+        ordre = np.argsort(colonnes, kind="stable")
+        colonnes, docs, positions = colonnes[ordre], docs[ordre], positions[ordre]
+
+        # un couple (mot, document) par changement de mot ou de document
+        nouveau_couple = np.ones(len(colonnes), dtype=bool)
+        nouveau_couple[1:] = (colonnes[1:] != colonnes[:-1]) | (docs[1:] != docs[:-1])
+        debuts_couples = np.flatnonzero(nouveau_couple)
+        mots_couples = colonnes[debuts_couples]
+        docs_couples = docs[debuts_couples]
+
+        # mot -> couples [ptr_mots[m], ptr_mots[m + 1]) ; couple -> positions [ptr_positions[c], ptr_positions[c + 1])
+        self.ptr_mots = np.zeros(self.nb_mots + 1, dtype=np.int64)
+        np.cumsum(np.bincount(mots_couples, minlength=self.nb_mots), out=self.ptr_mots[1:])
+        self.ptr_positions = np.append(debuts_couples, len(colonnes)).astype(np.int64)
+
+        # documents delta-encodés par mot, positions delta-encodées par couple
+        self.docs = _encoder_deltas(docs_couples, self.ptr_mots[:-1][np.diff(self.ptr_mots) > 0])
+        self.positions = _encoder_deltas(positions, debuts_couples)
+
+    def __repr__(self):
+        return f"IndexPositionnel({self.nb_docs} documents, {self.nbytes()} octets)"
+
+    def nbytes(self):
+        return self.ptr_mots.nbytes + self.ptr_positions.nbytes + self.docs.nbytes + self.positions.nbytes
+
+    def documents(self, mot_id):
+        """Documents (triés) contenant le mot"""
+        if mot_id >= self.nb_mots:
+            return np.array([], dtype=np.int64)
+        debut, fin = self.ptr_mots[mot_id], self.ptr_mots[mot_id + 1]
+        return np.cumsum(self.docs[debut:fin], dtype=np.int64)
+
+    def _cles(self, mot_id, candidats, decalage=0):
+        # clés (doc << 32) | (position - decalage) des occurrences du mot dans les documents candidats
+        debut = self.ptr_mots[mot_id]
+        docs = self.documents(mot_id)
+        gardes = np.flatnonzero(np.isin(docs, candidats))
+        couples = debut + gardes
+        longueurs = self.ptr_positions[couples + 1] - self.ptr_positions[couples]
+
+        # décoder seulement les positions des couples gardés
+        deltas = self.positions[_plages(self.ptr_positions[couples], longueurs)]
+        positions = _decoder_deltas(deltas, np.cumsum(longueurs) - longueurs, longueurs) - decalage
+
+        docs_occ = np.repeat(docs[gardes], longueurs)
+        valides = positions >= 0
+        return (docs_occ[valides] << 32) | positions[valides]
+
+    def _candidats(self, mots_ids):
+        # intersection des listes de documents, en commençant par la plus courte
+        if any(mot_id >= self.nb_mots for mot_id in mots_ids):
+            return np.array([], dtype=np.int64)
+        listes = sorted((self.documents(mot_id) for mot_id in mots_ids), key=len)
+        candidats = listes[0]
+        for docs in listes[1:]:
+            candidats = np.intersect1d(candidats, docs, assume_unique=True)
+        return candidats
+
+    def phrase(self, mots_ids):
+        """Documents contenant les mots consécutifs (dans cet ordre) et nombre d'occurrences de la phrase"""
+        candidats = self._candidats(mots_ids)
+        if len(candidats) == 0:
+            return candidats, np.array([], dtype=np.int64)
+        cles = self._cles(mots_ids[0], candidats)
+        for i, mot_id in enumerate(mots_ids[1:], 1):
+            cles = np.intersect1d(cles, self._cles(mot_id, candidats, decalage=i), assume_unique=True)
+        return np.unique(cles >> 32, return_counts=True)
+
+    def proche(self, mot_a, mot_b, distance):
+        """Documents où les deux mots apparaissent à au plus `distance` positions l'un de l'autre"""
+        return self.chaine_proche([mot_a, mot_b], [distance])
+
+    def chaine_proche(self, mots_ids, distances):
+        """Documents où chaque mot apparaît à au plus distances[i] positions du mot suivant (a NEAR/2 b NEAR/3 c :
+        une même occurrence de b est proche d'un a et d'un c)"""
+        candidats = self._candidats(mots_ids)
+        if len(candidats) == 0:
+            return candidats
+        # occurrences de chaque mot reliées à une occurrence retenue du mot précédent
+        cles = self._cles(mots_ids[0], candidats)
+        for mot_id, distance in zip(mots_ids[1:], distances):
+            cles = _voisines(self._cles(mot_id, candidats), cles, distance)
+        return np.unique(cles >> 32)
+
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+Récupération concurrente et reprenable des documents Reddit et Arxiv.
+
+Les pages des deux sources sont téléchargées par des tâches asyncio (concurrence bornée, débit limité,
+nouvelles tentatives), puis ajoutées au corpus page par page via DocumentFactory. Après chaque page,
+les nouveaux documents sont ajoutés au fichier du corpus et l'état de la collecte (fichier JSON) est
+sauvegardé : une collecte interrompue reprend là où elle s'était arrêtée.
+"""
+
+import asyncio
+import json
+import os
+import time
+import urllib.parse
+import urllib.request
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from DocumentFactory import DocumentFactory
+
+URL_REDDIT = "https://www.reddit.com/search.json"
+URL_ARXIV = "http://export.arxiv.org/api/query"
+USER_AGENT = "monApp"
+
+# espaces de noms du flux Atom d'Arxiv
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_OPENSEARCH = "{http://a9.com/-/spec/opensearch/1.1/}"
+
+
+def _lire_url(url):
+    requete = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    with urllib.request.urlopen(requete, timeout=30) as reponse:
+        return reponse.read()
+
+async def fetch_urllib(url):
+    """Téléchargement par défaut : urllib dans un thread (la boucle asyncio n'est pas bloquée)"""
+    return await asyncio.get_running_loop().run_in_executor(None, _lire_url, url)
+
+
+def _morceaux(donnees, taille=1 << 16):
+    # découpe une réponse en morceaux pour l'analyse XML incrémentale
+    for debut in range(0, len(donnees), taille):
+        yield donnees[debut:debut + taille]
+
+def iter_entrees_arxiv(morceaux):
+    """Analyse incrémentale d'un flux Atom Arxiv : produit ("total", n) puis un dict par entrée"""
+    parser = ET.XMLPullParser(events=("end",))
+    for morceau in morceaux:
+        parser.feed(morceau)
+        for _, elem in parser.read_events():
+            if elem.tag == _OPENSEARCH + "totalResults":
+                yield "total", int(elem.text or 0)
+            elif elem.tag == _ATOM + "entry":
+                yield "entree", {
+                    "titre": (elem.findtext(_ATOM + "title") or "").replace("\n", " "),
+                    "auteurs": [a.findtext(_ATOM + "name") or "Unknown" for a in elem.findall(_ATOM + "author")],
+                    "date": elem.findtext(_ATOM + "published") or "",
+                    "url": elem.findtext(_ATOM + "id") or "",
+                    "texte": (elem.findtext(_ATOM + "summary") or "").replace("\n", " "),
+                }
+                elem.clear() # l'entrée n'est plus nécessaire : mémoire libérée au fil de l'analyse
+    parser.close()
+
+
+class LimiteurDebit:
+    """Impose un intervalle minimal (en secondes) entre deux requêtes vers une même source"""
+
+    def __init__(self, intervalle):
+        self.intervalle = intervalle
+        self._verrou = asyncio.Lock()
+        self._prochain = 0.0
+
+    async def attendre(self):
+        async with self._verrou:
+            maintenant = time.monotonic()
+            if self._prochain > maintenant:
+                await asyncio.sleep(self._prochain - maintenant)
+            self._prochain = max(maintenant, self._prochain) + self.intervalle
+
+
+class Ingestion:
+    """Pipeline asyncio de collecte Reddit + Arxiv vers un Corpus"""
+
+    def __init__(self, corpus, theme, nb_reddit=25, nb_arxiv=25, fetch=None, checkpoint=None,
+                 fichier_corpus=None, concurrence=4, intervalle_reddit=1.0, intervalle_arxiv=3.0,
+                 taille_page_reddit=100, taille_page_arxiv=100, tentatives=3, delai_tentative=1.0,
+                 url_reddit=URL_REDDIT, url_arxiv=URL_ARXIV):
+        self.corpus = corpus
+        self.theme = theme
+        self.nb_reddit = nb_reddit
+        self.nb_arxiv = nb_arxiv
+        self.fetch = fetch or fetch_urllib # injectable (serveur local de test, cache...)
+        self.checkpoint = checkpoint # fichier JSON de l'état de la collecte
+        self.fichier_corpus = fichier_corpus # corpus TSV, complété à chaque point de reprise
+        self.concurrence = concurrence
+        self.intervalle_reddit = intervalle_reddit
+        self.intervalle_arxiv = intervalle_arxiv
+        self.taille_page_reddit = taille_page_reddit
+        self.taille_page_arxiv = taille_page_arxiv
+        self.tentatives = tentatives
+        self.delai_tentative = delai_tentative
+        self.url_reddit = url_reddit
+        self.url_arxiv = url_arxiv
+        self.etat = self._charger_etat()
+        self.nb_ajoutes = 0
+        self._nb_docs_ecrits = 0 # documents déjà dans fichier_corpus (0 : fichier à réécrire en entier)
+
+    def _charger_etat(self):
+        etat = {
+            "theme": self.theme,
+            "reddit": {"apres": None, "nb": 0, "termine": False},
+            "arxiv": {"total": None, "pages": [], "nb": 0},
+        }
+        if self.checkpoint and os.path.exists(self.checkpoint):
+            with open(self.checkpoint, encoding="utf-8") as f:
+                sauvegarde = json.load(f)
+            if sauvegarde.get("theme") == self.theme:
+                etat.update(sauvegarde)
+        return etat
+
+    def _sauvegarder_corpus(self):
+        # fichier écrit en entier à la première sauvegarde, puis seuls les nouveaux documents y sont ajoutés
+        nb_docs = len(self.corpus.id2doc)
+        if self._nb_docs_ecrits and nb_docs == self._nb_docs_ecrits:
+            return
+        self.corpus.save(self.fichier_corpus, depuis=self._nb_docs_ecrits)
+        self._nb_docs_ecrits = nb_docs
+
+    def _sauvegarder_etat(self):
+        if not self.checkpoint:
+            return
+        # le corpus d'abord : l'état ne référence jamais une page absente du fichier
+        if self.fichier_corpus:
+            self._sauvegarder_corpus()
+        temporaire = self.checkpoint + ".tmp"
+        with open(temporaire, "w", encoding="utf-8") as f:
+            json.dump(self.etat, f)
+        os.replace(temporaire, self.checkpoint)
+
+    async def _telecharger(self, url, limiteur, semaphore):
+        # nouvelles tentatives avec attente exponentielle
+        for tentative in range(self.tentatives):
+            try:
+                async with semaphore:
+                    await limiteur.attendre()
+                    return await self.fetch(url)
+            except Exception:
+                if tentative == self.tentatives - 1:
+                    raise
+                await asyncio.sleep(self.delai_tentative * 2 ** tentative)
+
+    # --- Reddit : pages enchaînées par le curseur "after" ---
+
+    def _documents_reddit(self, donnees):
+        docs = []
+        for enfant in donnees.get("data", {}).get("children", []):
+            post = enfant.get("data", {})
+            titre = post.get("title", "")
+            texte = (titre + " " + post.get("selftext", "")).replace("\n", " ")
+            # filtrer des textes trop courts (< 20 caractères)
+            if len(texte.strip()) >= 20:
+                docs.append(DocumentFactory.create_document(
+                    "reddit", titre, str(post.get("author")),
+                    datetime.fromtimestamp(post.get("created_utc", 0)),
+                    f"https://reddit.com{post.get('permalink', '')}", texte,
+                    num_comments=post.get("num_comments", 0)
+                ))
+        return docs
+
+    async def _reddit(self, file, semaphore):
+        etat = self.etat["reddit"]
+        limiteur = LimiteurDebit(self.intervalle_reddit)
+        while not etat["termine"] and etat["nb"] < self.nb_reddit:
+            parametres = {"q": self.theme, "limit": min(self.taille_page_reddit, self.nb_reddit - etat["nb"])}
+            if etat["apres"]:
+                parametres["after"] = etat["apres"]
+            donnees = json.loads(await self._telecharger(
+                self.url_reddit + "?" + urllib.parse.urlencode(parametres), limiteur, semaphore))
+            docs = self._documents_reddit(donnees)[:self.nb_reddit - etat["nb"]]
+            apres = donnees.get("data", {}).get("after")
+
+            termine = not apres or not donnees.get("data", {}).get("children")
+            nouvel_etat = {"apres": apres, "nb": etat["nb"] + len(docs), "termine": termine}
+            fin_page = asyncio.get_running_loop().create_future()
+            await file.put((docs, "reddit", nouvel_etat, fin_page))
+            await fin_page # page ajoutée au corpus et point de reprise écrit
+            etat = self.etat["reddit"]
+
+    # --- Arxiv : pages indépendantes (start connu), téléchargées en parallèle ---
+
+    def _documents_arxiv(self, reponse):
+        total, docs = None, []
+        for evenement, valeur in iter_entrees_arxiv(_morceaux(reponse)):
+            if evenement == "total":
+                total = valeur
+                continue
+            auteurs = valeur["auteurs"]
+            try:
+                date = datetime.strptime(valeur["date"], "%Y-%m-%dT%H:%M:%SZ")
+            except ValueError:
+                date = datetime.now()
+            # filtrer des textes trop courts
+            if len(valeur["texte"].strip()) >= 20:
+                docs.append(DocumentFactory.create_document(
+                    "arxiv", valeur["titre"], auteurs[0] if auteurs else "Unknown", date,
+                    valeur["url"], valeur["texte"], co_auteurs=auteurs[1:]
+                ))
+        return total, docs
+
+    async def _page_arxiv(self, debut, file, limiteur, semaphore):
+        parametres = urllib.parse.urlencode({
+            "search_query": "all:" + self.theme, "start": debut,
+            "max_results": min(self.taille_page_arxiv, self.nb_arxiv - debut),
+        })
+        total, docs = self._documents_arxiv(await self._telecharger(
+            self.url_arxiv + "?" + parametres, limiteur, semaphore))
+        fin_page = asyncio.get_running_loop().create_future()
+        await file.put((docs, "arxiv", {"page": debut, "total": total}, fin_page))
+        await fin_page
+        return total
+
+    async def _arxiv(self, file, semaphore):
+        etat = self.etat["arxiv"]
+        limiteur = LimiteurDebit(self.intervalle_arxiv)
+        debuts = range(0, self.nb_arxiv, self.taille_page_arxiv)
+        if etat["total"] is None and len(debuts):
+            # la première page donne le nombre total de résultats
+            await self._page_arxiv(0, file, limiteur, semaphore)
+        total = self.etat["arxiv"]["total"] or 0
+        restants = [d for d in debuts if d < total and d not in self.etat["arxiv"]["pages"]]
+        await asyncio.gather(*(self._page_arxiv(d, file, limiteur, semaphore) for d in restants))
+
+    # --- Consommateur : ajout au corpus et point de reprise ---
+
+    async def _consommer(self, file):
+        urls = {doc.url for doc in self.corpus.id2doc.values()} # pas de doublon (reprise, pages qui se recouvrent)
+        while True:
+            element = await file.get()
+            if element is None:
+                return
+            docs, source, nouvel_etat, fin_page = element
+            try:
+                for doc in docs:
+                    if doc.url not in urls:
+                        urls.add(doc.url)
+                        self.corpus.add(doc)
+                        self.nb_ajoutes += 1
+
+                if source == "reddit":
+                    self.etat["reddit"] = nouvel_etat
+                else:
+                    etat = self.etat["arxiv"]
+                    if nouvel_etat["total"] is not None:
+                        etat["total"] = nouvel_etat["total"]
+                    etat["pages"] = sorted(set(etat["pages"]) | {nouvel_etat["page"]})
+                    etat["nb"] += len(docs)
+                self._sauvegarder_etat()
+            except Exception as erreur:
+                fin_page.set_exception(erreur) # remonte dans la tâche qui a produit la page
+            else:
+                fin_page.set_result(True)
+
+    async def executer(self):
+        """Lance la collecte (reprise depuis le point de reprise s'il existe) ; retourne le nombre de documents ajoutés"""
+        file = asyncio.Queue(maxsize=self.concurrence)
+        semaphore = asyncio.Semaphore(self.concurrence)
+        consommateur = asyncio.create_task(self._consommer(file))
+        try:
+            resultats = await asyncio.gather(self._reddit(file, semaphore), self._arxiv(file, semaphore),
+                                             return_exceptions=True)
+        finally:
+            await file.put(None)
+            await consommateur
+
+        erreurs = [r for r in resultats if isinstance(r, BaseException)]
+        if erreurs:
+            raise erreurs[0] # l'état sauvegardé permet de relancer la collecte
+        if self.fichier_corpus:
+            self._sauvegarder_corpus()
+        if self.checkpoint and os.path.exists(self.checkpoint):
+            os.remove(self.checkpoint) # collecte terminée
+        return self.nb_ajoutes
+
+    def lancer(self):
+        """Version bloquante de executer() (hors d'une boucle asyncio déjà lancée)"""
+        return asyncio.run(self.executer())
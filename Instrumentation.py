@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+Mesure des étapes de l'indexation et des requêtes : durées (histogrammes), compteurs et traces.
+
+Désactivée par défaut : chaque étape ne coûte alors qu'un appel retournant un objet vide partagé.
+
+    from Instrumentation import instrumentation
+    instrumentation.activer()
+    moteur.search("machine learning")
+    print(instrumentation.rapport())
+
+    with instrumentation.tracer() as trace: # détail d'une seule requête
+        moteur.search("deep learning")
+    print(trace)
+"""
+
+import math
+import threading
+import time
+
+NB_SEAUX = 32 # seau i : durées dans [2^(i-1), 2^i[ microsecondes
+
+
+class _Nul:
+    # étape quand rien n'est mesuré : contexte vide partagé
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NUL = _Nul()
+
+
+class _Chrono:
+    __slots__ = ("instrumentation", "nom", "debut")
+
+    def __init__(self, instrumentation, nom):
+        self.instrumentation = instrumentation
+        self.nom = nom
+
+    def __enter__(self):
+        trace = self.instrumentation._local.__dict__.get("trace")
+        if trace is not None:
+            trace._ouvrir()
+        self.debut = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        duree = time.perf_counter() - self.debut
+        self.instrumentation._enregistrer(self.nom, self.debut, duree)
+        return False
+
+
+class Histogramme:
+    """Durées d'une étape : nombre, total, min / max et seaux logarithmiques (puissances de 2 en µs)"""
+
+    def __init__(self):
+        self.nombre = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.seaux = [0] * NB_SEAUX
+
+    def ajouter(self, duree):
+        self.nombre += 1
+        self.total += duree
+        self.min = min(self.min, duree)
+        self.max = max(self.max, duree)
+        self.seaux[min(max(math.frexp(duree * 1e6)[1], 0), NB_SEAUX - 1)] += 1
+
+    def percentile(self, q):
+        # borne haute du seau qui contient le q-ième percentile (en secondes)
+        seuil = q / 100 * self.nombre
+        cumul = 0
+        for i, nombre in enumerate(self.seaux):
+            cumul += nombre
+            if cumul >= seuil and nombre:
+                return min(2.0 ** i * 1e-6, self.max)
+        return self.max
+
+    def resume(self):
+        if self.nombre == 0:
+            return {"nombre": 0}
+        return {
+            "nombre": self.nombre,
+            "total_ms": self.total * 1000,
+            "moyenne_ms": self.total / self.nombre * 1000,
+            "min_ms": self.min * 1000,
+            "max_ms": self.max * 1000,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "seaux_us": {f"<{2 ** i}": n for i, n in enumerate(self.seaux) if n},
+        }
+
+
+class Trace:
+    """Étapes d'une seule opération, dans l'ordre, avec leur profondeur d'imbrication"""
+
+    def __init__(self):
+        self.debut = time.perf_counter()
+        self.evenements = [] # (nom, début relatif, durée, profondeur)
+        self._profondeur = 0
+
+    def _ouvrir(self):
+        self._profondeur += 1
+
+    def _fermer(self, nom, debut, duree):
+        self._profondeur -= 1
+        self.evenements.append((nom, debut - self.debut, duree, self._profondeur))
+
+    def etapes(self):
+        # ordre de début (les étapes sont enregistrées à leur fin)
+        return sorted(self.evenements, key=lambda e: (e[1], e[3]))
+
+    def __repr__(self):
+        lignes = [f"{'  ' * profondeur}{nom:<{40 - 2 * profondeur}} {duree * 1000:9.3f} ms  (+{debut * 1000:.3f})"
+                  for nom, debut, duree, profondeur in self.etapes()]
+        return "\n".join(lignes)
+
+
+class Instrumentation:
+    """Registre des mesures : étapes chronométrées, compteurs, crochets et traces par thread"""
+
+    def __init__(self):
+        self.actif = False
+        self._mesurer = False # actif, ou au moins une trace en cours
+        self._nb_traces = 0
+        self._verrou = threading.Lock()
+        self._local = threading.local()
+        self.crochets = [] # fonctions appelées avec (nom, durée en s) à la fin de chaque étape
+        self.reinitialiser()
+
+    def activer(self):
+        self.actif = True
+        self._mesurer = True
+
+    def desactiver(self):
+        self.actif = False
+        self._mesurer = self._nb_traces > 0
+
+    def reinitialiser(self):
+        with self._verrou:
+            self.histogrammes = {}
+            self.compteurs = {}
+
+    def ajouter_crochet(self, fonction):
+        """fonction(nom, duree) est appelée à la fin de chaque étape mesurée"""
+        self.crochets.append(fonction)
+
+    def retirer_crochet(self, fonction):
+        self.crochets.remove(fonction)
+
+    def etape(self, nom):
+        """Contexte chronométrant une étape (objet vide partagé si rien n'est mesuré)"""
+        if not self._mesurer:
+            return _NUL
+        return _Chrono(self, nom)
+
+    def compter(self, nom, n=1):
+        if not self.actif:
+            return
+        with self._verrou:
+            self.compteurs[nom] = self.compteurs.get(nom, 0) + n
+
+    def _enregistrer(self, nom, debut, duree):
+        trace = self._local.__dict__.get("trace")
+        if trace is not None:
+            trace._fermer(nom, debut, duree)
+        if self.actif:
+            with self._verrou:
+                histogramme = self.histogrammes.get(nom)
+                if histogramme is None:
+                    histogramme = self.histogrammes[nom] = Histogramme()
+                histogramme.ajouter(duree)
+        for crochet in self.crochets:
+            crochet(nom, duree)
+
+    def tracer(self):
+        """Contexte qui enregistre toutes les étapes du thread courant dans une Trace"""
+        return _ContexteTrace(self)
+
+    def instantane(self):
+        """Copie agrégée des mesures : histogrammes des étapes et compteurs"""
+        with self._verrou:
+            return {
+                "etapes": {nom: h.resume() for nom, h in sorted(self.histogrammes.items())},
+                "compteurs": dict(sorted(self.compteurs.items())),
+            }
+
+    def rapport(self):
+        mesures = self.instantane()
+        lignes = [f"{'étape':<32} {'nombre':>8} {'total ms':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"]
+        for nom, h in mesures["etapes"].items():
+            lignes.append(f"{nom:<32} {h['nombre']:>8} {h['total_ms']:>10.2f} {h['p50_ms']:>8.3f} "
+                          f"{h['p95_ms']:>8.3f} {h['p99_ms']:>8.3f}")
+        for nom, valeur in mesures["compteurs"].items():
+            lignes.append(f"{nom:<32} {valeur:>8}")
+        return "\n".join(lignes)
+
+
+class _ContexteTrace:
+
+    def __init__(self, instrumentation):
+        self.instrumentation = instrumentation
+
+    def __enter__(self):
+        instr = self.instrumentation
+        self.precedente = instr._local.__dict__.get("trace")
+        self.trace = Trace()
+        instr._local.trace = self.trace
+        with instr._verrou:
+            instr._nb_traces += 1
+            instr._mesurer = True
+        return self.trace
+
+    def __exit__(self, *exc):
+        instr = self.instrumentation
+        instr._local.trace = self.precedente
+        with instr._verrou:
+            instr._nb_traces -= 1
+            instr._mesurer = instr.actif or instr._nb_traces > 0
+        return False
+
+
+# registre partagé par Corpus et SearchEngine
+instrumentation = Instrumentation()
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Recherche distribuée sur plusieurs shards (scatter-gather).
+
+Chaque shard est un SearchEngine sur son propre Corpus, avec son propre index. Les statistiques d'IDF (nombre
+de documents, DF de chaque mot, longueur moyenne BM25, mots connus pour la norme d'une requête TF-IDF) sont
+fusionnées sur tous les shards puis fixées dans chacun : un document a le même score que s'il était dans un
+index unique, et les top-k des shards se fusionnent directement (tas sur les scores). Une requête est envoyée à
+tous les shards à la fois, dans un pool de threads (les produits creux de SciPy et la sélection du top-k par
+NumPy libèrent le GIL).
+
+    moteur = MoteurDistribue([corpus_reddit, corpus_arxiv], scorer="bm25")
+    moteur.ajouter_shard(Corpus.load_segment("segments_2024"), nom="2024")
+    moteur.search("machine learning", nb_resultats=10)
+
+Comme pour un SearchEngine, les documents ajoutés aux corpus sont pris en compte à la requête suivante
+(statistiques fusionnées de nouveau) ; une requête ne doit pas être concurrente d'un ajout de documents.
+"""
+
+import heapq
+import itertools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from SearchEngine import SearchEngine, Resultats, StatistiquesIDF
+from Instrumentation import instrumentation
+
+
+class ResultatsDistribues:
+    """Top-k fusionné : documents de plusieurs shards triés par score décroissant (doc_id : id dans le
+    corpus du shard), DataFrame avec une colonne "shard" construit à la demande"""
+
+    def __init__(self, shards, corpus, doc_ids, scores, doublons=False):
+        self.shards = shards # nom du shard de chaque document
+        self.corpus = corpus # corpus du shard de chaque document
+        self.doc_ids = doc_ids
+        self.scores = scores
+        self.doublons = doublons
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def lignes(self):
+        """(nom du shard, Resultat) de chaque document, suivi de ses quasi-doublons avec doublons"""
+        for shard, corpus, doc_id, score in zip(self.shards, self.corpus, self.doc_ids, self.scores):
+            for resultat in Resultats(corpus, [doc_id], [score], self.doublons):
+                yield shard, resultat
+
+    def __iter__(self):
+        return (resultat for _, resultat in self.lignes())
+
+    def __repr__(self):
+        return f"ResultatsDistribues({len(self)} documents, {len(set(self.shards))} shards)"
+
+    def to_dataframe(self):
+        return pd.DataFrame([{"shard": shard, **resultat._asdict()} for shard, resultat in self.lignes()])
+
+
+class MoteurDistribue:
+    """Frontal de recherche sur des shards (SearchEngine indépendants) ajoutés ou retirés à chaud"""
+
+    def __init__(self, shards=(), n_threads=None, **options_moteur):
+        self.options_moteur = options_moteur # réglages des SearchEngine créés pour les corpus ajoutés
+        self.shards = {} # nom -> SearchEngine, dans l'ordre d'ajout
+        self.n_threads = n_threads or os.cpu_count() or 1
+        self.nb_docs = 0 # documents de tous les shards (statistiques fusionnées)
+        self._etat = None # état des shards lors de la dernière fusion des statistiques
+        self._verrou = threading.Lock()
+        self._pool = None
+        for shard in shards:
+            self.ajouter_shard(shard)
+
+    def __len__(self):
+        return len(self.shards)
+
+    def ajouter_shard(self, shard, nom=None):
+        """Ajoute un shard (SearchEngine, ou Corpus indexé avec les options du moteur) ; retourne son nom"""
+        moteur = shard if isinstance(shard, SearchEngine) else SearchEngine(shard, **self.options_moteur)
+        nom = moteur.corpus.nom if nom is None else nom
+        with self._verrou:
+            if nom in self.shards:
+                raise ValueError(f"Un shard nommé {nom!r} existe déjà")
+            self.shards[nom] = moteur
+            self._etat = None # statistiques à fusionner de nouveau
+        return nom
+
+    def retirer_shard(self, nom):
+        """Retire un shard (KeyError s'il n'existe pas) ; retourne son SearchEngine, rendu à ses statistiques
+        locales"""
+        with self._verrou:
+            moteur = self.shards.pop(nom)
+            self._etat = None
+        moteur.fixer_statistiques(None)
+        return moteur
+
+    def _map(self, fonction, moteurs):
+        # fonction appliquée à chaque shard, en parallèle s'il y en a plusieurs (pool créé au premier besoin)
+        if len(moteurs) <= 1 or self.n_threads <= 1:
+            return [fonction(moteur) for moteur in moteurs]
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.n_threads)
+        return list(self._pool.map(fonction, moteurs))
+
+    def _etat_shards(self):
+        return tuple((nom, id(moteur), moteur.corpus.version, moteur.corpus._generation_tokens)
+                     for nom, moteur in self.shards.items())
+
+    def _synchroniser(self):
+        # fusionne les statistiques d'IDF si un shard a été ajouté, retiré ou modifié depuis la dernière fusion
+        with self._verrou:
+            etat = self._etat_shards()
+            if etat == self._etat:
+                return
+            with instrumentation.etape("distribue.statistiques"):
+                moteurs = list(self.shards.values())
+                locales = self._map(SearchEngine.statistiques_locales, moteurs)
+
+                # DF globale de chaque mot : somme des DF des shards (vocabulaires différents, réunis par mot)
+                df_globale = {}
+                for mots, statistiques in locales:
+                    for mot, df in zip(mots, statistiques.df.tolist()):
+                        df_globale[mot] = df_globale.get(mot, 0) + df
+                self.nb_docs = sum(statistiques.nb_docs for _, statistiques in locales)
+                longueurs = tuple(sum(s.longueurs[i] for _, s in locales) for i in range(2))
+
+                # DF globale alignée sur les colonnes de chaque shard, puis poids recalculés
+                for moteur, (mots, _) in zip(moteurs, locales):
+                    df = np.fromiter((df_globale[mot] for mot in mots), dtype=np.int64, count=len(mots))
+                    moteur.fixer_statistiques(StatistiquesIDF(self.nb_docs, df, longueurs, df_globale))
+                self._map(SearchEngine.mettre_a_jour, moteurs)
+            self._etat = etat
+
+    def search(self, mots_clefs, nb_resultats=10, dataframe=True,
+               type_doc=None, auteur=None, date_debut=None, date_fin=None, stopwords=None, doublons=False):
+        """Recherche dans tous les shards (mêmes paramètres que SearchEngine.search) ; les nb_resultats
+        meilleurs documents de chaque shard sont fusionnés"""
+        with instrumentation.etape("distribue.search"):
+            self._synchroniser()
+            noms, moteurs = list(self.shards), list(self.shards.values())
+
+            def chercher(moteur):
+                return moteur.search(mots_clefs, nb_resultats, False, type_doc, auteur, date_debut, date_fin,
+                                     stopwords)
+
+            with instrumentation.etape("distribue.scatter"):
+                parties = self._map(chercher, moteurs)
+
+            # fusion des listes triées de chaque shard (tas) : score décroissant, puis ordre des shards et id
+            with instrumentation.etape("distribue.fusion"):
+                listes = [zip((-s for s in r.scores.tolist()), itertools.repeat(rang), r.doc_ids.tolist())
+                          for rang, r in enumerate(parties)]
+                meilleurs = list(itertools.islice(heapq.merge(*listes), nb_resultats))
+                resultats = ResultatsDistribues([noms[rang] for _, rang, _ in meilleurs],
+                                                [moteurs[rang].corpus for _, rang, _ in meilleurs],
+                                                [doc_id for _, _, doc_id in meilleurs],
+                                                [-score for score, _, _ in meilleurs], doublons)
+
+        if not dataframe:
+            return resultats
+        return resultats.to_dataframe()
+
+    def stats(self):
+        """Nombre de documents indexés de chaque shard"""
+        return {nom: moteur.mat_TF.shape[0] for nom, moteur in self.shards.items()}
+
+    def fermer(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
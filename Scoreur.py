@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+
+class ScoreurTFIDF:
+    """Similarité cosinus entre vecteurs TF x IDF (IDF = log(N / DF))"""
+    nom = "tfidf"
+
+    def parametres(self):
+        return {}
+
+    def poids_documents(self, moteur, stopwords=False, premier=0):
+        # copie L2-normalisée de la matrice TFxIDF, déjà calculée par le moteur (documents premier.. seulement :
+        # ceux ajoutés depuis la dernière pondération) ; sans stopwords : colonnes des stopwords retirées, normes
+        # recalculées sans elles
+        if not stopwords:
+            return moteur.mat_TFxIDF_norm[premier:] if premier else moteur.mat_TFxIDF_norm
+        mat = moteur._sans_stopwords(moteur.mat_TFxIDF[premier:] if premier else moteur.mat_TFxIDF)
+        lignes = np.repeat(np.arange(mat.shape[0]), np.diff(mat.indptr))
+        normes = moteur.normes_docs_sans_stopwords[premier:]
+        return csr_matrix((mat.data / normes[lignes], mat.indices, mat.indptr), shape=mat.shape)
+
+    def poids_requete(self, comptes):
+        # vecteur requête normalisé : le produit scalaire devient un cosinus
+        return comptes / np.sqrt(np.sum(comptes ** 2))
+
+    def facteur_global(self, comptes, comptes_globaux):
+        # requête normalisée sur les mots connus de tous les shards (MoteurDistribue) et non sur ceux du
+        # moteur seul : les scores sont multipliés par le rapport des normes
+        norme_globale = np.sqrt(np.sum(comptes_globaux ** 2))
+        return np.sqrt(np.sum(comptes ** 2)) / norme_globale if norme_globale else 1.0
+
+    def poids_requetes(self, mat_requetes):
+        # une requête par ligne, chaque ligne normalisée
+        normes = np.sqrt(np.asarray(mat_requetes.multiply(mat_requetes).sum(axis=1)).ravel())
+        normes[normes == 0] = 1
+        return csr_matrix(mat_requetes.multiply(1 / normes[:, np.newaxis]))
+
+    def scores_matrice(self, moteur, vecteur_requete, mat_poids=None):
+        if mat_poids is None or mat_poids is moteur.mat_TFxIDF_norm:
+            return moteur._similarite_cosinus(vecteur_requete, moteur.mat_TFxIDF)
+        # matrice déjà normalisée (réglage sans stopwords) : produit divisé par la norme de la requête
+        norme_requete = np.sqrt(np.sum(vecteur_requete.data ** 2))
+        if norme_requete == 0:
+            return np.zeros(mat_poids.shape[0])
+        return mat_poids.dot(vecteur_requete.T).toarray().ravel() / norme_requete
+
+
+class ScoreurBM25:
+    """OKAPI-BM25 : poids des documents précalculés à partir des longueurs des documents"""
+    nom = "bm25"
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+
+    def parametres(self):
+        return {"k1": self.k1, "b": self.b}
+
+    def poids_documents(self, moteur, stopwords=False, premier=0):
+        # documents premier.. seulement (ceux ajoutés depuis la dernière pondération) ; sans stopwords : leurs
+        # colonnes sont retirées, les longueurs des documents ne les comptent pas
+        mat_TF = moteur.mat_TF[premier:] if premier else moteur.mat_TF
+        mat_TF = moteur._sans_stopwords(mat_TF) if stopwords else mat_TF
+
+        # IDF BM25 (toujours positive grâce au +1) et longueur moyenne : statistiques de la dernière pondération
+        # complète du moteur, les siennes ou globales (MoteurDistribue) ; les DF des colonnes de stopwords
+        # retirées ne servent pas
+        nb_docs, df, longueurs_totales, _ = moteur._statistiques_poids
+        idf = np.log((nb_docs - df + 0.5) / (df + 0.5) + 1)
+        avgdl = longueurs_totales[bool(stopwords)] / max(nb_docs, 1)
+        longueurs = np.asarray(mat_TF.sum(axis=1)).ravel()
+
+        # poids de chaque valeur non nulle : IDF * f (k1 + 1) / (f + k1 (1 - b + b |D| / avgdl))
+        f = mat_TF.data.astype(float)
+        dl = np.repeat(longueurs, np.diff(mat_TF.indptr))
+        normalisation = self.k1 * (1 - self.b + self.b * dl / max(avgdl, 1e-12))
+        poids = idf[mat_TF.indices] * f * (self.k1 + 1) / (f + normalisation)
+        return csr_matrix((poids, mat_TF.indices, mat_TF.indptr), shape=mat_TF.shape)
+
+    def poids_requete(self, comptes):
+        # un mot répété dans la requête compte autant de fois
+        return comptes.astype(float)
+
+    def facteur_global(self, comptes, comptes_globaux):
+        # requête non normalisée : un mot absent du moteur n'a aucune contribution
+        return 1.0
+
+    def poids_requetes(self, mat_requetes):
+        return csr_matrix(mat_requetes, dtype=float)
+
+    def scores_matrice(self, moteur, vecteur_requete, mat_poids=None):
+        mat_poids = moteur.mat_poids if mat_poids is None else mat_poids
+        return mat_poids.dot(vecteur_requete.T).toarray().ravel()
+
+
+# scoreurs disponibles par nom
+SCOREURS = {
+    ScoreurTFIDF.nom: ScoreurTFIDF,
+    ScoreurBM25.nom: ScoreurBM25,
+}
+
+def creer_scoreur(scorer="tfidf", **parametres):
+    """Retourne un scoreur à partir de son nom (ou le scoreur lui-même s'il est déjà créé)"""
+    if not isinstance(scorer, str):
+        return scorer
+    if scorer not in SCOREURS:
+        raise ValueError(f"Scoreur inconnu : {scorer} (disponibles : {', '.join(SCOREURS)})")
+    return SCOREURS[scorer](**parametres)
@@ -7,163 +7,1254 @@ Created on Wed Nov 26 21:21:33 2025
 
 import numpy as np
 import pandas as pd
-from scipy.sparse import csr_matrix
-import math
+from scipy.sparse import csr_matrix, csc_matrix, vstack
+from collections import namedtuple, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import threading
+import hashlib
+import json
+import os
+import shutil
+from Corpus import tokeniser_texte
+from IndexPositionnel import IndexPositionnel
+from IndexDense import IndexDense
+from Vocabulaire import Vocabulaire
+from StockDocuments import NAT
+from Scoreur import creer_scoreur
+from Instrumentation import instrumentation
+import re
+
+# opérateurs de requête : "phrase exacte" et mot1 NEAR/k mot2, qui s'enchaîne (mot1 NEAR/2 mot2 NEAR/3 mot3)
+_RE_PHRASE = re.compile(r'"([^"]*)"')
+_RE_PROCHE = re.compile(r'\S+(?:\s+NEAR/\d+\s+\S+)+')
+_RE_NEAR = re.compile(r'\s+NEAR/(\d+)\s+') # découpe une chaîne : mot1, k, mot2, k', mot3...
+_RE_PREFIXE = re.compile(r'(\w+)\*') # learn* : tous les mots commençant par "learn"
+
+# nombre maximal de mots du vocabulaire substitués à un préfixe (les plus fréquents)
+MAX_EXPANSIONS = 50
+
+# à incrémenter quand la tokenisation ou le format de l'index changent
+VERSION_INDEX = 2
+
+# Une ligne de résultat (mêmes champs que les colonnes du DataFrame)
+Resultat = namedtuple("Resultat", ["doc_id", "titre", "auteur", "date", "url", "score", "type"])
+
+# statistiques d'IDF d'un ensemble de documents : df aligné sur les colonnes du moteur, longueurs : nombre
+# total de mots (stopwords compris, sans stopwords), mots : ceux de l'ensemble (mot -> DF), absents (None)
+# pour les statistiques d'un seul moteur
+StatistiquesIDF = namedtuple("StatistiquesIDF", ["nb_docs", "df", "longueurs", "mots"])
+
+
+
+def _compter_tokens(tous, longueurs, nb_termes):
+    # occurrences de chaque couple (document, terme) : (lignes, termes, comptes)
+    lignes = np.repeat(np.arange(len(longueurs), dtype=np.int64), longueurs)
+    nb_termes = max(nb_termes, 1)
+    couples, comptes = np.unique(lignes * nb_termes + tous, return_counts=True)
+    return couples // nb_termes, couples % nb_termes, comptes
+
+
+def _compter_shard(textes):
+    # exécuté dans un processus séparé : tokenise et compte un shard avec un vocabulaire local
+    termes, terme2id, ids, longueurs = [], {}, [], []
+    for texte in textes:
+        mots = tokeniser_texte(texte)
+        for mot in mots:
+            terme_id = terme2id.get(mot)
+            if terme_id is None:
+                terme_id = len(termes)
+                terme2id[mot] = terme_id
+                termes.append(mot)
+            ids.append(terme_id)
+        longueurs.append(len(mots))
+    
+    ids = np.array(ids, dtype=np.int32)
+    longueurs = np.array(longueurs, dtype=np.int64)
+    return (termes, ids, longueurs) + _compter_tokens(ids, longueurs, len(termes))
+
+
+def _lignes(mat):
+    # ligne de chaque valeur non nulle d'une matrice CSR
+    return np.repeat(np.arange(mat.shape[0]), np.diff(mat.indptr))
+
+
+def _normes_lignes(mat, lignes=None):
+    # norme L2 de chaque ligne d'une matrice CSR (1 pour une ligne nulle : pas de division par zéro)
+    lignes = _lignes(mat) if lignes is None else lignes
+    normes = np.sqrt(np.bincount(lignes, weights=mat.data ** 2, minlength=mat.shape[0]))
+    normes[normes == 0] = 1
+    return normes
+
+
+def _structure_csc(mat, precedente=None):
+    # structure CSC d'une matrice CSR : (position CSR de chaque valeur dans l'ordre CSC, ligne de chaque valeur,
+    # indptr des colonnes, nombre de lignes). Avec la structure de ses premières lignes, seules les valeurs des
+    # lignes ajoutées depuis sont triées par colonne, puis insérées à la fin de leurs colonnes.
+    nb_lignes, nb_colonnes = mat.shape
+    if precedente is None or precedente[3] > nb_lignes:
+        positions = csr_matrix((np.arange(mat.nnz), mat.indices, mat.indptr), shape=mat.shape).tocsc()
+        return positions.data, positions.indices, positions.indptr, nb_lignes
+    ordre, lignes, indptr, premier = precedente
+    debut = mat.indptr[premier]
+    colonnes = mat.indices[debut:]
+    rang = np.argsort(colonnes, kind="stable") # lignes croissantes dans chaque colonne
+    indptr = np.concatenate([indptr, np.full(nb_colonnes + 1 - len(indptr), indptr[-1])])
+    points = indptr[colonnes[rang] + 1]
+    nouvelles_lignes = np.repeat(np.arange(premier, nb_lignes), np.diff(mat.indptr[premier:]))
+    ordre = np.insert(ordre, points, debut + rang)
+    lignes = np.insert(lignes, points, nouvelles_lignes[rang])
+    indptr = indptr + np.concatenate([[0], np.cumsum(np.bincount(colonnes, minlength=nb_colonnes))])
+    return ordre, lignes, indptr, nb_lignes
+
+
+def _structure_sans_colonnes(mat, masque_colonnes, precedente=None):
+    # (valeurs gardées, indices, indptr, nombre de lignes) de la matrice CSR mat privée des colonnes masquées ;
+    # avec la structure de ses premières lignes (même masque), seules les lignes ajoutées depuis sont filtrées
+    premier = 0 if precedente is None or precedente[3] > mat.shape[0] else precedente[3]
+    debut = mat.indptr[premier]
+    gardes = ~masque_colonnes[mat.indices[debut:]]
+    indices = mat.indices[debut:][gardes]
+    indptr = np.concatenate([[0], np.cumsum(gardes)])[mat.indptr[premier:] - debut]
+    if premier:
+        anciens_gardes, anciens_indices, ancien_indptr, _ = precedente
+        gardes = np.concatenate([anciens_gardes, gardes])
+        indices = np.concatenate([anciens_indices, indices])
+        indptr = np.concatenate([ancien_indptr[:-1], ancien_indptr[-1] + indptr])
+    return gardes, indices, indptr, mat.shape[0]
+
+
+def _index_inverse(mat_poids, structure=None):
+    # format CSC : les documents de chaque mot sont contigus et triés par id ; avec la structure CSC des
+    # poids (mêmes valeurs non nulles), les poids sont simplement réordonnés
+    if structure is not None and len(structure[0]) == mat_poids.nnz:
+        ordre, lignes, indptr, _ = structure
+        index_inverse = csc_matrix((mat_poids.data[ordre], lignes, indptr), shape=mat_poids.shape)
+    else:
+        index_inverse = mat_poids.tocsc()
+    index_inverse.sort_indices()
+    
+    # contribution maximale de chaque mot (borne utilisée par max-score)
+    poids_max = np.zeros(index_inverse.shape[1])
+    longueurs = np.diff(index_inverse.indptr)
+    non_vides = longueurs > 0
+    poids_max[non_vides] = np.maximum.reduceat(index_inverse.data, index_inverse.indptr[:-1][non_vides])
+    return index_inverse, poids_max
+
+
+def _completer_index_inverse(index_inverse, poids_max, nouvelles):
+    # index inversé et bornes max-score complétés par les lignes CSR des documents ajoutés (ids à la suite) :
+    # leurs valeurs sont triées par colonne puis insérées à la fin de leurs colonnes, sans toucher aux autres
+    premier, (nb_lignes, nb_colonnes) = index_inverse.shape[0], nouvelles.shape
+    colonnes = nouvelles.indices
+    rang = np.argsort(colonnes, kind="stable") # lignes croissantes dans chaque colonne
+    indptr = np.concatenate([index_inverse.indptr,
+                             np.full(nb_colonnes + 1 - len(index_inverse.indptr), index_inverse.indptr[-1])])
+    points = indptr[colonnes[rang] + 1]
+    data = np.insert(index_inverse.data, points, nouvelles.data[rang])
+    indices = np.insert(index_inverse.indices, points, (premier + _lignes(nouvelles))[rang])
+    indptr = indptr + np.concatenate([[0], np.cumsum(np.bincount(colonnes, minlength=nb_colonnes))])
+    poids_max = np.concatenate([poids_max, np.zeros(nb_colonnes - len(poids_max))])
+    np.maximum.at(poids_max, colonnes, nouvelles.data)
+    return csc_matrix((data, indices, indptr), shape=(premier + nb_lignes, nb_colonnes)), poids_max
+
+
+def _idf(nb_docs, df):
+    # IDF = log(N / DF), nulle pour un mot absent
+    idf = np.zeros(len(df))
+    presents = df > 0
+    idf[presents] = np.log(nb_docs / df[presents])
+    return idf
+
+
+def _empiler(haut, bas):
+    # lignes CSR de bas ajoutées sous haut, élargi aux colonnes de bas (nouveaux mots) sans être modifié
+    haut = csr_matrix((haut.data, haut.indices, haut.indptr), shape=(haut.shape[0], bas.shape[1]))
+    return vstack([haut, bas], format="csr")
+
+
+class Resultats:
+    """Résultats compacts d'une recherche : ids et scores triés, DataFrame construit à la demande ; avec
+    doublons, chaque document est suivi de ses quasi-doublons regroupés (même id et même score)"""
+    
+    def __init__(self, corpus, doc_ids, scores, doublons=False):
+        self.corpus = corpus
+        self.doc_ids = doc_ids
+        self.scores = scores
+        self.doublons = doublons
+    
+    def __len__(self):
+        return len(self.doc_ids)
+    
+    def __iter__(self):
+        for doc_id, score in zip(self.doc_ids, self.scores):
+            doc = self.corpus.id2doc[doc_id]
+            yield Resultat(doc_id, doc.titre, doc.auteur, doc.date, doc.url, score, doc.getType())
+            if self.doublons:
+                for d in self.corpus.doublons.get(doc_id, ()):
+                    yield Resultat(doc_id, d.titre, d.auteur, d.date, d.url, score, d.type)
+    
+    def __repr__(self):
+        return f"Resultats({len(self)} documents)"
+    
+    def to_dataframe(self):
+        return pd.DataFrame([r._asdict() for r in self])
+
+
+class CacheResultats:
+    """Cache LRU borné des résultats de recherche, vidé quand la version du corpus change"""
+    
+    def __init__(self, taille_max=256):
+        self.taille_max = taille_max
+        self.entrees = OrderedDict() # clé -> Resultats, de la moins à la plus récemment utilisée
+        self.version = None # version du corpus des entrées en cache
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._verrou = threading.Lock() # le moteur peut être interrogé par plusieurs threads
+    
+    def __len__(self):
+        return len(self.entrees)
+    
+    def _verifier_version(self, version):
+        if version != self.version:
+            if self.entrees:
+                self.invalidations += 1
+                self.entrees.clear()
+            self.version = version
+    
+    def get(self, cle, version):
+        with self._verrou:
+            self._verifier_version(version)
+            resultats = self.entrees.get(cle)
+            if resultats is None:
+                self.misses += 1
+                instrumentation.compter("cache.misses")
+                return None
+            self.entrees.move_to_end(cle)
+            self.hits += 1
+            instrumentation.compter("cache.hits")
+            return resultats
+    
+    def put(self, cle, resultats, version):
+        if self.taille_max <= 0:
+            return
+        with self._verrou:
+            self._verifier_version(version)
+            self.entrees[cle] = resultats
+            self.entrees.move_to_end(cle)
+            while len(self.entrees) > self.taille_max:
+                self.entrees.popitem(last=False)
+                self.evictions += 1
+    
+    def vider(self):
+        with self._verrou:
+            self.entrees.clear()
+    
+    def stats(self):
+        with self._verrou:
+            return {"taille": len(self.entrees), "taille_max": self.taille_max, "hits": self.hits,
+                    "misses": self.misses, "evictions": self.evictions, "invalidations": self.invalidations}
+
 
 class SearchEngine:
     
-    def __init__(self, corpus):
+    def __init__(self, corpus, backend="index", arret_anticipe=True, construire=True,
+                 n_workers=1, taille_shard=5000, positions=False, scorer="tfidf", k1=None, b=None,
+                 taille_cache=256, derive_max=0.1):
         self.corpus = corpus
-        self.vocab = {}
+        self.vocab = Vocabulaire() # mots triés, statistiques et IDF en tableaux (id = colonne)
         self.mat_TF = None
         self.mat_TFxIDF = None
         
-        # construction automatique lors de l'instanciation
-        self._construire_vocabulaire()
-        self._construire_matrices()
-    
-    def _construire_vocabulaire(self):
-        # récupérer les mots uniques et les trier
-        mots_uniques = set()
-        
-        for doc in self.corpus.id2doc.values():
-            texte_nettoye = self.corpus.nettoyer_texte(doc.texte)
-            mots = texte_nettoye.split()
-            mots_uniques.update([mot for mot in mots if mot])
-        
-        # créer le dictionnaire vocab avec identifiants
-        mots_tries = sorted(list(mots_uniques))
-        for idx, mot in enumerate(mots_tries):
-            self.vocab[mot] = {
-                'id': idx,
-                'total_occurrences': 0,
-                'nb_documents': 0
-            }
-    
-    def _construire_matrices(self):
-        nb_docs = len(self.corpus.id2doc)
+        # index inversé : une liste de postings (doc_id, poids) par mot
+        self.backend = backend # "index" (postings), "matrice" (produit complet) ou "dense" (LSA + reclassement)
+        self.arret_anticipe = arret_anticipe # élagage max-score sur les postings
+        self.index_inverse = None
+        self.poids_max = None
+        
+        # précalculés à chaque construction de l'index
+        self.idf = None
+        self.normes_docs = None
+        self.mat_TFxIDF_norm = None
+        
+        # pondération utilisée pour le classement ("tfidf" ou "bm25") : poids des documents
+        # précalculés à chaque construction, une requête reste un seul produit creux
+        self.scoreur = creer_scoreur(scorer, **{nom: valeur for nom, valeur in (("k1", k1), ("b", b))
+                                                if valeur is not None})
+        self.mat_poids = None
+        
+        # statistiques globales (StatistiquesIDF de tous les shards d'un MoteurDistribue) : IDF et longueur
+        # moyenne communes, les scores des shards restent comparables ; None : celles de ce moteur seul
+        self.statistiques = None
+        self._nb_docs_statistiques = 0 # documents indexés quand les statistiques globales ont été fixées
+        
+        # réglage "stopwords supprimés" : les stopwords restent indexés, leurs colonnes sont masquées et les
+        # poids des documents précalculés sans eux (normes TF-IDF, longueurs BM25) ; chaque requête choisit
+        # son réglage. L'IDF d'un mot est la même dans les deux réglages (son DF ne change pas).
+        self.masque_stopwords = np.array([], dtype=bool) # colonne -> mot de la liste de stopwords
+        self.normes_docs_sans_stopwords = None
+        self.mat_poids_sans_stopwords = None
+        self.index_inverse_sans_stopwords = None
+        self.poids_max_sans_stopwords = None
+        
+        # métadonnées en colonnes (une valeur par document indexé) pour les filtres de recherche
+        self.types = np.array([], dtype=np.int8) # code du type (getType())
+        self.auteurs = np.array([], dtype=np.int32) # id de l'auteur
+        self.dates = np.array([], dtype=np.int64) # timestamp en ns (NAT si absente)
+        self._code_du_type = {} # type en minuscules -> code (StockDocuments.codes_types)
+        self._id_auteur = {} # nom de l'auteur -> id (StockDocuments.id_auteur, ordre de Corpus.authors)
+        self._ordre_dates = None # ids des documents triés par date (recalculé à la demande)
+        
+        # cache LRU des résultats : une requête répétée (même version du corpus) ne coûte qu'une recherche
+        # dans un dictionnaire
+        self.cache = CacheResultats(taille_cache)
+        self._version_figee = None # version du corpus d'un moteur figé (instantané en lecture seule)
+        
+        # état de l'index pour les mises à jour incrémentales
+        self._nb_docs_indexes = 0 # les documents 0 .. n-1 du corpus sont indexés
+        self._stopwords_index = None # liste de stopwords (frozenset du corpus) utilisée pour les poids
+        self._idf_perime = False # tous les poids à recalculer avant la prochaine requête
+        self._nb_docs_ponderes = 0 # les documents 0 .. n-1 ont leurs poids (lignes des matrices de poids)
+        self._nb_docs_reference = 0 # documents pondérés lors de la dernière pondération complète
+        self._statistiques_poids = None # StatistiquesIDF de cette pondération, reprises pour les ajouts
+        # fraction de documents ajoutés (par rapport à la dernière pondération complète) au-delà de laquelle
+        # tous les poids sont recalculés ; en deçà, seuls les documents ajoutés sont pondérés (0 : toujours)
+        self.derive_max = derive_max
+        self._generation_tokens = None # génération du cache de tokens du corpus utilisée
+        self._colonne_du_terme = np.array([], dtype=np.int64) # id de terme du corpus -> id de colonne
+        self._structure_TF = None # ordre CSC des valeurs de mat_TF (_structure_csc), complété à chaque ajout
+        self._stopwords_TF = None # structure de mat_TF sans les colonnes de stopwords (_sans_stopwords)
+        self._structure_sans_stopwords_TF = None # ordre CSC des valeurs de mat_TF sans ces colonnes
+        self._stopwords_structures = None # liste de stopwords de ces deux structures
+        
+        # construction parallèle : nombre de processus et nombre de documents par shard
+        self.n_workers = n_workers
+        self.taille_shard = taille_shard
+        
+        # index positionnel (phrases, NEAR/k) : segments delta-encodés, construits à la demande
+        # ou dès l'indexation si positions=True
+        self.positions = positions
+        self._segments_positionnels = []
+        self._nb_docs_positionnels = 0
+        
+        # index dense (LSA) : construit par construire_dense() ou à la première requête du backend "dense"
+        self.dense = None
+        
+        # construction automatique lors de l'instanciation (sauf moteur rechargé depuis le disque)
+        if construire:
+            self._construire_index()
+    
+    def _construire_index(self):
+        # (re)construction complète à partir du cache de tokens du corpus
+        self.vocab = Vocabulaire()
+        self._colonne_du_terme = np.array([], dtype=np.int64)
+        self._generation_tokens = self.corpus._generation_tokens
+        self._nb_docs_indexes = 0
+        self.mat_TF = csr_matrix((0, 0), dtype=np.int64)
+        self._structure_TF = self._stopwords_TF = self._structure_sans_stopwords_TF = None
+        self._segments_positionnels = []
+        self._nb_docs_positionnels = 0
+        self.types = np.array([], dtype=np.int8)
+        self.auteurs = np.array([], dtype=np.int32)
+        self.dates = np.array([], dtype=np.int64)
+        self._ordre_dates = None
+        self._nb_docs_statistiques = -1 # colonnes renumérotées : statistiques globales à fixer de nouveau
+        
+        # indexer tout le corpus, trier le vocabulaire puis calculer la matrice TFxIDF
+        with instrumentation.etape("index.construction"):
+            self._indexer_nouveaux_documents()
+            with instrumentation.etape("index.tri_vocabulaire"):
+                self._trier_vocabulaire()
+            self._calculer_TFxIDF()
+            if self.positions:
+                self._mettre_a_jour_positions()
+            if self.dense is not None:
+                self.dense.construire() # les ids de colonne ont changé : nouvelle SVD
+    
+    def _trier_vocabulaire(self):
+        # renumérote les colonnes pour que les ids suivent l'ordre alphabétique des mots
+        ordre = self.vocab.trier()
+        nouvel_id = np.empty(len(ordre), dtype=np.int64)
+        nouvel_id[ordre] = np.arange(len(ordre))
+        
+        self._colonne_du_terme = nouvel_id[self._colonne_du_terme]
+        
+        self.mat_TF = csr_matrix((self.mat_TF.data, nouvel_id[self.mat_TF.indices], self.mat_TF.indptr),
+                                 shape=self.mat_TF.shape)
+        self.mat_TF.sort_indices()
+        # colonnes renumérotées : structures à recalculer
+        self._structure_TF = self._stopwords_TF = self._structure_sans_stopwords_TF = None
+    
+    def _colonnes_termes(self, ids_termes):
+        # convertit des ids de termes du corpus en ids de colonne ; un mot inconnu reçoit le prochain id
+        nb_connus = len(self._colonne_du_terme)
+        if len(self.corpus._termes) > nb_connus:
+            nouvelles = self.vocab.ajouter(self.corpus._termes[nb_connus:])
+            self._colonne_du_terme = np.concatenate([self._colonne_du_terme, nouvelles])
+        return self._colonne_du_terme[ids_termes]
+    
+    def _indexer_nouveaux_documents(self):
+        # ajoute au bout de mat_TF une ligne par document ajouté au corpus depuis la dernière indexation
+        premier = self._nb_docs_indexes
+        nouveaux_ids = range(premier, len(self.corpus.id2doc))
+        if len(nouveaux_ids) == 0:
+            return
+        
+        instrumentation.compter("index.documents", len(nouveaux_ids))
+        if self.n_workers > 1 and len(nouveaux_ids) > self.taille_shard:
+            with instrumentation.etape("index.comptage_parallele"):
+                lignes, termes, comptes = self._compter_en_parallele(nouveaux_ids)
+        else:
+            # tokens des nouveaux documents (depuis le cache du corpus)
+            with instrumentation.etape("index.tokenisation"):
+                tokens = self.corpus.tokens_documents(nouveaux_ids)
+            with instrumentation.etape("index.comptage"):
+                tous = np.concatenate(tokens) if tokens else np.array([], dtype=np.int32)
+                lignes, termes, comptes = _compter_tokens(tous, [len(t) for t in tokens], len(self.corpus._termes))
+        
+        # ids de termes du corpus -> ids de colonne (les mots inconnus sont ajoutés au vocabulaire)
+        with instrumentation.etape("index.matrice_TF"):
+            self._ajouter_lignes(premier, nouveaux_ids, termes, lignes, comptes)
+        
+        self._ajouter_metadonnees(nouveaux_ids)
+        self._nb_docs_indexes = len(self.corpus.id2doc)
+    
+    def _ajouter_lignes(self, premier, nouveaux_ids, termes, lignes, comptes):
+        # nouvelles lignes de mat_TF et statistiques du vocabulaire
+        colonnes = self._colonnes_termes(termes)
         nb_mots = len(self.vocab)
+        nouvelles_lignes = csr_matrix((comptes.astype(np.int64), (lignes, colonnes)),
+                                      shape=(len(nouveaux_ids), nb_mots))
         
-        # matrice TF en format sparse
-        row_indices = []
-        col_indices = []
-        data_tf = []
+        # statistiques du vocabulaire (tableaux indexés par id de mot)
+        self.vocab.total_occurrences += np.bincount(colonnes, weights=comptes, minlength=nb_mots).astype(np.int64)
+        self.vocab.nb_documents += np.bincount(colonnes, minlength=nb_mots)
         
-        # Dictionnaire pour compter les occurrences par document
-        doc_freq = {mot: 0 for mot in self.vocab}
+        # élargir mat_TF aux nouvelles colonnes (sans modifier l'ancienne matrice) puis empiler
+        self.mat_TF = _empiler(self.mat_TF, nouvelles_lignes)
+    
+    def _ajouter_metadonnees(self, doc_ids):
+        # complète les colonnes type / auteur / date avec les documents donnés (copiées du stock du corpus,
+        # dont les codes de type et les ids d'auteur sont repris)
+        stock = self.corpus.id2doc
+        doc_ids = list(doc_ids)
+        self.types = np.concatenate([self.types, stock.colonne("types", doc_ids)])
+        self.auteurs = np.concatenate([self.auteurs, stock.colonne("auteurs", doc_ids)])
+        self.dates = np.concatenate([self.dates, stock.colonne("dates", doc_ids)])
+        self._code_du_type = stock.codes_types
+        self._id_auteur = stock.id_auteur
+        self._ordre_dates = None
+    
+    def _masque_filtres(self, type_doc=None, auteur=None, date_debut=None, date_fin=None):
+        # filtres de métadonnées -> masque booléen des documents autorisés (None : aucun filtre)
+        masque = None
         
-        # pour chaque document
-        for doc_id, doc in self.corpus.id2doc.items():
-            texte_nettoye = self.corpus.nettoyer_texte(doc.texte)
-            mots = texte_nettoye.split()
-            
-            # Compter les occurrences de chaque mot dans le document
-            mot_counts = {}
-            mots_vus = set()
-            
-            for mot in mots:
-                if mot and mot in self.vocab:
-                    mot_counts[mot] = mot_counts.get(mot, 0) + 1
-                    mots_vus.add(mot)
-            
-            # Remplir la matrice 
-            for mot, count in mot_counts.items():
-                row_indices.append(doc_id)
-                col_indices.append(self.vocab[mot]['id'])
-                data_tf.append(count)
-                self.vocab[mot]['total_occurrences'] += count
-            
-            for mot in mots_vus:
-                doc_freq[mot] += 1
+        def restreindre(autorises):
+            nonlocal masque
+            masque = autorises if masque is None else masque & autorises
+        
+        if type_doc is not None:
+            types = [type_doc] if isinstance(type_doc, str) else type_doc
+            codes = [self._code_du_type[t.lower()] for t in types if t.lower() in self._code_du_type]
+            restreindre(np.isin(self.types, codes))
+        
+        if auteur is not None:
+            auteurs = [auteur] if isinstance(auteur, str) else auteur
+            ids = [self._id_auteur[a] for a in auteurs if a in self._id_auteur]
+            restreindre(np.isin(self.auteurs, ids))
+        
+        if date_debut is not None or date_fin is not None:
+            # index des dates triées : la plage est trouvée par recherche dichotomique
+            if self._ordre_dates is None:
+                self._ordre_dates = np.argsort(self.dates, kind="stable")
+            dates_triees = self.dates[self._ordre_dates]
+            debut = np.searchsorted(dates_triees, NAT, side="right") # dates absentes exclues
+            fin = len(dates_triees)
+            if date_debut is not None:
+                debut = max(debut, np.searchsorted(dates_triees, pd.Timestamp(date_debut).value, side="left"))
+            if date_fin is not None:
+                fin = np.searchsorted(dates_triees, pd.Timestamp(date_fin).value, side="right")
+            autorises = np.zeros(len(self.dates), dtype=bool)
+            autorises[self._ordre_dates[debut:fin]] = True
+            restreindre(autorises)
+        
+        return masque
+    
+    def _compter_en_parallele(self, doc_ids):
+        # découpe les documents en shards, tokenisés et comptés par des processus séparés
+        shards = [doc_ids[i:i + self.taille_shard] for i in range(0, len(doc_ids), self.taille_shard)]
+        textes = ([self.corpus.id2doc[doc_id].texte for doc_id in shard] for shard in shards)
+        
+        toutes_lignes, tous_termes, tous_comptes = [], [], []
+        with ProcessPoolExecutor(max_workers=self.n_workers) as executeur:
+            resultats = executeur.map(_compter_shard, textes)
+            # fusion dans l'ordre des shards : ids locaux -> ids de termes du corpus (cache de tokens complété)
+            for shard, (termes_locaux, ids_locaux, longueurs, lignes, termes, comptes) in zip(shards, resultats):
+                remap = self.corpus._integrer_tokens(shard, termes_locaux, ids_locaux, longueurs)
+                toutes_lignes.append(lignes + (shard[0] - doc_ids[0]))
+                tous_termes.append(remap[termes])
+                tous_comptes.append(comptes)
+        
+        return np.concatenate(toutes_lignes), np.concatenate(tous_termes), np.concatenate(tous_comptes)
+    
+    def mettre_a_jour(self):
+        """Indexe les documents ajoutés au corpus (reconstruit tout si le cache de tokens a été invalidé).
+        Seuls les nouveaux documents sont tokenisés, comptés et pondérés : leurs poids utilisent les statistiques
+        (DF, IDF, longueur moyenne BM25) de la dernière pondération complète, les autres documents gardent les
+        leurs. Tous les poids sont recalculés quand les documents ajoutés depuis dépassent derive_max de l'index
+        (ou quand la liste de stopwords ou les statistiques globales changent)."""
+        if self._version_figee is not None:
+            return # moteur figé : les documents ajoutés depuis ne sont pas visibles
+        if self.corpus._generation_tokens != self._generation_tokens:
+            self._construire_index()
+            return
         
-        # Mettre à jour le nombre de documents pour chaque mot
-        for mot in self.vocab:
-            self.vocab[mot]['nb_documents'] = doc_freq[mot]
+        self._indexer_nouveaux_documents()
+        if self.positions:
+            self._mettre_a_jour_positions()
         
-        self.mat_TF = csr_matrix((data_tf, (row_indices, col_indices)), 
-                                  shape=(nb_docs, nb_mots))
+        # nouvelle liste de stopwords : seuls le masque et les poids sont recalculés (pas de tokenisation)
+        if self.corpus.stopwords is not self._stopwords_index:
+            self._idf_perime = True
         
-        # Calculer la matrice TFxIDF
-        self._calculer_TFxIDF()
+        # statistiques trop éloignées de celles de l'index : repondération complète
+        nb_docs = self.mat_TF.shape[0]
+        if self._idf_perime or nb_docs - self._nb_docs_reference > self.derive_max * self._nb_docs_reference:
+            self._calculer_TFxIDF()
+        elif nb_docs > self._nb_docs_ponderes:
+            with instrumentation.etape("index.tfidf"):
+                self._ponderer_nouveaux_documents()
+        else:
+            return
+        if self.dense is not None:
+            self.dense.ajouter_documents()
     
     def _calculer_TFxIDF(self):
-        nb_docs = len(self.corpus.id2doc)
-        
-        # Calculer IDF pour chaque mot
-        idf = np.zeros(len(self.vocab))
-        for mot, info in self.vocab.items():
-            mot_id = info['id']
-            nb_docs_avec_mot = info['nb_documents']
-            if nb_docs_avec_mot > 0:
-                idf[mot_id] = math.log(nb_docs / nb_docs_avec_mot)
-            else:
-                idf[mot_id] = 0
+        with instrumentation.etape("index.tfidf"):
+            self._calculer_poids()
+        with instrumentation.etape("index.index_inverse"):
+            self._construire_index_inverse()
+        self._idf_perime = False
+        self._nb_docs_ponderes = self._nb_docs_reference = self.mat_TF.shape[0]
+    
+    def _statistiques_globales(self):
+        # les statistiques globales correspondent-elles encore à l'index (aucun document indexé depuis) ?
+        return (self.statistiques is not None and self._nb_docs_statistiques == self.mat_TF.shape[0]
+                and len(self.statistiques.df) == self.mat_TF.shape[1])
+    
+    def _statistiques_index(self):
+        # StatistiquesIDF de la pondération : globales, sinon celles de mat_TF (DF = nombre de valeurs non nulles
+        # par colonne, longueurs avec et sans les colonnes de stopwords)
+        if self._statistiques_globales():
+            return self.statistiques
+        mat_TF = self.mat_TF
+        df = np.bincount(mat_TF.indices, minlength=mat_TF.shape[1])
+        longueurs = (int(mat_TF.data.sum()), int(mat_TF.data[~self.masque_stopwords[mat_TF.indices]].sum()))
+        return StatistiquesIDF(mat_TF.shape[0], df, longueurs, None)
+    
+    def statistiques_locales(self):
+        """Indexe les documents ajoutés au corpus (sans recalculer les poids) et retourne les mots du
+        vocabulaire et leurs StatistiquesIDF dans ce moteur"""
+        if self.corpus._generation_tokens != self._generation_tokens:
+            self._construire_index()
+        self._indexer_nouveaux_documents()
+        df = np.bincount(self.mat_TF.indices, minlength=self.mat_TF.shape[1])
+        stopwords = np.zeros(len(self.vocab), dtype=bool)
+        ids = self.vocab.ids(self.corpus.stopwords)
+        stopwords[ids[ids >= 0]] = True
+        longueurs = (int(self.mat_TF.data.sum()), int(self.mat_TF.data[~stopwords[self.mat_TF.indices]].sum()))
+        return self.vocab.mots(), StatistiquesIDF(self.mat_TF.shape[0], df, longueurs, None)
+    
+    def fixer_statistiques(self, statistiques):
+        """Remplace les statistiques d'IDF par des statistiques globales (df aligné sur les colonnes de ce
+        moteur ; None : retour aux statistiques locales) ; poids recalculés à la prochaine requête"""
+        self.statistiques = statistiques
+        self._nb_docs_statistiques = self.mat_TF.shape[0]
+        self._idf_perime = True
+        self.cache.vider()
+    
+    def _calculer_poids(self):
+        # statistiques de l'index (nombre de documents, DF de chaque mot, longueurs), gardées pour pondérer les
+        # documents ajoutés ensuite
+        self._stopwords_index = self.corpus.stopwords
+        self._masquer_stopwords(self._stopwords_index)
+        self._statistiques_poids = self._statistiques_index()
+        idf = _idf(self._statistiques_poids.nb_docs, self._statistiques_poids.df)
         
-        # Multiplier TF par IDF 
-        self.mat_TFxIDF = self.mat_TF.multiply(idf)
+        # Multiplier TF par IDF : mêmes valeurs non nulles que mat_TF, seul le tableau des valeurs est calculé
+        mat_TF = self.mat_TF
+        self.mat_TFxIDF = csr_matrix((mat_TF.data * idf[mat_TF.indices], mat_TF.indices, mat_TF.indptr),
+                                     shape=mat_TF.shape)
+        self.idf = self.vocab.idf = idf
+        
+        # normes des documents : calculées une seule fois par construction de l'index, pour les deux réglages
+        self._mettre_a_jour_structures()
+        lignes = _lignes(mat_TF)
+        self.normes_docs = _normes_lignes(self.mat_TFxIDF, lignes)
+        self.normes_docs_sans_stopwords = _normes_lignes(self._sans_stopwords(self.mat_TFxIDF))
+        
+        # copie L2-normalisée : le cosinus devient un simple produit matrice-vecteur
+        self.mat_TFxIDF_norm = csr_matrix((self.mat_TFxIDF.data / self.normes_docs[lignes], mat_TF.indices,
+                                           mat_TF.indptr), shape=mat_TF.shape)
+        
+        # poids des documents du scoreur (la matrice normalisée elle-même pour TF-IDF)
+        self.mat_poids = self.scoreur.poids_documents(self)
+        self.mat_poids_sans_stopwords = self.scoreur.poids_documents(self, stopwords=True)
     
-    def _vectoriser_requete(self, mots_clefs):
-        # créer un vecteur pour la requête
-        vecteur = np.zeros(len(self.vocab))
+    def _ponderer_nouveaux_documents(self):
+        # poids des documents ajoutés depuis la dernière pondération, avec les statistiques de la dernière
+        # pondération complète : leurs lignes sont ajoutées aux matrices de poids et insérées dans les index
+        # inversés, les valeurs des autres documents ne sont pas modifiées
+        premier = self._nb_docs_ponderes
+        nb_docs, df, _, _ = self._statistiques_poids
+        if len(df) < self.mat_TF.shape[1]:
+            # mots apparus depuis (seulement dans des documents ajoutés) : leur DF actuelle
+            df_nouveaux = self.vocab.nb_documents[len(df):].copy()
+            self._statistiques_poids = self._statistiques_poids._replace(df=np.concatenate([df, df_nouveaux]))
+            self.idf = self.vocab.idf = np.concatenate([self.idf, _idf(nb_docs, df_nouveaux)])
+            self._masquer_stopwords(self._stopwords_index)
         
-        mots_clefs_nettoyes = self.corpus.nettoyer_texte(mots_clefs).split()
+        bloc = self.mat_TF[premier:]
+        lignes = _lignes(bloc)
+        tfidf = csr_matrix((bloc.data * self.idf[bloc.indices], bloc.indices, bloc.indptr), shape=bloc.shape)
+        normes = _normes_lignes(tfidf, lignes)
+        tfidf_norm = csr_matrix((tfidf.data / normes[lignes], bloc.indices, bloc.indptr), shape=bloc.shape)
+        self.normes_docs = np.concatenate([self.normes_docs, normes])
+        self.normes_docs_sans_stopwords = np.concatenate([self.normes_docs_sans_stopwords,
+                                                          _normes_lignes(self._sans_stopwords(tfidf))])
+        partagee = self.mat_poids is self.mat_TFxIDF_norm
+        self.mat_TFxIDF = _empiler(self.mat_TFxIDF, tfidf)
+        self.mat_TFxIDF_norm = _empiler(self.mat_TFxIDF_norm, tfidf_norm)
         
-        for mot in mots_clefs_nettoyes:
-            if mot in self.vocab:
-                mot_id = self.vocab[mot]['id']
-                vecteur[mot_id] += 1
+        # poids du scoreur pour les deux réglages (TF-IDF : la matrice normalisée elle-même)
+        if partagee:
+            poids = tfidf_norm
+            self.mat_poids = self.mat_TFxIDF_norm
+        else:
+            poids = self.scoreur.poids_documents(self, premier=premier)
+            self.mat_poids = _empiler(self.mat_poids, poids)
+        poids_sans_stopwords = self.scoreur.poids_documents(self, stopwords=True, premier=premier)
+        self.mat_poids_sans_stopwords = _empiler(self.mat_poids_sans_stopwords, poids_sans_stopwords)
         
-        return vecteur
+        self.index_inverse, self.poids_max = _completer_index_inverse(self.index_inverse, self.poids_max, poids)
+        self.index_inverse_sans_stopwords, self.poids_max_sans_stopwords = _completer_index_inverse(
+            self.index_inverse_sans_stopwords, self.poids_max_sans_stopwords, poids_sans_stopwords)
+        self._nb_docs_ponderes = self.mat_TF.shape[0]
+    
+    def _masquer_stopwords(self, stopwords):
+        # colonnes des mots de la liste de stopwords
+        self.masque_stopwords = np.zeros(len(self.vocab), dtype=bool)
+        ids = self.vocab.ids(stopwords)
+        self.masque_stopwords[ids[ids >= 0]] = True
+    
+    def _mettre_a_jour_structures(self):
+        # structures de mat_TF, communes à toutes les matrices de poids (mêmes valeurs non nulles) : complétées
+        # pour les documents ajoutés, recalculées seulement si la liste de stopwords a changé
+        if self._stopwords_structures is not self._stopwords_index:
+            self._stopwords_TF = self._structure_sans_stopwords_TF = None
+            self._stopwords_structures = self._stopwords_index
+        self._stopwords_TF = _structure_sans_colonnes(self.mat_TF, self.masque_stopwords, self._stopwords_TF)
+        self._structure_TF = _structure_csc(self.mat_TF, self._structure_TF)
+        _, indices, indptr, _ = self._stopwords_TF
+        self._structure_sans_stopwords_TF = _structure_csc(
+            csr_matrix((np.ones(len(indices)), indices, indptr), shape=self.mat_TF.shape),
+            self._structure_sans_stopwords_TF)
+    
+    def _sans_stopwords(self, mat):
+        # copie CSR de mat (documents x mots) sans les valeurs des colonnes de stopwords ; structure précalculée
+        # pour les matrices qui partagent celle de mat_TF
+        if mat.indptr is self.mat_TF.indptr and self._stopwords_TF is not None:
+            gardes, indices, indptr, _ = self._stopwords_TF
+        else:
+            gardes, indices, indptr, _ = _structure_sans_colonnes(mat, self.masque_stopwords)
+        return csr_matrix((mat.data[gardes], indices, indptr), shape=mat.shape)
+    
+    def _construire_index_inverse(self):
+        # poids réordonnés selon l'ordre CSC des valeurs de mat_TF (_mettre_a_jour_structures), sans conversion
+        self.index_inverse, self.poids_max = _index_inverse(self.mat_poids, self._structure_TF)
+        self.index_inverse_sans_stopwords, self.poids_max_sans_stopwords = _index_inverse(
+            self.mat_poids_sans_stopwords, self._structure_sans_stopwords_TF)
+    
+    def _reglage_stopwords(self, stopwords):
+        # réglage d'une requête : celui du corpus par défaut
+        return self.corpus.stopwords_enabled if stopwords is None else bool(stopwords)
+    
+    def _poids(self, stopwords):
+        # (poids des documents, index inversé, bornes max-score) du réglage stopwords demandé
+        if stopwords:
+            return self.mat_poids_sans_stopwords, self.index_inverse_sans_stopwords, self.poids_max_sans_stopwords
+        return self.mat_poids, self.index_inverse, self.poids_max
+    
+    def postings(self, mot, stopwords=None):
+        """Retourne la liste de postings d'un mot : (doc_ids, poids du scoreur)"""
+        self.mettre_a_jour()
+        _, index_inverse, _ = self._poids(self._reglage_stopwords(stopwords))
+        mot_id = self.vocab.id(mot)
+        if mot_id < 0:
+            return np.array([], dtype=np.int32), np.array([])
+        debut = index_inverse.indptr[mot_id]
+        fin = index_inverse.indptr[mot_id + 1]
+        return index_inverse.indices[debut:fin], index_inverse.data[debut:fin]
+    
+    def _colonnes_requete(self, mots_clefs, inconnus=False, stopwords=None):
+        # ids des mots de la requête présents dans le vocabulaire (avec répétitions ;
+        # inconnus=True : les mots absents sont gardés avec l'id -1)
+        ids = [self.vocab.id(mot) for mot in self.corpus.tokeniser(mots_clefs, stopwords)]
+        if inconnus:
+            return ids
+        return [mot_id for mot_id in ids if mot_id >= 0]
+    
+    def _vectoriser_requete(self, mots_clefs, stopwords=None):
+        # créer un vecteur creux (1 x taille du vocabulaire) pour la requête
+        with instrumentation.etape("search.nettoyer_texte"):
+            colonnes = self._colonnes_requete(mots_clefs, stopwords=stopwords)
+        
+        # les doublons sont additionnés à la construction de la matrice
+        return csr_matrix((np.ones(len(colonnes)), (np.zeros(len(colonnes), dtype=int), colonnes)),
+                          shape=(1, len(self.vocab)))
     
     def _similarite_cosinus(self, vecteur_requete, matrice_docs):
-        # calculer le produit scalaire entre la requête et tous les documents
-        scores = matrice_docs.dot(vecteur_requete)
+        norme_requete = np.sqrt(vecteur_requete.multiply(vecteur_requete).sum())
+        if norme_requete == 0:
+            return np.zeros(matrice_docs.shape[0])
+        
+        if matrice_docs is self.mat_TFxIDF:
+            # normes précalculées : un seul produit creux sur la matrice normalisée
+            scores = self.mat_TFxIDF_norm.dot(vecteur_requete.T).toarray().ravel()
+            return scores / norme_requete
         
-        # ccalculer les normes
-        norme_requete = np.linalg.norm(vecteur_requete)
-        normes_docs = np.sqrt(matrice_docs.multiply(matrice_docs).sum(axis=1).A1)
+        # autre matrice : calculer le produit scalaire et les normes
+        matrice_docs = csr_matrix(matrice_docs)
+        scores = matrice_docs.dot(vecteur_requete.T).toarray().ravel()
+        normes_docs = np.sqrt(np.asarray(matrice_docs.multiply(matrice_docs).sum(axis=1)).ravel())
         
         # Éviter la division par zéro
         normes_docs[normes_docs == 0] = 1
         
-        if norme_requete == 0:
-            return np.zeros(len(scores))
-        
         # calculer la similarité cosinus
         similarites = scores / (normes_docs * norme_requete)
         
         return similarites
     
-    def search(self, mots_clefs, nb_resultats=10):
+    def _scores_index(self, vecteur_requete, nb_resultats=None, masque=None, stopwords=False):
+        # score terme par terme : on ne parcourt que les postings des mots de la requête
+        # (masque : documents autorisés, appliqué à chaque liste avant l'accumulation)
+        _, index_inverse, poids_max = self._poids(stopwords)
+        termes = vecteur_requete.indices
+        docs_acc = np.array([], dtype=index_inverse.indices.dtype)
+        scores_acc = np.array([])
+        if len(termes) == 0:
+            return docs_acc, scores_acc
+        
+        # les mots les plus contributifs d'abord
+        poids_requete = self.scoreur.poids_requete(vecteur_requete.data)
+        bornes = poids_max[termes] * poids_requete
+        ordre = np.argsort(-bornes, kind="stable")
+        termes, poids_requete, bornes = termes[ordre], poids_requete[ordre], bornes[ordre]
+        # restes[i] = score maximal apportable par les mots i, i+1, ...
+        restes = np.cumsum(bornes[::-1])[::-1]
+        
+        candidats_fermes = False
+        for i, mot_id in enumerate(termes):
+            debut = index_inverse.indptr[mot_id]
+            fin = index_inverse.indptr[mot_id + 1]
+            docs = index_inverse.indices[debut:fin]
+            contributions = index_inverse.data[debut:fin] * poids_requete[i]
+            instrumentation.compter("search.postings", fin - debut)
+            if masque is not None:
+                autorises = masque[docs]
+                docs, contributions = docs[autorises], contributions[autorises]
+            
+            if candidats_fermes:
+                # max-score : un nouveau document ne peut plus entrer dans le top-k,
+                # on complète uniquement les scores des candidats existants
+                pos = np.searchsorted(docs_acc, docs)
+                pos[pos == len(docs_acc)] = 0
+                trouves = docs_acc[pos] == docs
+                scores_acc[pos[trouves]] += contributions[trouves]
+            else:
+                tous_docs = np.concatenate([docs_acc, docs])
+                docs_acc, inverse = np.unique(tous_docs, return_inverse=True)
+                scores_acc = np.bincount(inverse, weights=np.concatenate([scores_acc, contributions]),
+                                         minlength=len(docs_acc))
+            
+            if (self.arret_anticipe and nb_resultats and not candidats_fermes
+                    and i + 1 < len(termes) and len(docs_acc) >= nb_resultats):
+                seuil = np.partition(scores_acc, -nb_resultats)[-nb_resultats]
+                candidats_fermes = restes[i + 1] < seuil
+        
+        return docs_acc, scores_acc
+    
+    def construire_dense(self, **options):
+        """Construit l'index dense (LSA) utilisé par le backend "dense" ; options : voir IndexDense. Contrairement
+        aux backends "index" et "matrice", qui écartent les documents de score nul, ce backend garde aussi les
+        candidats sans mot commun avec la requête (score exact nul) : ils suivent, par proximité dense"""
+        self.mettre_a_jour()
+        self.dense = IndexDense(self, **options)
+        self.cache.vider() # résultats du backend "dense" calculés avec l'ancien index dense
+        return self.dense
+    
+    def _scores_dense(self, vecteur_requete, nb_resultats=None, masque=None, stopwords=False):
+        # candidats de l'index dense, reclassés par le score exact du scoreur
+        if self.dense is None:
+            self.construire_dense()
+        termes = vecteur_requete.indices
+        with instrumentation.etape("search.dense"):
+            requete = self.dense.projeter(termes, vecteur_requete.data * self.idf[termes])
+            nb = max(self.dense.nb_candidats, nb_resultats or self.mat_TF.shape[0])
+            docs, scores_denses = self.dense.candidats(requete, nb, masque)
+        
+        with instrumentation.etape("search.reclassement"):
+            poids = csr_matrix((self.scoreur.poids_requete(vecteur_requete.data), termes, [0, len(termes)]),
+                               shape=vecteur_requete.shape)
+            exacts = self._poids(stopwords)[0][docs].dot(poids.T).toarray().ravel()
+            # score exact décroissant ; les documents sans mot commun avec la requête suivent, par
+            # proximité dense (c'est ce qui rattrape "neural nets" -> "neural network")
+            ordre = np.lexsort((docs, -scores_denses, -exacts))
+            ordre = ordre[(exacts[ordre] > 0) | (scores_denses[ordre] > 0)][:nb_resultats]
+            return docs[ordre], exacts[ordre]
+    
+    @staticmethod
+    def _top_k(docs, scores, k):
+        # sélection partielle : on écarte les scores nuls puis on ne trie que les k meilleurs
+        positifs = scores > 0
+        docs, scores = docs[positifs], scores[positifs]
+        if k is not None and len(scores) > k:
+            # k-ième score puis tous les documents qui l'atteignent : les ex aequo ne sont pas choisis au hasard
+            # par la partition, le tri ci-dessous les départage
+            seuil = -np.partition(-scores, k - 1)[k - 1]
+            gardes = scores >= seuil
+            docs, scores = docs[gardes], scores[gardes]
+        # score décroissant, puis id croissant en cas d'égalité
+        ordre = np.lexsort((docs, -scores))[:k]
+        return docs[ordre], scores[ordre]
+    
+    def _analyser_requete(self, mots_clefs, stopwords=None):
+        # extrait les opérateurs : "phrase exacte" et mot1 NEAR/k mot2 (NEAR/k' mot3...) ; leurs mots sont
+        # cherchés tels quels (stopwords compris, l'index positionnel les contient), seul le score dépend du
+        # réglage stopwords
+        contraintes = []
+        for phrase in _RE_PHRASE.findall(mots_clefs):
+            contraintes.append(("phrase", self._colonnes_requete(phrase, inconnus=True, stopwords=False)))
+        mots_clefs = _RE_PHRASE.sub(lambda m: " " + m.group(1) + " ", mots_clefs)
+        
+        for chaine in _RE_PROCHE.findall(mots_clefs):
+            parties = _RE_NEAR.split(chaine)
+            termes = [self._colonnes_requete(terme, inconnus=True, stopwords=False) for terme in parties[::2]]
+            if all(termes):
+                # un terme de plusieurs mots est relié au terme précédent par son premier mot et au suivant par son
+                # dernier : il coupe la chaîne en deux contraintes indépendantes
+                mots, distances = [termes[0][-1]], []
+                for cols, distance in zip(termes[1:], parties[1::2]):
+                    mots.append(cols[0])
+                    distances.append(int(distance))
+                    if len(cols) > 1:
+                        contraintes.append(("proche", mots, distances))
+                        mots, distances = [cols[-1]], []
+                if distances:
+                    contraintes.append(("proche", mots, distances))
+        mots_clefs = _RE_PROCHE.sub(lambda m: " " + " ".join(_RE_NEAR.split(m.group(0))[::2]) + " ", mots_clefs)
+        
+        # préfixes : learn* remplacé par les mots du vocabulaire qui commencent par "learn"
+        mots_clefs = _RE_PREFIXE.sub(lambda m: self._etendre_prefixe(m, stopwords), mots_clefs)
+        
+        # le texte restant (mots des phrases compris) sert au score
+        return mots_clefs, [c for c in contraintes if c[0] != "phrase" or c[1]]
+    
+    def _etendre_prefixe(self, correspondance, stopwords=None):
+        mots = tokeniser_texte(correspondance.group(1))
+        if not mots:
+            return " "
+        return " " + " ".join(mots[:-1] + self.completer(mots[-1], MAX_EXPANSIONS, stopwords)) + " "
+    
+    def completer(self, debut, n=10, stopwords=None):
+        """Autocomplétion : les n mots les plus fréquents commençant par debut"""
+        self.mettre_a_jour()
+        if not debut:
+            return []
+        ids = self.vocab.prefixe(debut.lower())
+        if self._reglage_stopwords(stopwords):
+            ids = ids[~self.masque_stopwords[ids]]
+        # occurrences décroissantes, puis ordre alphabétique
+        ids = ids[np.argsort(-self.vocab.total_occurrences[ids], kind="stable")[:n]]
+        return [self.vocab.mot(mot_id) for mot_id in ids]
+    
+    def _mettre_a_jour_positions(self):
+        # ajoute un segment d'index positionnel pour les documents indexés depuis le dernier appel
+        premier = self._nb_docs_positionnels
+        if premier >= self._nb_docs_indexes:
+            return
+        if len(self._segments_positionnels) >= 8:
+            # trop de petits segments : on les fusionne en un seul
+            self._segments_positionnels = []
+            premier = 0
+        
+        with instrumentation.etape("index.positions"):
+            self._ajouter_segment_positionnel(premier)
+    
+    def _ajouter_segment_positionnel(self, premier):
+        doc_ids = range(premier, self._nb_docs_indexes)
+        tokens = self.corpus.tokens_documents(doc_ids)
+        colonnes = self._colonnes_termes(np.concatenate(tokens)) if tokens else np.array([], dtype=np.int64)
+        tokens_colonnes = np.split(colonnes, np.cumsum([len(t) for t in tokens])[:-1])
+        self._segments_positionnels.append(IndexPositionnel(tokens_colonnes, premier, len(self.vocab)))
+        self._nb_docs_positionnels = self._nb_docs_indexes
+    
+    def _documents_contraints(self, contraintes):
+        # documents respectant toutes les contraintes (phrases, proximité), via l'index positionnel
+        self._mettre_a_jour_positions()
+        autorises = None
+        for contrainte in contraintes:
+            if contrainte[0] == "phrase":
+                mots_ids = contrainte[1]
+                if -1 in mots_ids: # mot absent du vocabulaire
+                    docs = np.array([], dtype=np.int64)
+                else:
+                    docs = np.concatenate([segment.phrase(mots_ids)[0] for segment in self._segments_positionnels])
+            else:
+                _, mots_ids, distances = contrainte
+                if -1 in mots_ids:
+                    docs = np.array([], dtype=np.int64)
+                else:
+                    docs = np.concatenate([segment.chaine_proche(mots_ids, distances)
+                                           for segment in self._segments_positionnels])
+            autorises = docs if autorises is None else np.intersect1d(autorises, docs)
+        return autorises
+    
+    def _restreindre(self, masque, contraintes):
+        # masque des filtres (None : aucun) restreint aux documents qui respectent les opérateurs
+        if not contraintes:
+            return masque
+        contraints = np.zeros(self.mat_TF.shape[0], dtype=bool)
+        contraints[self._documents_contraints(contraintes)] = True
+        return contraints if masque is None else masque & contraints
+    
+    def _cle_cache(self, mots_clefs, nb_resultats, filtres, stopwords):
+        # requête normalisée : mots nettoyés, opérateurs de phrase / proximité, réglage stopwords, k, filtres et
+        # backend (les candidats du backend "dense" diffèrent ; le cache est vidé quand l'index dense change)
+        phrases = tuple(self.corpus.nettoyer_texte(phrase, False) for phrase in _RE_PHRASE.findall(mots_clefs))
+        proches = tuple(tuple(int(partie) if i % 2 else self.corpus.nettoyer_texte(partie, False)
+                              for i, partie in enumerate(_RE_NEAR.split(chaine)))
+                        for chaine in _RE_PROCHE.findall(_RE_PHRASE.sub(" ", mots_clefs)))
+        prefixes = tuple(_RE_PREFIXE.findall(mots_clefs))
+        filtres = tuple((nom, tuple(valeur) if isinstance(valeur, (list, tuple, set)) else valeur)
+                        for nom, valeur in sorted(filtres.items()) if valeur is not None)
+        return (self.corpus.nettoyer_texte(mots_clefs, stopwords), phrases, proches, prefixes,
+                stopwords, nb_resultats, filtres, self.backend)
+    
+    def search(self, mots_clefs, nb_resultats=10, dataframe=True,
+               type_doc=None, auteur=None, date_debut=None, date_fin=None, stopwords=None, doublons=False):
+        with instrumentation.etape("search"):
+            return self._search(mots_clefs, nb_resultats, dataframe, type_doc, auteur, date_debut, date_fin,
+                                stopwords, doublons)
+    
+    def _search(self, mots_clefs, nb_resultats, dataframe, type_doc, auteur, date_debut, date_fin, stopwords,
+                doublons=False):
+        # filtres optionnels (appliqués avant la sélection du top-k) : type(s) de document,
+        # auteur(s), plage de dates [date_debut, date_fin]
+        filtres = {"type_doc": type_doc, "auteur": auteur, "date_debut": date_debut, "date_fin": date_fin}
+        # stopwords : True / False pour cette requête, None pour le réglage du corpus
+        stopwords = self._reglage_stopwords(stopwords)
+        
+        # requête déjà calculée pour cette version du corpus : résultat en cache
+        instrumentation.compter("search.requetes")
+        version = self.corpus.version if self._version_figee is None else self._version_figee
+        with instrumentation.etape("search.cache"):
+            cle = self._cle_cache(mots_clefs, nb_resultats, filtres, stopwords)
+            resultats = self.cache.get(cle, version)
+        if resultats is None:
+            resultats = self._rechercher(mots_clefs, nb_resultats, filtres, stopwords)
+            self.cache.put(cle, resultats, version)
+        
+        # les quasi-doublons (jamais indexés) sont regroupés sous leur document ; doublons=True les affiche
+        if doublons:
+            resultats = Resultats(self.corpus, resultats.doc_ids, resultats.scores, doublons=True)
+        
+        # le DataFrame n'est construit que si l'appelant le demande
+        if not dataframe:
+            return resultats
+        with instrumentation.etape("search.dataframe"):
+            return resultats.to_dataframe()
+    
+    def figer(self):
+        """Fige le moteur : index complet construit une fois, plus aucune mise à jour (lecture seule,
+        utilisable depuis plusieurs threads) ; les documents ajoutés ensuite au corpus sont ignorés"""
+        self.mettre_a_jour()
+        self._mettre_a_jour_positions()
+        self._ordre_dates = np.argsort(self.dates, kind="stable")
+        if self.backend == "dense" and self.dense is None:
+            self.construire_dense()
+        self._version_figee = self.corpus.version
+        return self
+    
+    def stats_cache(self):
+        """Compteurs du cache de résultats (hits, misses, evictions, invalidations)"""
+        return self.cache.stats()
+    
+    def _rechercher(self, mots_clefs, nb_resultats, filtres, stopwords=False):
+        # prendre en compte les documents ajoutés depuis la dernière requête
+        with instrumentation.etape("search.mise_a_jour"):
+            self.mettre_a_jour()
+        
+        # filtres de métadonnées, puis opérateurs de phrase / proximité (index positionnel)
+        with instrumentation.etape("search.filtres"):
+            mots_clefs, contraintes = self._analyser_requete(mots_clefs, stopwords)
+            masque = self._restreindre(self._masque_filtres(**filtres), contraintes)
+        
         # Vectoriser la req
-        vecteur_requete = self._vectoriser_requete(mots_clefs)
+        with instrumentation.etape("search.vectoriser"):
+            vecteur_requete = self._vectoriser_requete(mots_clefs, stopwords)
         
-        # la similarité cosinus avec TFxIDF
-        scores = self._similarite_cosinus(vecteur_requete, self.mat_TFxIDF)
+        if self.backend == "dense":
+            docs, scores = self._scores_dense(vecteur_requete, nb_resultats, masque, stopwords)
+        else:
+            with instrumentation.etape("search.scores"):
+                if self.backend == "index":
+                    # index inversé : seuls les documents contenant un mot de la requête sont scorés
+                    docs, scores = self._scores_index(vecteur_requete, nb_resultats, masque, stopwords)
+                else:
+                    # produit complet (similarité cosinus avec TFxIDF, ou poids BM25)
+                    mat_poids = self._poids(stopwords)[0]
+                    scores = self.scoreur.scores_matrice(self, vecteur_requete, mat_poids)
+                    docs = np.arange(len(scores))
+                    instrumentation.compter("search.postings", mat_poids.nnz)
+                    if masque is not None:
+                        docs, scores = docs[masque], scores[masque]
+            
+            # garder les meilleurs documents, triés par score décroissant
+            with instrumentation.etape("search.top_k"):
+                docs, scores = self._top_k(docs, scores, nb_resultats)
         
-        # Trier les docs par score décroissant
-        indices_tries = np.argsort(scores)[::-1][:nb_resultats]
+        # statistiques globales : la requête compte aussi les mots connus des autres shards seulement
+        if self._statistiques_globales():
+            scores = scores * self.scoreur.facteur_global(vecteur_requete.data,
+                                                          self._comptes_requete_globale(mots_clefs, stopwords))
+        return Resultats(self.corpus, docs, scores)
+    
+    def _comptes_requete_globale(self, mots_clefs, stopwords=None):
+        # nombre d'occurrences de chaque mot de la requête présent dans un des shards
+        mots = [mot for mot in self.corpus.tokeniser(mots_clefs, stopwords) if mot in self.statistiques.mots]
+        return np.unique(mots, return_counts=True)[1].astype(float)
+    
+    def _vectoriser_requetes(self, requetes, stopwords=None):
+        # matrice creuse CSR (une ligne par requête) des occurrences de chaque mot, à pondérer par le scoreur
+        lignes, colonnes = [], []
+        deja_vues = {} # une requête répétée n'est nettoyée qu'une fois
+        for i, requete in enumerate(requetes):
+            if requete not in deja_vues:
+                deja_vues[requete] = self._colonnes_requete(requete, stopwords=stopwords)
+            cols = deja_vues[requete]
+            lignes.extend([i] * len(cols))
+            colonnes.extend(cols)
+        
+        return csr_matrix((np.ones(len(colonnes)), (lignes, colonnes)), shape=(len(requetes), len(self.vocab)))
+    
+    def search_many(self, requetes, k=10, taille_lot=1000, stopwords=None,
+                    type_doc=None, auteur=None, date_debut=None, date_fin=None):
+        """Recherche par lot : une liste de Resultats (un par requête), dans l'ordre des requêtes ; mêmes
+        opérateurs et filtres que search, appliqués à chaque ligne de la matrice des scores"""
+        self.mettre_a_jour()
+        stopwords = self._reglage_stopwords(stopwords)
+        filtres = {"type_doc": type_doc, "auteur": auteur, "date_debut": date_debut, "date_fin": date_fin}
+        requetes = list(requetes)
+        if self.backend == "dense":
+            # candidats propres à chaque requête (index dense) : pas de produit par lot
+            return [self._rechercher(requete, k, filtres, stopwords) for requete in requetes]
         
-        # Créer le DataFrame de résultats
+        _, index_inverse, _ = self._poids(stopwords)
+        globales = self._statistiques_globales()
+        masque_filtres = self._masque_filtres(**filtres)
         resultats = []
-        for idx in indices_tries:
-            if scores[idx] > 0:
-                doc = self.corpus.id2doc[idx]
-                resultats.append({
-                    'doc_id': idx,
-                    'titre': doc.titre,
-                    'auteur': doc.auteur,
-                    'date': doc.date,
-                    'url': doc.url,
-                    'score': scores[idx],
-                    'type': doc.getType()
-                })
-        
-        return pd.DataFrame(resultats)
+        
+        # traitement par lots pour borner la mémoire de la matrice des scores
+        taille_lot = taille_lot or max(len(requetes), 1)
+        for debut in range(0, len(requetes), taille_lot):
+            # opérateurs extraits de chaque requête : le texte restant (préfixes étendus) est vectorisé
+            lot = requetes[debut:debut + taille_lot]
+            analyses = [self._analyser_requete(requete, stopwords) for requete in lot]
+            comptes = self._vectoriser_requetes([texte for texte, _ in analyses], stopwords)
+            
+            # un seul produit creux matrice-matrice : (requêtes x vocab) . (vocab x docs)
+            mat_scores = csr_matrix(self.scoreur.poids_requetes(comptes).dot(index_inverse.T))
+            
+            # seuls les scores non nuls de chaque ligne (documents autorisés) sont candidats au top-k
+            for i, (texte, contraintes) in enumerate(analyses):
+                debut_ligne, fin_ligne = mat_scores.indptr[i], mat_scores.indptr[i + 1]
+                docs = mat_scores.indices[debut_ligne:fin_ligne]
+                scores = mat_scores.data[debut_ligne:fin_ligne]
+                masque = self._restreindre(masque_filtres, contraintes)
+                if masque is not None:
+                    autorises = masque[docs]
+                    docs, scores = docs[autorises], scores[autorises]
+                docs, scores = self._top_k(docs, scores, k)
+                # statistiques globales : même normalisation de la requête que search
+                if globales:
+                    scores = scores * self.scoreur.facteur_global(
+                        comptes.data[comptes.indptr[i]:comptes.indptr[i + 1]],
+                        self._comptes_requete_globale(texte, stopwords))
+                resultats.append(Resultats(self.corpus, docs, scores))
+        
+        return resultats
+    
+    # --- Sauvegarde / chargement de l'index ---
+    
+    @staticmethod
+    def empreinte(corpus, fichier_corpus):
+        """Empreinte du fichier corpus et des réglages de tokenisation"""
+        h = hashlib.sha256()
+        with open(fichier_corpus, "rb") as f:
+            for bloc in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloc)
+        reglages = {
+            "version": VERSION_INDEX,
+            "stopwords": sorted(corpus.stopwords),
+        }
+        h.update(json.dumps(reglages, sort_keys=True).encode("utf-8"))
+        return h.hexdigest()
+    
+    def save(self, chemin, empreinte=None):
+        """Sauvegarde l'index dans un dossier (tableaux .npy + meta.json) ; écrit dans un dossier temporaire
+        qui remplace l'ancien à la fin (un moteur chargé depuis ce dossier peut y être sauvegardé)"""
+        self.mettre_a_jour()
+        if self._nb_docs_reference != self.mat_TF.shape[0]:
+            self._calculer_TFxIDF() # poids sauvegardés avec les statistiques de tous les documents
+        dossier = os.path.normpath(chemin)
+        temporaire = dossier + ".tmp"
+        shutil.rmtree(temporaire, ignore_errors=True) # sauvegarde interrompue
+        os.makedirs(temporaire)
+        
+        # vocabulaire : un seul buffer UTF-8 (les mots ne contiennent pas d'espace), ordre des ids
+        np.save(os.path.join(temporaire, "vocab.npy"), np.frombuffer(self.vocab.buffer(), dtype=np.uint8))
+        np.save(os.path.join(temporaire, "vocab_tri.npy"), self.vocab.tri())
+        np.save(os.path.join(temporaire, "total_occurrences.npy"), self.vocab.total_occurrences)
+        
+        for nom, mat in [("mat_TF", self.mat_TF), ("mat_TFxIDF", self.mat_TFxIDF),
+                         ("mat_TFxIDF_norm", self.mat_TFxIDF_norm), ("index_inverse", self.index_inverse)]:
+            for partie in ("data", "indices", "indptr"):
+                np.save(os.path.join(temporaire, f"{nom}.{partie}.npy"), getattr(mat, partie))
+        np.save(os.path.join(temporaire, "idf.npy"), self.idf)
+        np.save(os.path.join(temporaire, "normes_docs.npy"), self.normes_docs)
+        np.save(os.path.join(temporaire, "poids_max.npy"), self.poids_max)
+        if self.mat_poids is not self.mat_TFxIDF_norm:
+            for partie in ("data", "indices", "indptr"):
+                np.save(os.path.join(temporaire, f"mat_poids.{partie}.npy"), getattr(self.mat_poids, partie))
+        
+        # poids du réglage "stopwords supprimés"
+        for nom, mat in [("mat_poids_sans_stopwords", self.mat_poids_sans_stopwords),
+                         ("index_inverse_sans_stopwords", self.index_inverse_sans_stopwords)]:
+            for partie in ("data", "indices", "indptr"):
+                np.save(os.path.join(temporaire, f"{nom}.{partie}.npy"), getattr(mat, partie))
+        np.save(os.path.join(temporaire, "normes_docs_sans_stopwords.npy"), self.normes_docs_sans_stopwords)
+        np.save(os.path.join(temporaire, "poids_max_sans_stopwords.npy"), self.poids_max_sans_stopwords)
+        if self.dense is not None:
+            self.dense.save(temporaire)
+        
+        # meta.json écrit en dernier : sa présence signifie que l'index est complet
+        meta = {
+            "version": VERSION_INDEX,
+            "empreinte": empreinte,
+            "nb_docs": int(self.mat_TF.shape[0]),
+            "nb_mots": int(self.mat_TF.shape[1]),
+            "stopwords": sorted(self._stopwords_index),
+            "scoreur": self.scoreur.nom,
+            "parametres_scoreur": self.scoreur.parametres(),
+            "dense": self.dense is not None,
+        }
+        with open(os.path.join(temporaire, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        
+        # remplacement : l'ancien dossier est renommé puis supprimé (ses fichiers restent lisibles par les
+        # memmap d'un moteur chargé depuis lui, sous Unix) ; interrompu, le dossier manque et l'index est
+        # reconstruit par charger_ou_construire
+        ancien = dossier + ".ancien"
+        shutil.rmtree(ancien, ignore_errors=True)
+        if os.path.exists(dossier):
+            os.replace(dossier, ancien)
+        os.replace(temporaire, dossier)
+        shutil.rmtree(ancien, ignore_errors=True)
+    
+    @classmethod
+    def load(cls, chemin, corpus, empreinte=None, **options):
+        """Recharge un index sauvegardé (tableaux projetés en mémoire avec np.memmap) ; options : celles du
+        constructeur (backend, scorer, taille_cache, positions...), une option inconnue lève une TypeError"""
+        with open(os.path.join(chemin, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["version"] != VERSION_INDEX:
+            raise ValueError(f"Version d'index incompatible : {meta['version']}")
+        if empreinte is not None and meta["empreinte"] != empreinte:
+            raise ValueError("L'index ne correspond pas au corpus (empreinte différente)")
+        if meta["nb_docs"] != len(corpus.id2doc):
+            raise ValueError("L'index ne correspond pas au nombre de documents du corpus")
+        
+        def charger(nom):
+            return np.load(os.path.join(chemin, nom + ".npy"), mmap_mode="r")
+        
+        moteur = cls(corpus, construire=False, **options)
+        if (meta.get("scoreur", "tfidf") != moteur.scoreur.nom
+                or meta.get("parametres_scoreur", {}) != moteur.scoreur.parametres()):
+            raise ValueError("L'index a été construit avec un autre scoreur")
+        
+        forme = (meta["nb_docs"], meta["nb_mots"])
+        for nom, format_mat in [("mat_TF", csr_matrix), ("mat_TFxIDF", csr_matrix),
+                                ("mat_TFxIDF_norm", csr_matrix), ("index_inverse", csc_matrix)]:
+            mat = format_mat((charger(nom + ".data"), charger(nom + ".indices"), charger(nom + ".indptr")),
+                             shape=forme, copy=False)
+            setattr(moteur, nom, mat)
+        moteur.idf = charger("idf")
+        moteur.normes_docs = charger("normes_docs")
+        moteur.poids_max = charger("poids_max")
+        if moteur.scoreur.nom == "tfidf":
+            moteur.mat_poids = moteur.mat_TFxIDF_norm
+        else:
+            moteur.mat_poids = csr_matrix((charger("mat_poids.data"), charger("mat_poids.indices"),
+                                           charger("mat_poids.indptr")), shape=forme, copy=False)
+        for nom, format_mat in [("mat_poids_sans_stopwords", csr_matrix),
+                                ("index_inverse_sans_stopwords", csc_matrix)]:
+            setattr(moteur, nom, format_mat((charger(nom + ".data"), charger(nom + ".indices"),
+                                             charger(nom + ".indptr")), shape=forme, copy=False))
+        moteur.normes_docs_sans_stopwords = charger("normes_docs_sans_stopwords")
+        moteur.poids_max_sans_stopwords = charger("poids_max_sans_stopwords")
+        
+        # vocabulaire (ids = ordre des mots dans le buffer) ; ordre alphabétique recalculé pour un ancien index
+        tri = charger("vocab_tri") if os.path.exists(os.path.join(chemin, "vocab_tri.npy")) else None
+        moteur.vocab = Vocabulaire.depuis_buffer(bytes(charger("vocab")) if meta["nb_mots"] else b"",
+                                                 charger("total_occurrences"),
+                                                 np.diff(moteur.index_inverse.indptr), tri)
+        moteur.vocab.idf = moteur.idf
+        
+        if meta.get("dense"):
+            moteur.dense = IndexDense.load(chemin, moteur)
+        
+        moteur._ajouter_metadonnees(range(meta["nb_docs"]))
+        moteur._nb_docs_indexes = meta["nb_docs"]
+        # poids calculés avec une autre liste de stopwords : recalculés à la première mise à jour
+        stopwords = frozenset(meta["stopwords"])
+        moteur._stopwords_index = corpus.stopwords if stopwords == corpus.stopwords else stopwords
+        moteur._masquer_stopwords(stopwords)
+        moteur._statistiques_poids = moteur._statistiques_index()
+        moteur._nb_docs_ponderes = moteur._nb_docs_reference = meta["nb_docs"]
+        moteur._generation_tokens = corpus._generation_tokens
+        if moteur.positions:
+            moteur._mettre_a_jour_positions() # index positionnel non sauvegardé : construit au chargement
+        return moteur
+    
+    @classmethod
+    def charger_ou_construire(cls, corpus, chemin, fichier_corpus, **kwargs):
+        """Réutilise l'index sauvegardé si l'empreinte correspond, sinon le reconstruit et le sauvegarde"""
+        empreinte = cls.empreinte(corpus, fichier_corpus)
+        if os.path.exists(os.path.join(chemin, "meta.json")):
+            try:
+                return cls.load(chemin, corpus, empreinte=empreinte, **kwargs)
+            except ValueError:
+                pass # index périmé : on le reconstruit
+        moteur = cls(corpus, **kwargs)
+        moteur.save(chemin, empreinte=empreinte)
+        return moteur
     
     def afficher_stats_vocab(self):
         print(f"Taille du vocabulaire : {len(self.vocab)} mots")
         print(f"\nExemple de mots dans le vocabulaire :")
-        for i, (mot, info) in enumerate(list(self.vocab.items())[:10]):
-            print(f"  - {mot} : {info['total_occurrences']} occurrences, "
-                  f"{info['nb_documents']} documents")
\ No newline at end of file
+        for mot_id in range(min(10, len(self.vocab))):
+            print(f"  - {self.vocab.mot(mot_id)} : {self.vocab.total_occurrences[mot_id]} occurrences, "
+                  f"{self.vocab.nb_documents[mot_id]} documents")
\ No newline at end of file
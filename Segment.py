@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Segments binaires du corpus (alternative au TSV, sans analyse de texte au chargement).
+
+Un segment est un fichier :
+    MAGIC (8 octets) | longueur de l'entête (uint64) | entête JSON | sections alignées sur 8 octets
+L'entête donne, pour chaque section, sa position (depuis la fin de l'entête), son dtype et son nombre
+d'éléments. Les colonnes fixes (type, auteur, date, nombre de commentaires) sont des tableaux NumPy ; titres,
+urls, textes, noms d'auteurs et co-auteurs sont des blobs UTF-8 concaténés, avec le tableau des positions de
+fin de chaque chaîne.
+
+Un dossier contient des segments numérotés : chaque sauvegarde écrit les nouveaux documents dans un segment
+de plus, la compaction les fusionne en un seul.
+"""
+
+import json
+import mmap
+import os
+import re
+import numpy as np
+from StockDocuments import StockDocuments
+
+MAGIC = b"CORPSEG1"
+VERSION_SEGMENT = 1
+
+_NOM_SEGMENT = re.compile(r"^segment_(\d{6})\.seg$")
+
+
+def chemin_segment(dossier, numero):
+    return os.path.join(dossier, f"segment_{numero:06d}.seg")
+
+
+def _chaines(chaines):
+    # liste de chaînes -> (blob UTF-8, positions de fin)
+    encodees = [chaine.encode("utf-8") for chaine in chaines]
+    return b"".join(encodees), np.cumsum([len(e) for e in encodees], dtype=np.int64)
+
+
+def ecrire_segment(chemin, stock, debut=0, fin=None, remplace=()):
+    """Écrit les documents debut..fin-1 d'un StockDocuments dans un fichier segment (fichier temporaire
+    renommé à la fin) ; remplace : noms des segments que celui-ci fusionne"""
+    fin = len(stock) if fin is None else fin
+    ids = range(debut, fin)
+
+    ids_auteurs, auteurs = np.unique(stock.colonne("auteurs", ids), return_inverse=True)
+    noms = [stock.noms_auteurs[i] for i in ids_auteurs.tolist()]
+    co_docs = sorted(doc_id for doc_id in stock.co_auteurs if debut <= doc_id < fin)
+    co_auteurs = [stock.co_auteurs[doc_id] for doc_id in co_docs]
+
+    # sections : (nom, tableau) ou (nom, tranches d'octets) pour les blobs
+    sections = [
+        ("types", stock.colonne("types", ids)),
+        ("auteurs", auteurs.astype(np.int32)),
+        ("dates", stock.colonne("dates", ids)),
+        ("num_comments", stock.colonne("num_comments", ids)),
+    ]
+    for nom in ("titres", "urls", "textes"):
+        tranches = list(getattr(stock, nom).tranches(debut, fin))
+        decalages = np.cumsum([0] + [len(octets) for octets, _ in tranches[:-1]])
+        fins = [f + d for (_, f), d in zip(tranches, decalages)]
+        sections.append((nom + "_fins", np.concatenate(fins) if fins else np.array([], dtype=np.int64)))
+        sections.append((nom, [octets for octets, _ in tranches]))
+    for nom, chaines in (("noms_auteurs", [n if isinstance(n, str) else "" for n in noms]),
+                         ("co_auteurs", [c for liste in co_auteurs for c in liste])):
+        blob, fins = _chaines(chaines)
+        sections.append((nom + "_fins", fins))
+        sections.append((nom, [blob]))
+    sections.append(("co_auteurs_docs", np.array(co_docs, dtype=np.int64) - debut))
+    sections.append(("co_auteurs_nb", np.cumsum([len(c) for c in co_auteurs], dtype=np.int64)))
+
+    # positions des sections, relatives à la fin de l'entête (alignée sur 8 octets)
+    descriptions = {}
+    position = 0
+    for i, (nom, contenu) in enumerate(sections):
+        if isinstance(contenu, np.ndarray):
+            contenu = contenu.astype(contenu.dtype.newbyteorder("<"), copy=False)
+            sections[i] = (nom, contenu)
+            descriptions[nom] = [position, contenu.dtype.str, len(contenu)]
+            taille = contenu.nbytes
+        else:
+            taille = sum(len(octets) for octets in contenu)
+            descriptions[nom] = [position, "|u1", taille]
+        position += -(-taille // 8) * 8
+    entete = {"version": VERSION_SEGMENT, "premier_id": debut, "nb_docs": fin - debut,
+              "types": sorted(stock.codes_types, key=stock.codes_types.get),
+              "remplace": list(remplace), "sections": descriptions}
+    octets_entete = json.dumps(entete).encode("utf-8")
+    octets_entete = octets_entete.ljust(-(-(len(MAGIC) + 8 + len(octets_entete)) // 8) * 8 - len(MAGIC) - 8)
+
+    temporaire = chemin + ".tmp"
+    with open(temporaire, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(octets_entete).to_bytes(8, "little"))
+        f.write(octets_entete)
+        debut_sections = f.tell()
+        for nom, contenu in sections:
+            f.write(b"\0" * (debut_sections + descriptions[nom][0] - f.tell()))
+            if isinstance(contenu, np.ndarray):
+                f.write(contenu.tobytes())
+            else:
+                for octets in contenu:
+                    f.write(octets)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporaire, chemin)
+    return fin - debut
+
+
+class Segment:
+    """Fichier segment ouvert avec mmap : colonnes lues sans copie, chaînes décodées à la demande"""
+
+    def __init__(self, chemin):
+        self.chemin = chemin
+        with open(chemin, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{chemin} n'est pas un segment de corpus")
+        longueur = int.from_bytes(self._mmap[len(MAGIC):len(MAGIC) + 8], "little")
+        entete = json.loads(bytes(self._mmap[len(MAGIC) + 8:len(MAGIC) + 8 + longueur]))
+        self._debut_sections = len(MAGIC) + 8 + longueur
+        if entete["version"] != VERSION_SEGMENT:
+            raise ValueError(f"{chemin} : version de segment {entete['version']} non prise en charge")
+        self.premier_id = entete["premier_id"]
+        self.nb_docs = entete["nb_docs"]
+        self.types = entete["types"] # code du type dans le segment -> nom
+        self.remplace = entete["remplace"]
+        self._sections = entete["sections"]
+
+    def __len__(self):
+        return self.nb_docs
+
+    def colonne(self, nom):
+        """Colonne fixe (tableau NumPy en lecture seule, vue sur le fichier)"""
+        position, dtype, nombre = self._sections[nom]
+        return np.frombuffer(self._mmap, dtype=np.dtype(dtype), count=nombre,
+                             offset=self._debut_sections + position)
+
+    def blob(self, nom):
+        """Octets d'un blob (memoryview sur le fichier)"""
+        position, _, taille = self._sections[nom]
+        debut = self._debut_sections + position
+        return memoryview(self._mmap)[debut:debut + taille]
+
+    def chaines(self, nom):
+        """Toutes les chaînes d'un blob (noms d'auteurs, co-auteurs)"""
+        blob = bytes(self.blob(nom))
+        fins = self.colonne(nom + "_fins").tolist()
+        return [blob[debut:fin].decode("utf-8") for debut, fin in zip([0] + fins, fins)]
+
+
+def lister_segments(dossier):
+    """Segments d'un dossier dans l'ordre, sans ceux qu'un segment fusionné remplace (compaction interrompue
+    avant leur suppression)"""
+    if not os.path.isdir(dossier):
+        return []
+    noms = sorted(nom for nom in os.listdir(dossier) if _NOM_SEGMENT.match(nom))
+    segments = [Segment(os.path.join(dossier, nom)) for nom in noms]
+    remplaces = {nom for segment in segments for nom in segment.remplace}
+    segments = [s for s in segments if os.path.basename(s.chemin) not in remplaces]
+
+    suivant = 0
+    for segment in segments:
+        if segment.premier_id != suivant:
+            raise ValueError(f"{segment.chemin} : premier document {segment.premier_id}, {suivant} attendu")
+        suivant += segment.nb_docs
+    return segments
+
+
+def _numero_suivant(dossier):
+    numeros = [int(m.group(1)) for m in map(_NOM_SEGMENT.match, os.listdir(dossier)) if m]
+    return max(numeros, default=-1) + 1
+
+
+def ajouter_segment(dossier, stock):
+    """Écrit dans un nouveau segment les documents du stock qui ne sont pas encore dans le dossier ; retourne
+    son chemin (None s'il n'y a rien de nouveau)"""
+    os.makedirs(dossier, exist_ok=True)
+    deja = sum(segment.nb_docs for segment in lister_segments(dossier))
+    if deja > len(stock):
+        raise ValueError(f"{dossier} contient {deja} documents, le corpus seulement {len(stock)}")
+    if deja == len(stock):
+        return None
+    chemin = chemin_segment(dossier, _numero_suivant(dossier))
+    ecrire_segment(chemin, stock, deja, len(stock))
+    return chemin
+
+
+def compacter(dossier):
+    """Fusionne les segments d'un dossier en un seul ; retourne son chemin"""
+    segments = lister_segments(dossier)
+    if not segments:
+        return None
+    if len(segments) == 1:
+        chemin = segments[0].chemin
+    else:
+        stock = StockDocuments()
+        for segment in segments:
+            stock.ajouter_segment(segment)
+        chemin = chemin_segment(dossier, _numero_suivant(dossier))
+        ecrire_segment(chemin, stock, remplace=[os.path.basename(s.chemin) for s in segments])
+    # le segment fusionné est complet (renommé) : les anciens, et ceux d'une compaction interrompue, peuvent
+    # être supprimés (un corpus qui les a ouverts garde ses mmap valides sous Unix)
+    for nom in os.listdir(dossier):
+        if _NOM_SEGMENT.match(nom) and nom != os.path.basename(chemin):
+            os.remove(os.path.join(dossier, nom))
+    return chemin
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+Service de recherche HTTP/JSON (asyncio, bibliothèque standard uniquement).
+
+Le serveur garde un SearchEngine figé (instantané en lecture seule) et répond aux requêtes en parallèle.
+Les reconstructions et les collectes tournent dans un thread de fond, puis le nouvel instantané remplace
+l'ancien d'une seule affectation : une requête n'attend jamais une reconstruction.
+
+    python Serveur.py --fichier corpus.tsv --port 8000
+
+    GET  /search?q=machine+learning&k=10&type_doc=Arxiv&auteur=...&date_debut=...&date_fin=...&stopwords=1&doublons=1
+    GET  /stats
+    POST /reconstruire
+    POST /ingestion     {"theme": "...", "nb_reddit": 100, "nb_arxiv": 100}
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from Corpus import Corpus
+from SearchEngine import SearchEngine
+from Ingestion import Ingestion
+
+STATUTS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error"}
+
+
+class Instantane:
+    """Un moteur figé et les informations qui l'accompagnent (jamais modifié après sa création)"""
+
+    def __init__(self, moteur, numero):
+        self.moteur = moteur.figer()
+        self.numero = numero
+        self.nb_docs = moteur.mat_TF.shape[0]
+        self.date_creation = time.time()
+
+
+class ServeurRecherche:
+
+    def __init__(self, corpus, moteur=None, fichier_corpus=None, threads_requetes=4, **options_moteur):
+        self.corpus = corpus
+        self.fichier_corpus = fichier_corpus
+        self.options_moteur = options_moteur # passées à chaque SearchEngine reconstruit
+        self.instantane = Instantane(moteur or SearchEngine(corpus, **options_moteur), 1)
+
+        # requêtes : pool de threads (le calcul NumPy ne bloque pas la boucle asyncio)
+        # tâches de fond : un seul thread, les reconstructions et collectes sont exécutées l'une après l'autre
+        self._pool_requetes = ThreadPoolExecutor(max_workers=threads_requetes)
+        self._travailleur = ThreadPoolExecutor(max_workers=1)
+        self.taches = {"en_attente": 0, "derniere": None, "derniere_erreur": None}
+        self._verrou_taches = threading.Lock()
+        self.nb_requetes = 0
+
+    # --- Tâches de fond ---
+
+    def _reconstruire(self):
+        # construit un nouveau moteur complet puis remplace l'instantané (affectation atomique)
+        moteur = SearchEngine(self.corpus, **self.options_moteur)
+        self.instantane = Instantane(moteur, self.instantane.numero + 1)
+
+    def _ingerer(self, theme, nb_reddit, nb_arxiv):
+        # collecte dans la boucle asyncio propre au thread de fond, puis reconstruction
+        Ingestion(self.corpus, theme, nb_reddit=nb_reddit, nb_arxiv=nb_arxiv,
+                  fichier_corpus=self.fichier_corpus).lancer()
+        self._reconstruire()
+
+    def _executer_tache(self, nom, fonction, *args):
+        try:
+            fonction(*args)
+            self.taches["derniere"] = nom
+        except Exception as erreur:
+            self.taches["derniere_erreur"] = f"{nom} : {erreur!r}"
+        finally:
+            with self._verrou_taches:
+                self.taches["en_attente"] -= 1
+
+    def planifier(self, nom, fonction, *args):
+        """Ajoute une tâche à la file du thread de fond"""
+        with self._verrou_taches:
+            self.taches["en_attente"] += 1
+        return self._travailleur.submit(self._executer_tache, nom, fonction, *args)
+
+    # --- Requêtes ---
+
+    def _rechercher(self, parametres):
+        instantane = self.instantane # un seul instantané pour toute la requête
+        mots_clefs = parametres.get("q", [""])[0]
+        k = int(parametres.get("k", ["10"])[0])
+        filtres = {nom: parametres[nom] for nom in ("type_doc", "auteur") if nom in parametres}
+        filtres.update({nom: parametres[nom][0] for nom in ("date_debut", "date_fin") if nom in parametres})
+        for nom in ("stopwords", "doublons"):
+            if nom in parametres:
+                filtres[nom] = parametres[nom][0].lower() in ("1", "true", "oui")
+
+        debut = time.perf_counter()
+        resultats = instantane.moteur.search(mots_clefs, nb_resultats=k, dataframe=False, **filtres)
+        return {
+            "requete": mots_clefs,
+            "instantane": instantane.numero,
+            "duree_ms": (time.perf_counter() - debut) * 1000,
+            "resultats": [
+                {"doc_id": int(r.doc_id), "titre": r.titre, "auteur": r.auteur, "date": str(r.date),
+                 "url": r.url, "score": float(r.score), "type": r.type}
+                for r in resultats
+            ],
+        }
+
+    def _stats(self):
+        instantane = self.instantane
+        return {
+            "instantane": instantane.numero,
+            "nb_docs_index": int(instantane.nb_docs),
+            "nb_docs_corpus": self.corpus.ndoc,
+            "nb_requetes": self.nb_requetes,
+            "cache": instantane.moteur.stats_cache(),
+            "taches": dict(self.taches),
+        }
+
+    async def _router(self, methode, cible, corps):
+        url = urllib.parse.urlsplit(cible)
+        parametres = urllib.parse.parse_qs(url.query)
+        boucle = asyncio.get_running_loop()
+
+        if url.path == "/search":
+            if methode != "GET":
+                return 405, {"erreur": "méthode non autorisée"}
+            self.nb_requetes += 1
+            return 200, await boucle.run_in_executor(self._pool_requetes, self._rechercher, parametres)
+        if url.path == "/stats":
+            return 200, self._stats()
+        if url.path == "/reconstruire":
+            if methode != "POST":
+                return 405, {"erreur": "méthode non autorisée"}
+            self.planifier("reconstruire", self._reconstruire)
+            return 202, {"taches": dict(self.taches)}
+        if url.path == "/ingestion":
+            if methode != "POST":
+                return 405, {"erreur": "méthode non autorisée"}
+            options = json.loads(corps or b"{}")
+            self.planifier("ingestion", self._ingerer, options.get("theme", "machine learning"),
+                           int(options.get("nb_reddit", 25)), int(options.get("nb_arxiv", 25)))
+            return 202, {"taches": dict(self.taches)}
+        return 404, {"erreur": f"chemin inconnu : {url.path}"}
+
+    async def _servir_client(self, lecteur, ecrivain):
+        # HTTP/1.1 minimal, connexions persistantes (keep-alive)
+        try:
+            while True:
+                ligne = await lecteur.readline()
+                if not ligne.strip():
+                    break
+                try:
+                    methode, cible, version = ligne.decode("latin-1").split()
+                except ValueError:
+                    break
+                entetes = {}
+                while True:
+                    ligne = await lecteur.readline()
+                    if not ligne.strip():
+                        break
+                    nom, _, valeur = ligne.decode("latin-1").partition(":")
+                    entetes[nom.strip().lower()] = valeur.strip()
+                corps = await lecteur.readexactly(int(entetes.get("content-length", 0)))
+
+                try:
+                    statut, reponse = await self._router(methode, cible, corps)
+                except (ValueError, KeyError) as erreur:
+                    statut, reponse = 400, {"erreur": str(erreur)}
+                except Exception as erreur:
+                    statut, reponse = 500, {"erreur": repr(erreur)}
+
+                garder = version == "HTTP/1.1" and entetes.get("connection", "").lower() != "close"
+                donnees = json.dumps(reponse, ensure_ascii=False).encode("utf-8")
+                ecrivain.write(
+                    f"HTTP/1.1 {statut} {STATUTS[statut]}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(donnees)}\r\n"
+                    f"Connection: {'keep-alive' if garder else 'close'}\r\n\r\n".encode("latin-1") + donnees)
+                await ecrivain.drain()
+                if not garder:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            ecrivain.close()
+
+    async def demarrer(self, hote="127.0.0.1", port=8000):
+        """Démarre l'écoute (retourne le asyncio.Server)"""
+        return await asyncio.start_server(self._servir_client, hote, port)
+
+    async def servir(self, hote="127.0.0.1", port=8000):
+        serveur = await self.demarrer(hote, port)
+        print(f"Serveur de recherche sur http://{hote}:{port} ({self.instantane.nb_docs} documents)")
+        async with serveur:
+            await serveur.serve_forever()
+
+    def fermer(self):
+        self._pool_requetes.shutdown(wait=False)
+        self._travailleur.shutdown(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fichier", default="corpus.tsv")
+    parser.add_argument("--index", help="dossier de l'index sauvegardé (réutilisé si l'empreinte correspond)")
+    parser.add_argument("--hote", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--threads", type=int, default=4, help="threads de calcul des requêtes")
+    parser.add_argument("--scorer", default="tfidf")
+    args = parser.parse_args()
+
+    corpus = Corpus.load(args.fichier, nom="Serveur")
+    moteur = None
+    if args.index:
+        moteur = SearchEngine.charger_ou_construire(corpus, args.index, args.fichier, scorer=args.scorer)
+    serveur = ServeurRecherche(corpus, moteur, fichier_corpus=args.fichier, threads_requetes=args.threads,
+                               scorer=args.scorer)
+    try:
+        asyncio.run(serveur.servir(args.hote, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur.fermer()
+
+
+if __name__ == "__main__":
+    main()
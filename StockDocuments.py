@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import bisect
+import operator
+from array import array
+from collections.abc import Mapping
+from datetime import datetime, timedelta, timezone
+import numpy as np
+import pandas as pd
+from Document import Document, RedditDocument, ArxivDocument
+
+# timestamp d'une date manquante ou invalide (valeur int64 de NaT)
+NAT = np.iinfo(np.int64).min
+_MAX_NS = np.iinfo(np.int64).max
+
+_EPOQUE = datetime(1970, 1, 1)
+
+
+def _timestamp(date):
+    # date (datetime, Timestamp ou texte) -> nanosecondes depuis 1970 (UTC) ; absente, invalide (NaT) ou
+    # hors de la plage int64 des nanosecondes (années 1678 à 2262) -> NAT
+    if isinstance(date, str):
+        try:
+            date = datetime.fromisoformat(date.strip())
+        except ValueError:
+            # autres formats (RSS, API) : une seule valeur, analysée seule (pas de format="mixed", pandas >= 2)
+            date = pd.to_datetime(date, errors="coerce")
+    if date is pd.NaT or not isinstance(date, datetime):
+        return NAT
+    if isinstance(date, pd.Timestamp):
+        timestamp = int((date.tz_convert(None) if date.tzinfo is not None else date).value)
+    else:
+        if date.tzinfo is not None:
+            date = date.astimezone(timezone.utc).replace(tzinfo=None)
+        timestamp = (date - _EPOQUE) // timedelta(microseconds=1) * 1000
+    return timestamp if NAT < timestamp <= _MAX_NS else NAT
+
+def _chaine(valeur):
+    # titre, url ou texte manquant (None, NaN d'un TSV) -> ""
+    return valeur if isinstance(valeur, str) else ""
+
+def _entier(valeur):
+    # nombre de commentaires : 0 s'il est absent, invalide ou hors de la plage int64
+    try:
+        entier = int(valeur)
+    except (TypeError, ValueError, OverflowError):
+        return 0
+    return entier if NAT <= entier <= _MAX_NS else 0
+
+
+class _ColonneTexte:
+    # chaînes d'une colonne en morceaux UTF-8 : blobs en lecture seule des segments (mmap), puis un buffer en
+    # mémoire pour les documents ajoutés ; fins[i] : fin de la chaîne i dans son morceau
+    __slots__ = ("morceaux", "premiers", "fins")
+
+    def __init__(self):
+        self.morceaux = [bytearray()]
+        self.premiers = [0] # indice de la première chaîne de chaque morceau
+        self.fins = array("q")
+
+    def ajouter(self, octets):
+        # chaîne déjà encodée en UTF-8
+        buffer = self.morceaux[-1]
+        buffer += octets
+        self.fins.append(len(buffer))
+
+    def ajouter_blob(self, blob, fins):
+        # chaînes d'un segment (fins relatives au blob), placées à la suite sans copie du blob
+        if not len(fins):
+            return
+        if not self.morceaux[-1]:
+            self.morceaux.pop()
+            self.premiers.pop()
+        self.morceaux.append(blob)
+        self.premiers.append(len(self.fins))
+        self.fins.frombytes(np.ascontiguousarray(fins, dtype=np.int64).tobytes())
+        self.morceaux.append(bytearray())
+        self.premiers.append(len(self.fins))
+
+    def __getitem__(self, i):
+        k = bisect.bisect_right(self.premiers, i) - 1
+        debut = self.fins[i - 1] if i > self.premiers[k] else 0
+        return str(self.morceaux[k][debut:self.fins[i]], "utf-8")
+
+    def tranches(self, debut, fin):
+        """(octets, fins relatives) des chaînes debut..fin-1, une tranche par morceau traversé"""
+        bornes = self.premiers[1:] + [len(self.fins)]
+        for morceau, premier, dernier in zip(self.morceaux, self.premiers, bornes):
+            a, b = max(debut, premier), min(fin, dernier)
+            if a >= b:
+                continue
+            base = self.fins[a - 1] if a > premier else 0
+            fins = np.frombuffer(self.fins, dtype=np.int64)[a:b] - base
+            yield memoryview(morceau)[base:self.fins[b - 1]], fins
+
+    def nbytes(self):
+        # octets en mémoire (les blobs des segments restent dans les fichiers)
+        return (sum(len(m) for m in self.morceaux if isinstance(m, bytearray))
+                + len(self.fins) * self.fins.itemsize)
+
+
+class _Vue:
+    """Document lu dans les colonnes d'un StockDocuments (aucune copie, rien n'est gardé en mémoire)"""
+    __slots__ = ()
+
+    def __init__(self, stock, doc_id):
+        self._stock = stock
+        self._id = doc_id
+
+    titre = property(lambda self: self._stock.titres[self._id])
+    auteur = property(lambda self: self._stock.noms_auteurs[self._stock.auteurs[self._id]])
+    date = property(lambda self: self._stock.date(self._id))
+    url = property(lambda self: self._stock.urls[self._id])
+    texte = property(lambda self: self._stock.textes[self._id])
+
+
+class VueDocument(_Vue, Document):
+    __slots__ = ("_stock", "_id")
+
+
+class VueRedditDocument(_Vue, RedditDocument):
+    __slots__ = ("_stock", "_id")
+
+    def _get_num_comments(self):
+        return self._stock.num_comments[self._id]
+
+    def _set_num_comments(self, num_comments):
+        self._stock.num_comments[self._id] = _entier(num_comments)
+
+    num_comments = property(_get_num_comments, _set_num_comments)
+
+
+class VueArxivDocument(_Vue, ArxivDocument):
+    __slots__ = ("_stock", "_id")
+
+    def _get_co_auteurs(self):
+        return self._stock.co_auteurs.get(self._id, [])
+
+    def _set_co_auteurs(self, co_auteurs):
+        if co_auteurs:
+            self._stock.co_auteurs[self._id] = list(co_auteurs)
+        else:
+            self._stock.co_auteurs.pop(self._id, None)
+
+    co_auteurs = property(_get_co_auteurs, _set_co_auteurs)
+
+
+class StockDocuments(Mapping):
+    """id2doc du corpus, en colonnes : type, auteur, date et nombre de commentaires en tableaux compacts,
+    titres, urls et textes dans des buffers UTF-8 (ou dans les fichiers segments chargés, voir Segment.py). Les ids sont 0..n-1 (ordre d'ajout) ; stock[i] retourne
+    une vue de la classe du document (Document, RedditDocument ou ArxivDocument)."""
+
+    CLASSES = (Document, RedditDocument, ArxivDocument) # code du type -> classe
+    VUES = (VueDocument, VueRedditDocument, VueArxivDocument)
+
+    def __init__(self):
+        self.codes_types = {classe.type.lower(): code for code, classe in enumerate(self.CLASSES)}
+        self.types = array("b") # code du type
+        self.auteurs = array("i") # id de l'auteur
+        self.dates = array("q") # timestamp en ns (NAT si absente)
+        self.num_comments = array("q") # documents Reddit (0 pour les autres)
+        self.co_auteurs = {} # doc_id -> co-auteurs (documents Arxiv qui en ont)
+        self.titres = _ColonneTexte()
+        self.urls = _ColonneTexte()
+        self.textes = _ColonneTexte()
+        self.noms_auteurs = [] # id -> nom (interné), dans l'ordre de première apparition
+        self.id_auteur = {} # nom -> id
+
+    def __len__(self):
+        return len(self.types)
+
+    def __iter__(self):
+        return iter(range(len(self)))
+
+    def __contains__(self, cle):
+        try:
+            return 0 <= operator.index(cle) < len(self)
+        except TypeError:
+            return False
+
+    def __getitem__(self, cle):
+        if cle not in self:
+            raise KeyError(cle)
+        doc_id = operator.index(cle)
+        return self.VUES[self.types[doc_id]](self, doc_id)
+
+    def __setitem__(self, cle, doc):
+        # ajout seulement, à la suite des documents déjà stockés
+        if cle != len(self):
+            raise KeyError(f"id {cle} : le prochain document du stock doit avoir l'id {len(self)}")
+        self.ajouter(doc)
+
+    def ajouter(self, doc):
+        """Copie un document dans les colonnes ; retourne son id"""
+        doc_id = len(self)
+        # toutes les valeurs sont calculées avant le premier ajout : une erreur (texte non encodable...)
+        # laisse les colonnes de même longueur
+        code_type = self.codes_types.get(doc.getType().lower(), 0)
+        date = _timestamp(doc.date)
+        num_comments = _entier(getattr(doc, "num_comments", 0))
+        co_auteurs = getattr(doc, "co_auteurs", None)
+        titre, url, texte = (_chaine(valeur).encode("utf-8") for valeur in (doc.titre, doc.url, doc.texte))
+
+        self.types.append(code_type)
+        self.auteurs.append(self._ajouter_auteur(doc.auteur))
+        self.dates.append(date)
+        self.num_comments.append(num_comments)
+        if co_auteurs:
+            self.co_auteurs[doc_id] = list(co_auteurs)
+        self.titres.ajouter(titre)
+        self.urls.ajouter(url)
+        self.textes.ajouter(texte)
+        return doc_id
+
+    def _ajouter_auteur(self, nom):
+        # id de l'auteur, attribué à sa première apparition
+        if nom not in self.id_auteur:
+            self.id_auteur[nom] = len(self.noms_auteurs)
+            self.noms_auteurs.append(sys.intern(nom) if isinstance(nom, str) else nom)
+        return self.id_auteur[nom]
+
+    def ajouter_segment(self, segment):
+        """Ajoute à la suite les documents d'un Segment : colonnes fixes copiées, titres, urls et textes
+        laissés dans le fichier (mmap) ; retourne l'id du premier"""
+        premier = len(self)
+        codes = np.array([self.codes_types.get(nom, 0) for nom in segment.types] or [0], dtype=np.int8)
+        self.types.frombytes(codes[segment.colonne("types")].tobytes())
+        ids = np.array([self._ajouter_auteur(nom) for nom in segment.chaines("noms_auteurs")] or [0], dtype=np.int32)
+        self.auteurs.frombytes(ids[segment.colonne("auteurs")].tobytes())
+        self.dates.frombytes(segment.colonne("dates").tobytes())
+        self.num_comments.frombytes(segment.colonne("num_comments").tobytes())
+
+        co_auteurs = segment.chaines("co_auteurs")
+        fins = segment.colonne("co_auteurs_nb").tolist()
+        for doc, debut, fin in zip(segment.colonne("co_auteurs_docs").tolist(), [0] + fins, fins):
+            self.co_auteurs[premier + doc] = co_auteurs[debut:fin]
+
+        for nom in ("titres", "urls", "textes"):
+            getattr(self, nom).ajouter_blob(segment.blob(nom), segment.colonne(nom + "_fins"))
+        return premier
+
+    def date(self, doc_id):
+        """Date d'un document (datetime naïf en UTC, None si absente)"""
+        timestamp = self.dates[doc_id]
+        return None if timestamp == NAT else _EPOQUE + timedelta(microseconds=timestamp // 1000)
+
+    def colonne(self, nom, doc_ids):
+        """Valeurs d'une colonne (types, auteurs ou dates) pour les documents donnés, en tableau NumPy"""
+        tableau = getattr(self, nom)
+        if not len(tableau):
+            return np.array([], dtype=np.dtype(tableau.typecode))
+        # la vue NumPy n'est pas gardée (copie par tranche ou par indices) : le tableau pourra encore être agrandi
+        vue = np.frombuffer(tableau, dtype=np.dtype(tableau.typecode))
+        if isinstance(doc_ids, range) and doc_ids.step == 1:
+            return vue[doc_ids.start:doc_ids.stop].copy()
+        return vue[np.fromiter(doc_ids, dtype=np.int64)]
+
+    def nbytes(self):
+        """Taille en mémoire (octets) des colonnes (hors noms d'auteurs et co-auteurs)"""
+        return (sum(len(t) * t.itemsize for t in (self.types, self.auteurs, self.dates, self.num_comments))
+                + sum(c.nbytes() for c in (self.titres, self.urls, self.textes)))
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+
+import bisect
+from array import array
+import numpy as np
+
+_MASQUE_ID = (1 << 32) - 1 # bits de poids faible d'une case de la table : id + 1
+_MASQUE_EMPREINTE = (1 << 31) - 1 # bits de poids fort : empreinte du hachage (positive)
+
+
+def _entiers(valeurs):
+    # tableau compact d'entiers 64 bits (indexation rapide depuis Python, vue NumPy sans copie)
+    return array("q", np.ascontiguousarray(valeurs, dtype=np.int64).tobytes())
+
+def _vue(tableau):
+    return np.frombuffer(tableau, dtype=np.int64) if len(tableau) else np.array([], dtype=np.int64)
+
+
+class _VueTriee:
+    # mots (octets UTF-8) dans l'ordre alphabétique, vus comme une séquence pour bisect
+    __slots__ = ("vocab",)
+
+    def __init__(self, vocab):
+        self.vocab = vocab
+
+    def __len__(self):
+        return len(self.vocab)
+
+    def __getitem__(self, rang):
+        return self.vocab._cle(self.vocab._tri[rang])
+
+
+class Vocabulaire:
+    """Vocabulaire compact : mots dans un seul buffer UTF-8, statistiques et IDF en tableaux NumPy (un
+    élément par id de mot). Un ordre alphabétique sert aux préfixes, une table de hachage compacte à la
+    recherche d'un mot exact."""
+
+    def __init__(self):
+        self._buffer = bytearray() # chaque mot suivi de "\n", dans l'ordre des ids (agrandi sur place)
+        self._debuts = array("q", [0]) # mot i : _buffer[_debuts[i]:_debuts[i + 1] - 1]
+        self._tri = array("q") # ids dans l'ordre alphabétique
+        self._vue_triee = _VueTriee(self)
+        # table de hachage à adressage ouvert, au plus à moitié pleine : chaque case contient une empreinte du
+        # hachage (31 bits de poids fort) et id + 1 (32 bits de poids faible), 0 pour une case vide ;
+        # hash() dépend du processus : la table est recalculée au chargement, jamais sauvegardée
+        self._table = array("q", bytes(8 * 8))
+        self.total_occurrences = np.array([], dtype=np.int64)
+        self.nb_documents = np.array([], dtype=np.int64)
+        self.idf = np.array([])
+
+    @classmethod
+    def depuis_buffer(cls, buffer, total_occurrences=None, nb_documents=None, tri=None):
+        """Vocabulaire à partir des mots joints par "\\n" (ordre des ids), comme dans vocab.npy"""
+        vocab = cls()
+        if buffer:
+            vocab._buffer = bytearray(buffer) + b"\n"
+            fins = np.flatnonzero(np.frombuffer(vocab._buffer, dtype=np.uint8) == ord("\n")) + 1
+            vocab._debuts = _entiers(np.concatenate([[0], fins]))
+        nb_mots = len(vocab)
+        vocab._tri = _entiers(tri if tri is not None
+                              else np.argsort(np.array(vocab._cles(), dtype=object), kind="stable"))
+        vocab.total_occurrences = (np.array(total_occurrences, dtype=np.int64) if total_occurrences is not None
+                                   else np.zeros(nb_mots, dtype=np.int64))
+        vocab.nb_documents = (np.array(nb_documents, dtype=np.int64) if nb_documents is not None
+                              else np.zeros(nb_mots, dtype=np.int64))
+
+        vocab._indexer(np.arange(nb_mots), vocab._cles())
+        return vocab
+
+    def __len__(self):
+        return len(self._debuts) - 1
+
+    def nbytes(self):
+        """Taille en mémoire (octets) du buffer et des tableaux"""
+        return (len(self._buffer)
+                + sum(len(t) * t.itemsize for t in (self._debuts, self._tri, self._table))
+                + sum(t.nbytes for t in (self.total_occurrences, self.nb_documents, self.idf)))
+
+    def _cle(self, mot_id):
+        return bytes(self._buffer[self._debuts[mot_id]:self._debuts[mot_id + 1] - 1])
+
+    def _cles(self):
+        # tous les mots (octets), dans l'ordre des ids
+        return bytes(self._buffer).split(b"\n")[:-1]
+
+    def buffer(self):
+        """Mots joints par "\\n" dans l'ordre des ids (format de vocab.npy)"""
+        return bytes(self._buffer[:-1])
+
+    def tri(self):
+        """Ids dans l'ordre alphabétique des mots"""
+        return _vue(self._tri)
+
+    def mot(self, mot_id):
+        return self._cle(mot_id).decode("utf-8")
+
+    def mots(self):
+        """Liste des mots, dans l'ordre des ids"""
+        return self._buffer.decode("utf-8").split("\n")[:-1]
+
+    # --- Recherche ---
+
+    def _indexer(self, ids, cles):
+        # place les mots dans la table (sondage linéaire), par vagues vectorisées : à chaque vague, un seul
+        # mot par case libre, les autres passent à la case suivante
+        if 2 * len(self) > len(self._table):
+            # table agrandie (taille doublée) : tous les mots sont replacés
+            self._table = array("q", bytes(8 * (1 << (2 * len(self) - 1).bit_length())))
+            ids, cles = np.arange(len(self)), self._cles()
+        table = _vue(self._table)
+        masque = len(table) - 1
+        ids = np.asarray(ids, dtype=np.int64)
+        hachages = np.fromiter((hash(cle) for cle in cles), dtype=np.int64, count=len(ids))
+        entrees = (((hachages >> 32) & _MASQUE_EMPREINTE) << 32) | (ids + 1)
+        positions = hachages & masque
+        restants = np.arange(len(ids))
+        while len(restants):
+            candidats = restants[table[positions[restants]] == 0]
+            _, premiers = np.unique(positions[candidats], return_index=True)
+            places = candidats[premiers]
+            table[positions[places]] = entrees[places]
+            restants = np.setdiff1d(restants, places, assume_unique=True)
+            positions[restants] = (positions[restants] + 1) & masque
+
+    def _id_cle(self, cle, defaut=-1):
+        table, debuts, buffer = self._table, self._debuts, self._buffer
+        masque = len(table) - 1
+        h = hash(cle)
+        empreinte = (h >> 32) & _MASQUE_EMPREINTE
+        case = h & masque
+        while True:
+            entree = table[case]
+            if not entree:
+                return defaut
+            # le mot n'est comparé que si l'empreinte correspond
+            if entree >> 32 == empreinte:
+                mot_id = (entree & _MASQUE_ID) - 1
+                if buffer[debuts[mot_id]:debuts[mot_id + 1] - 1] == cle:
+                    return mot_id
+            case = (case + 1) & masque
+
+    def id(self, mot, defaut=-1):
+        """Id d'un mot (defaut s'il est absent)"""
+        return self._id_cle(mot.encode("utf-8"), defaut)
+
+    def ids(self, mots):
+        """Ids de plusieurs mots (-1 pour un mot absent)"""
+        return np.array([self._id_cle(mot.encode("utf-8")) for mot in mots], dtype=np.int64)
+
+    def prefixe(self, debut):
+        """Ids des mots commençant par debut, dans l'ordre alphabétique (deux recherches dichotomiques)"""
+        cle = debut.encode("utf-8")
+        rang_debut = bisect.bisect_left(self._vue_triee, cle)
+        rang_fin = bisect.bisect_left(self._vue_triee, cle + b"\xff", lo=rang_debut) # 0xff absent de l'UTF-8
+        return _vue(self._tri)[rang_debut:rang_fin]
+
+    def __contains__(self, mot):
+        return self.id(mot) >= 0
+
+    # --- Compatibilité avec l'ancien dictionnaire {mot: {'id', 'total_occurrences', 'nb_documents'}} ---
+
+    def _infos(self, mot_id):
+        return {'id': int(mot_id), 'total_occurrences': int(self.total_occurrences[mot_id]),
+                'nb_documents': int(self.nb_documents[mot_id])}
+
+    def __getitem__(self, mot):
+        mot_id = self.id(mot)
+        if mot_id < 0:
+            raise KeyError(mot)
+        return self._infos(mot_id)
+
+    def __iter__(self):
+        return iter(self.mots())
+
+    def items(self):
+        for mot_id, mot in enumerate(self.mots()):
+            yield mot, self._infos(mot_id)
+
+    # --- Modification ---
+
+    def ajouter(self, mots):
+        """Ids des mots donnés ; les mots absents reçoivent les ids suivants (statistiques à zéro). Seuls les
+        nouveaux mots sont encodés, placés dans la table et cherchés dans l'ordre alphabétique"""
+        mots = list(mots)
+        ids = self.ids(mots) if len(self) else np.full(len(mots), -1, dtype=np.int64)
+        nouveaux = list(dict.fromkeys(mot for mot, mot_id in zip(mots, ids) if mot_id < 0))
+        if not nouveaux:
+            return ids
+
+        premier = len(self)
+        nouveaux_ids = np.arange(premier, premier + len(nouveaux), dtype=np.int64)
+        cles = [mot.encode("utf-8") for mot in nouveaux]
+
+        # place de chaque nouveau mot dans l'ordre alphabétique (recherche dichotomique, calculée avant
+        # l'ajout) puis fusion avec les ids déjà triés
+        ordre = sorted(range(len(cles)), key=cles.__getitem__)
+        rangs = np.array([bisect.bisect_left(self._vue_triee, cles[i]) for i in ordre], dtype=np.int64)
+        self._tri = _entiers(np.insert(_vue(self._tri), rangs, nouveaux_ids[ordre]))
+
+        self._buffer += b"\n".join(cles) + b"\n"
+        fins = self._debuts[-1] + np.cumsum([len(cle) + 1 for cle in cles])
+        self._debuts.extend(fins.tolist())
+        self._indexer(nouveaux_ids, cles)
+        self.total_occurrences = np.concatenate([self.total_occurrences, np.zeros(len(cles), dtype=np.int64)])
+        self.nb_documents = np.concatenate([self.nb_documents, np.zeros(len(cles), dtype=np.int64)])
+
+        nouvel_id = dict(zip(nouveaux, nouveaux_ids.tolist()))
+        return np.array([mot_id if mot_id >= 0 else nouvel_id[mot] for mot, mot_id in zip(mots, ids)],
+                        dtype=np.int64)
+
+    def trier(self):
+        """Renumérote les mots dans l'ordre alphabétique ; retourne les anciens ids dans ce nouvel ordre"""
+        ordre = _vue(self._tri).copy()
+        cles = self._cles()
+        self._buffer = bytearray(b"".join(cles[i] + b"\n" for i in ordre))
+        self._debuts = _entiers(np.concatenate([[0], np.cumsum([len(cles[i]) + 1 for i in ordre])]))
+        self.total_occurrences = self.total_occurrences[ordre]
+        self.nb_documents = self.nb_documents[ordre]
+        if len(self.idf) == len(ordre):
+            self.idf = self.idf[ordre]
+
+        nouvel_id = np.empty(len(ordre), dtype=np.int64)
+        nouvel_id[ordre] = np.arange(len(ordre))
+        self._tri = _entiers(np.arange(len(ordre)))
+        table = _vue(self._table)
+        occupees = table > 0
+        entrees = table[occupees]
+        table[occupees] = (entrees & ~_MASQUE_ID) | (nouvel_id[(entrees & _MASQUE_ID) - 1] + 1)
+        return ordre
@@ -0,0 +1,499 @@
+# -*- coding: utf-8 -*-
+"""
+Mesures de performance du moteur de recherche.
+
+Suite complète sur des corpus synthétiques (un processus par taille, résultats JSON comparables entre commits)
+    python benchmark.py suite --tailles 1000 10000 100000 1000000 --json resultats.json
+    python benchmark.py comparer avant.json apres.json
+
+Courbe d'accélération de la construction parallèle de l'index
+    python benchmark.py parallele --fichier corpus.tsv --repetitions 200 --workers 1 2 4 8
+
+Index dense (LSA) : construction, mémoire, latences et rappel par rapport au moteur exact
+    python benchmark.py dense --nb-docs 100000 --dimensions 64 128 --clusters 0 256
+
+Mémoire des documents : dictionnaire d'objets Document comparé au stock en colonnes (StockDocuments)
+    python benchmark.py documents --nb-docs 100000
+
+Quasi-doublons injectés dans un corpus synthétique : taille de l'index sans et avec déduplication
+    python benchmark.py doublons --nb-docs 100000 --part-doublons 0.2
+
+Recherche distribuée : latences selon le nombre de shards (un thread par shard), scores comparés à un seul index
+    python benchmark.py distribue --nb-docs 100000 --shards 1 2 4 8
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+from Corpus import Corpus
+from SearchEngine import SearchEngine
+from MoteurDistribue import MoteurDistribue
+from CorpusSynthetique import GenerateurCorpus
+from DocumentFactory import DocumentFactory
+from StockDocuments import StockDocuments
+
+try:
+    import resource # mémoire maximale du processus (Unix uniquement)
+except ImportError:
+    resource = None
+
+
+def charger_corpus(fichier, repetitions=1):
+    """Charge un corpus TSV, éventuellement recopié plusieurs fois pour le grossir"""
+    corpus = Corpus.load(fichier, nom="Benchmark")
+    docs = list(corpus.id2doc.values())
+    for _ in range(repetitions - 1):
+        for doc in docs:
+            corpus.add(doc)
+    return corpus
+
+
+def courbe_acceleration(corpus, liste_workers=(1, 2, 4, 8), taille_shard=5000, essais=3):
+    """Temps de construction de l'index selon le nombre de processus (meilleur de plusieurs essais)"""
+    resultats = []
+    for n_workers in liste_workers:
+        temps = []
+        for _ in range(essais):
+            corpus._invalider_tokens() # tokenisation refaite à chaque essai
+            debut = time.perf_counter()
+            SearchEngine(corpus, n_workers=n_workers, taille_shard=taille_shard)
+            temps.append(time.perf_counter() - debut)
+        resultats.append({"n_workers": n_workers, "temps": min(temps)})
+
+    reference = resultats[0]["temps"]
+    for r in resultats:
+        r["acceleration"] = reference / r["temps"]
+    return resultats
+
+
+def rss_max_mo():
+    """Pic de mémoire résidente du processus (Mo), ou None si non disponible"""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en kilo-octets sous Linux, en octets sous macOS
+    return rss / (1 << 20) if platform.system() == "Darwin" else rss / 1024
+
+
+def percentiles_ms(durees):
+    durees = np.array(durees) * 1000
+    return {"p50": float(np.percentile(durees, 50)), "p95": float(np.percentile(durees, 95)),
+            "p99": float(np.percentile(durees, 99)), "moyenne": float(durees.mean())}
+
+
+def requetes_synthetiques(generateur, nb, graine=0):
+    """Requêtes de 1 à 4 mots, rangs répartis du fréquent au rare (stopwords exclus)"""
+    hasard = np.random.default_rng(graine)
+    rangs_max = min(generateur.nb_mots, 20000)
+    requetes = []
+    for _ in range(nb):
+        rangs = np.exp(hasard.uniform(np.log(60), np.log(rangs_max), size=hasard.integers(1, 5))).astype(int)
+        requetes.append(" ".join(generateur.mots[rangs]))
+    return requetes
+
+
+def mesurer_taille(nb_docs, dossier, nb_requetes=200, graine=0, n_workers=1):
+    """Toutes les mesures pour un corpus synthétique de nb_docs documents (à lancer dans un processus neuf)"""
+    generateur = GenerateurCorpus(graine=graine)
+    os.makedirs(dossier, exist_ok=True)
+    fichier = os.path.join(dossier, f"synthetique_{nb_docs}_{graine}.tsv")
+    mesures = {"nb_docs": nb_docs}
+    
+    if not os.path.exists(fichier):
+        debut = time.perf_counter()
+        generateur.ecrire_tsv(fichier, nb_docs)
+        mesures["generation_s"] = time.perf_counter() - debut
+    taille_mo = os.path.getsize(fichier) / (1 << 20)
+    mesures["taille_fichier_mo"] = taille_mo
+    
+    # chargement / sauvegarde du corpus
+    debut = time.perf_counter()
+    corpus = Corpus.load(fichier, nom="Benchmark")
+    duree = time.perf_counter() - debut
+    mesures["load"] = {"s": duree, "docs_par_s": nb_docs / duree, "mo_par_s": taille_mo / duree}
+    
+    copie = os.path.join(dossier, f"copie_{nb_docs}_{os.getpid()}.tsv")
+    debut = time.perf_counter()
+    corpus.save(copie)
+    duree = time.perf_counter() - debut
+    mesures["save"] = {"s": duree, "docs_par_s": nb_docs / duree, "mo_par_s": taille_mo / duree}
+    os.remove(copie)
+    
+    # construction de l'index (cache de résultats désactivé pour mesurer le calcul)
+    debut = time.perf_counter()
+    moteur = SearchEngine(corpus, n_workers=n_workers, taille_cache=0)
+    mesures["construction_s"] = time.perf_counter() - debut
+    mesures["nb_mots"] = len(moteur.vocab)
+    
+    # latences de recherche
+    for dataframe in (False, True):
+        durees = []
+        for requete in requetes_synthetiques(generateur, nb_requetes, graine):
+            debut = time.perf_counter()
+            moteur.search(requete, nb_resultats=10, dataframe=dataframe)
+            durees.append(time.perf_counter() - debut)
+        mesures["search_dataframe_ms" if dataframe else "search_ms"] = percentiles_ms(durees)
+    
+    # concordancier : un mot fréquent, un mot moyen, un mot rare
+    mesures["concorde"] = []
+    for rang in (100, 1000, 10000):
+        mot = generateur.mots[rang]
+        debut = time.perf_counter()
+        nb = len(corpus.concorde(mot, taille_contexte=30))
+        mesures["concorde"].append({"rang": rang, "occurrences": nb, "s": time.perf_counter() - debut})
+    
+    mesures["rss_max_mo"] = rss_max_mo()
+    return mesures
+
+
+def suite(tailles, dossier, nb_requetes=200, graine=0, n_workers=1):
+    """Mesures pour chaque taille, chacune dans un processus séparé (pic mémoire propre à la taille)"""
+    resultats = []
+    contexte = multiprocessing.get_context("spawn")
+    for nb_docs in tailles:
+        with ProcessPoolExecutor(max_workers=1, mp_context=contexte) as executeur:
+            mesures = executeur.submit(mesurer_taille, nb_docs, dossier, nb_requetes, graine, n_workers).result()
+        resultats.append(mesures)
+        print(f"{nb_docs:>9d} docs : load {mesures['load']['s']:.2f} s, save {mesures['save']['s']:.2f} s, "
+              f"index {mesures['construction_s']:.2f} s, search p50/p95/p99 "
+              f"{mesures['search_ms']['p50']:.2f}/{mesures['search_ms']['p95']:.2f}/"
+              f"{mesures['search_ms']['p99']:.2f} ms, RSS max {mesures['rss_max_mo'] or 0:.0f} Mo")
+    return resultats
+
+
+def taille_index_creux(moteur):
+    # octets des matrices interrogées par le backend "index" (postings + poids des documents, deux réglages)
+    return sum(getattr(mat, partie).nbytes
+               for mat in (moteur.index_inverse, moteur.mat_poids,
+                           moteur.index_inverse_sans_stopwords, moteur.mat_poids_sans_stopwords)
+               for partie in ("data", "indices", "indptr"))
+
+
+def mesurer_dense(moteur, requetes, dimensions=(128,), liste_clusters=(0,), nb_sondes=8, nb_candidats=100, k=10):
+    """Index dense pour chaque configuration : temps de construction, mémoire, latences et rappel@k
+    (part des k documents du moteur exact retrouvés par le backend "dense")"""
+    backend = moteur.backend
+    moteur.backend = "index"
+    exacts, durees = [], []
+    for requete in requetes:
+        debut = time.perf_counter()
+        exacts.append(set(moteur.search(requete, nb_resultats=k, dataframe=False).doc_ids))
+        durees.append(time.perf_counter() - debut)
+    resultats = [{"configuration": "exact", "memoire_mo": taille_index_creux(moteur) / (1 << 20),
+                  "search_ms": percentiles_ms(durees), "rappel": 1.0}]
+    
+    moteur.backend = "dense"
+    for dimension in dimensions:
+        for nb_clusters in liste_clusters:
+            dense = moteur.construire_dense(dimension=dimension, nb_clusters=nb_clusters, nb_sondes=nb_sondes,
+                                            nb_candidats=nb_candidats)
+            durees, rappels = [], []
+            for requete, exact in zip(requetes, exacts):
+                debut = time.perf_counter()
+                trouves = moteur.search(requete, nb_resultats=k, dataframe=False).doc_ids
+                durees.append(time.perf_counter() - debut)
+                if exact:
+                    rappels.append(len(exact.intersection(trouves)) / len(exact))
+            resultats.append({"configuration": f"dense k={dense.vecteurs.shape[1]} clusters={nb_clusters}",
+                              "construction_s": dense.duree_construction, "memoire_mo": dense.nbytes() / (1 << 20),
+                              "search_ms": percentiles_ms(durees), "rappel": float(np.mean(rappels))})
+    moteur.backend = backend
+    return resultats
+
+
+def mesurer_documents(nb_docs, graine=0):
+    """Mémoire (tracemalloc) et temps de nb_docs documents synthétiques gardés dans un dictionnaire d'objets
+    Document ou dans un StockDocuments ; le surcoût par document est compté hors octets UTF-8 des textes"""
+    resultats = []
+    for nom, stockage in (("objets", dict), ("stock", StockDocuments)):
+        octets_textes = 0
+        tracemalloc.start()
+        debut = time.perf_counter()
+        docs = stockage()
+        for doc_id, (titre, auteur, date, url, texte, type_doc) in enumerate(
+                GenerateurCorpus(graine=graine).iter_lignes(nb_docs)):
+            docs[doc_id] = DocumentFactory.create_document(type_doc.lower(), titre, auteur, date, url, texte)
+            octets_textes += len(texte.encode("utf-8"))
+        remplissage = time.perf_counter() - debut
+        memoire = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        
+        debut = time.perf_counter()
+        for doc in docs.values():
+            doc.texte
+        lecture = time.perf_counter() - debut
+        resultats.append({"stockage": nom, "nb_docs": nb_docs, "memoire_mo": memoire / (1 << 20),
+                          "textes_mo": octets_textes / (1 << 20),
+                          "octets_par_doc_hors_textes": (memoire - octets_textes) / nb_docs,
+                          "remplissage_s": remplissage, "lecture_textes_s": lecture})
+        del docs
+    return resultats
+
+
+def mesurer_doublons(nb_docs, part_doublons, mode, graine=0):
+    """Corpus synthétique avec quasi-doublons injectés, sans déduplication (mode None) ou avec : détection
+    et taille de l'index (à lancer dans un processus neuf)"""
+    corpus = Corpus("Benchmark")
+    if mode is not None:
+        corpus.set_deduplication(mode)
+    lignes = list(GenerateurCorpus(graine=graine).iter_lignes_avec_doublons(nb_docs, part_doublons))
+    debut = time.perf_counter()
+    ids = []
+    for i in range(0, nb_docs, 10000):
+        docs = (DocumentFactory.create_document(type_doc.lower(), titre, auteur, date, url, texte)
+                for (titre, auteur, date, url, texte, type_doc), _ in lignes[i:i + 10000])
+        ids += corpus.add_documents(docs)
+    ajout = time.perf_counter() - debut
+    
+    # un document est détecté comme doublon si son id est celui d'un document déjà ajouté
+    vus, detectes = set(), []
+    for doc_id in ids:
+        detectes.append(doc_id in vus)
+        vus.add(doc_id)
+    injectes = np.array([doublon for _, doublon in lignes])
+    detectes = np.array(detectes)
+    vrais = int((injectes & detectes).sum())
+    
+    debut = time.perf_counter()
+    moteur = SearchEngine(corpus, taille_cache=0)
+    construction = time.perf_counter() - debut
+    return {"mode": mode or "aucun", "nb_docs": nb_docs, "injectes": int(injectes.sum()),
+            "doublons": int(detectes.sum()), "rappel": vrais / max(int(injectes.sum()), 1),
+            "precision": vrais / max(int(detectes.sum()), 1), "nb_docs_indexes": corpus.ndoc,
+            "ajout_s": ajout, "construction_s": construction, "nnz_TF": int(moteur.mat_TF.nnz),
+            "nb_mots": len(moteur.vocab), "index_mo": taille_index_creux(moteur) / (1 << 20),
+            "rss_max_mo": rss_max_mo()}
+
+
+def mesurer_distribue(nb_docs, liste_shards=(1, 2, 4, 8), nb_requetes=200, scorer="tfidf", graine=0):
+    """Corpus synthétique découpé en shards (corpus indépendants) : construction, latences et débit d'un
+    MoteurDistribue, écart des scores du top-10 avec le moteur à un seul shard"""
+    generateur = GenerateurCorpus(graine=graine)
+    docs = list(generateur.iter_documents(nb_docs))
+    requetes = requetes_synthetiques(generateur, nb_requetes, graine)
+    resultats, reference = [], None
+    for nb_shards in liste_shards:
+        bornes = np.linspace(0, nb_docs, nb_shards + 1).astype(int)
+        shards = []
+        for i in range(nb_shards):
+            corpus = Corpus(f"shard {i}")
+            corpus.add_documents(docs[bornes[i]:bornes[i + 1]])
+            shards.append(corpus)
+        
+        debut = time.perf_counter()
+        moteur = MoteurDistribue(shards, n_threads=nb_shards, scorer=scorer, taille_cache=0)
+        moteur.search(requetes[0]) # statistiques globales fusionnées, poids calculés
+        construction = time.perf_counter() - debut
+        
+        durees, scores = [], []
+        debut = time.perf_counter()
+        for requete in requetes:
+            t = time.perf_counter()
+            scores.append(moteur.search(requete, 10, dataframe=False).scores)
+            durees.append(time.perf_counter() - t)
+        total = time.perf_counter() - debut
+        moteur.fermer()
+        
+        reference = reference or scores
+        ecart = max((float(np.max(np.abs(np.subtract(a, b)))) for a, b in zip(reference, scores)
+                     if len(a) == len(b) and len(a)), default=0.0)
+        resultats.append({"nb_shards": nb_shards, "nb_docs": nb_docs, "construction_s": construction,
+                          "search_ms": percentiles_ms(durees), "requetes_par_s": len(requetes) / total,
+                          "ecart_scores_max": ecart,
+                          "tailles_differentes": sum(len(a) != len(b) for a, b in zip(reference, scores))})
+    return resultats
+
+
+def commit_courant():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _valeurs(mesures, prefixe=""):
+    # aplatit les mesures numériques : {"load.s": ..., "search_ms.p95": ...}
+    valeurs = {}
+    for nom, valeur in mesures.items():
+        if isinstance(valeur, dict):
+            valeurs.update(_valeurs(valeur, prefixe + nom + "."))
+        elif isinstance(valeur, list):
+            for element in valeur:
+                valeurs.update(_valeurs({k: v for k, v in element.items() if k != "rang"},
+                                        f"{prefixe}{nom}[{element.get('rang')}]."))
+        elif isinstance(valeur, (int, float)) and not isinstance(valeur, bool):
+            valeurs[prefixe + nom] = valeur
+    return valeurs
+
+
+def comparer(avant, apres):
+    """Affiche, pour chaque taille commune, le rapport apres / avant de chaque mesure"""
+    par_taille = {m["nb_docs"]: m for m in avant["resultats"]}
+    for mesures in apres["resultats"]:
+        reference = par_taille.get(mesures["nb_docs"])
+        if reference is None:
+            continue
+        print(f"\n{mesures['nb_docs']} documents ({avant.get('commit', '?')[:8]} -> {apres.get('commit', '?')[:8]})")
+        valeurs_avant = _valeurs(reference)
+        for nom, valeur in _valeurs(mesures).items():
+            if nom in valeurs_avant and valeurs_avant[nom]:
+                print(f"  {nom:35s} {valeurs_avant[nom]:12.4g} {valeur:12.4g}  x{valeur / valeurs_avant[nom]:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sous_commandes = parser.add_subparsers(dest="commande", required=True)
+    
+    p = sous_commandes.add_parser("suite", help="mesures sur des corpus synthétiques de tailles croissantes")
+    p.add_argument("--tailles", type=int, nargs="+", default=[1000, 10000, 100000])
+    p.add_argument("--dossier", default="benchmark_donnees", help="fichiers synthétiques (réutilisés)")
+    p.add_argument("--requetes", type=int, default=200)
+    p.add_argument("--graine", type=int, default=0)
+    p.add_argument("--workers", type=int, default=1)
+    p.add_argument("--json", help="fichier de sortie JSON")
+    
+    p = sous_commandes.add_parser("comparer", help="compare deux fichiers JSON de la suite")
+    p.add_argument("avant")
+    p.add_argument("apres")
+    p.set_defaults(json=None)
+
+    p = sous_commandes.add_parser("parallele", help="courbe d'accélération de la construction de l'index")
+    p.add_argument("--fichier", default="corpus.tsv")
+    p.add_argument("--repetitions", type=int, default=100, help="nombre de copies du corpus")
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    p.add_argument("--taille-shard", type=int, default=5000)
+    p.add_argument("--essais", type=int, default=3)
+    p.add_argument("--json", help="fichier de sortie JSON")
+
+    p = sous_commandes.add_parser("dense", help="index dense (LSA) comparé au moteur exact")
+    p.add_argument("--fichier", help="corpus TSV (sinon corpus synthétique)")
+    p.add_argument("--nb-docs", type=int, default=10000)
+    p.add_argument("--dossier", default="benchmark_donnees")
+    p.add_argument("--dimensions", type=int, nargs="+", default=[128])
+    p.add_argument("--clusters", type=int, nargs="+", default=[0])
+    p.add_argument("--sondes", type=int, default=8)
+    p.add_argument("--candidats", type=int, default=100)
+    p.add_argument("--requetes", type=int, default=200)
+    p.add_argument("--graine", type=int, default=0)
+    p.add_argument("--json", help="fichier de sortie JSON")
+
+    p = sous_commandes.add_parser("documents", help="mémoire des documents : objets ou stock en colonnes")
+    p.add_argument("--nb-docs", type=int, default=100000)
+    p.add_argument("--graine", type=int, default=0)
+    p.add_argument("--json", help="fichier de sortie JSON")
+
+    p = sous_commandes.add_parser("doublons", help="index sans et avec déduplication des quasi-doublons")
+    p.add_argument("--nb-docs", type=int, default=100000)
+    p.add_argument("--part-doublons", type=float, default=0.2)
+    p.add_argument("--mode", default="supprimer", choices=["supprimer", "regrouper"])
+    p.add_argument("--graine", type=int, default=0)
+    p.add_argument("--json", help="fichier de sortie JSON")
+
+    p = sous_commandes.add_parser("distribue", help="recherche distribuée selon le nombre de shards")
+    p.add_argument("--nb-docs", type=int, default=100000)
+    p.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    p.add_argument("--requetes", type=int, default=200)
+    p.add_argument("--scorer", default="tfidf", choices=["tfidf", "bm25"])
+    p.add_argument("--graine", type=int, default=0)
+    p.add_argument("--json", help="fichier de sortie JSON")
+
+    args = parser.parse_args()
+    
+    if args.commande == "suite":
+        resultats = {
+            "commit": commit_courant(),
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "machine": {"python": platform.python_version(), "systeme": platform.platform(),
+                        "processeurs": os.cpu_count(), "numpy": np.__version__},
+            "parametres": {"requetes": args.requetes, "graine": args.graine, "workers": args.workers},
+            "resultats": suite(args.tailles, args.dossier, args.requetes, args.graine, args.workers),
+        }
+    
+    if args.commande == "comparer":
+        with open(args.avant, encoding="utf-8") as f:
+            avant = json.load(f)
+        with open(args.apres, encoding="utf-8") as f:
+            apres = json.load(f)
+        comparer(avant, apres)
+
+    if args.commande == "parallele":
+        corpus = charger_corpus(args.fichier, args.repetitions)
+        print(f"{corpus}")
+        resultats = courbe_acceleration(corpus, args.workers, args.taille_shard, args.essais)
+        for r in resultats:
+            print(f"{r['n_workers']:3d} processus : {r['temps']:.2f} s (x{r['acceleration']:.2f})")
+
+    if args.commande == "dense":
+        generateur = GenerateurCorpus(graine=args.graine)
+        fichier = args.fichier
+        if fichier is None:
+            os.makedirs(args.dossier, exist_ok=True)
+            fichier = os.path.join(args.dossier, f"synthetique_{args.nb_docs}_{args.graine}.tsv")
+            if not os.path.exists(fichier):
+                generateur.ecrire_tsv(fichier, args.nb_docs)
+        corpus = Corpus.load(fichier, nom="Benchmark")
+        debut = time.perf_counter()
+        moteur = SearchEngine(corpus, taille_cache=0)
+        construction_exacte = time.perf_counter() - debut
+        if args.fichier:
+            # requêtes tirées du vocabulaire du corpus (mots présents dans au moins deux documents)
+            hasard = np.random.default_rng(args.graine)
+            mots = [moteur.vocab.mot(mot_id) for mot_id in np.flatnonzero(moteur.vocab.nb_documents >= 2)]
+            requetes = [" ".join(hasard.choice(mots, size=hasard.integers(1, 4))) for _ in range(args.requetes)]
+        else:
+            requetes = requetes_synthetiques(generateur, args.requetes, args.graine)
+        resultats = mesurer_dense(moteur, requetes, args.dimensions, args.clusters, args.sondes, args.candidats)
+        resultats[0]["construction_s"] = construction_exacte
+        print(f"{corpus}")
+        for r in resultats:
+            print(f"{r['configuration']:28s} construction {r.get('construction_s', 0):7.2f} s, "
+                  f"mémoire {r['memoire_mo']:8.1f} Mo, search p50/p95 {r['search_ms']['p50']:.2f}/"
+                  f"{r['search_ms']['p95']:.2f} ms, rappel@10 {r['rappel']:.3f}")
+
+    if args.commande == "documents":
+        resultats = mesurer_documents(args.nb_docs, args.graine)
+        for r in resultats:
+            print(f"{r['stockage']:7s} mémoire {r['memoire_mo']:8.1f} Mo (textes {r['textes_mo']:.1f} Mo), "
+                  f"{r['octets_par_doc_hors_textes']:6.0f} octets/document hors textes, "
+                  f"remplissage {r['remplissage_s']:.2f} s, lecture des textes {r['lecture_textes_s']:.3f} s")
+
+    if args.commande == "doublons":
+        # un processus par mode : pic de mémoire mesuré séparément
+        resultats = []
+        contexte = multiprocessing.get_context("spawn")
+        for mode in (None, args.mode):
+            with ProcessPoolExecutor(max_workers=1, mp_context=contexte) as executeur:
+                resultats.append(executeur.submit(mesurer_doublons, args.nb_docs, args.part_doublons, mode,
+                                                  args.graine).result())
+        for r in resultats:
+            print(f"{r['mode']:10s} {r['nb_docs_indexes']:8d} documents indexés ({r['doublons']} doublons, "
+                  f"rappel {r['rappel']:.3f}, précision {r['precision']:.3f}), ajout {r['ajout_s']:.2f} s, "
+                  f"index {r['construction_s']:.2f} s, {r['nnz_TF']} valeurs TF, {r['index_mo']:.1f} Mo")
+        sans, avec = resultats
+        print(f"index : -{1 - avec['index_mo'] / sans['index_mo']:.1%}, valeurs TF : "
+              f"-{1 - avec['nnz_TF'] / sans['nnz_TF']:.1%}")
+
+    if args.commande == "distribue":
+        resultats = mesurer_distribue(args.nb_docs, args.shards, args.requetes, args.scorer, args.graine)
+        print(f"{args.nb_docs} documents, {os.cpu_count()} coeurs")
+        for r in resultats:
+            print(f"{r['nb_shards']:3d} shards : construction {r['construction_s']:6.2f} s, search p50/p95 "
+                  f"{r['search_ms']['p50']:.2f}/{r['search_ms']['p95']:.2f} ms, {r['requetes_par_s']:7.1f} "
+                  f"requêtes/s, écart des scores {r['ecart_scores_max']:.1e}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultats, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Test de charge du serveur de recherche : débit et latences (p50 / p95 / p99).
+
+    python client_charge.py --url http://127.0.0.1:8000 --connexions 16 --requetes 5000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import urllib.parse
+import numpy as np
+
+REQUETES = ["machine learning", "deep learning neural network", "data science", "python",
+            "model training data gpu", "reinforcement learning", "computer vision", "transformer"]
+
+
+async def _client(hote, port, requetes, k, latences, erreurs):
+    # une connexion persistante qui enchaîne ses requêtes
+    lecteur, ecrivain = await asyncio.open_connection(hote, port)
+    try:
+        for requete in requetes:
+            cible = "/search?" + urllib.parse.urlencode({"q": requete, "k": k})
+            debut = time.perf_counter()
+            ecrivain.write(f"GET {cible} HTTP/1.1\r\nHost: {hote}\r\n\r\n".encode("latin-1"))
+            await ecrivain.drain()
+
+            statut = int((await lecteur.readline()).split()[1])
+            longueur = 0
+            while True:
+                ligne = await lecteur.readline()
+                if not ligne.strip():
+                    break
+                nom, _, valeur = ligne.decode("latin-1").partition(":")
+                if nom.strip().lower() == "content-length":
+                    longueur = int(valeur)
+            json.loads(await lecteur.readexactly(longueur))
+
+            latences.append(time.perf_counter() - debut)
+            if statut != 200:
+                erreurs.append(statut)
+    finally:
+        ecrivain.close()
+
+
+async def charger(url, connexions=8, nb_requetes=1000, k=10, requetes=REQUETES, graine=0):
+    """Envoie nb_requetes requêtes réparties sur plusieurs connexions simultanées ; retourne les mesures"""
+    adresse = urllib.parse.urlsplit(url)
+    hasard = random.Random(graine)
+    tirage = [hasard.choice(requetes) for _ in range(nb_requetes)]
+    parts = [tirage[i::connexions] for i in range(connexions)]
+
+    latences, erreurs = [], []
+    debut = time.perf_counter()
+    await asyncio.gather(*(_client(adresse.hostname, adresse.port, part, k, latences, erreurs)
+                           for part in parts if part))
+    duree = time.perf_counter() - debut
+
+    latences_ms = np.array(latences) * 1000
+    return {
+        "requetes": len(latences),
+        "erreurs": len(erreurs),
+        "duree_s": duree,
+        "debit_req_s": len(latences) / duree if duree else 0.0,
+        "latence_ms": {
+            "moyenne": float(latences_ms.mean()) if len(latences_ms) else 0.0,
+            "p50": float(np.percentile(latences_ms, 50)) if len(latences_ms) else 0.0,
+            "p95": float(np.percentile(latences_ms, 95)) if len(latences_ms) else 0.0,
+            "p99": float(np.percentile(latences_ms, 99)) if len(latences_ms) else 0.0,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--connexions", type=int, default=8)
+    parser.add_argument("--requetes", type=int, default=1000)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--fichier-requetes", help="une requête par ligne (sinon une liste par défaut)")
+    parser.add_argument("--json", help="fichier de sortie JSON")
+    args = parser.parse_args()
+
+    requetes = REQUETES
+    if args.fichier_requetes:
+        with open(args.fichier_requetes, encoding="utf-8") as f:
+            requetes = [ligne.strip() for ligne in f if ligne.strip()]
+
+    mesures = asyncio.run(charger(args.url, args.connexions, args.requetes, args.k, requetes))
+    latence = mesures["latence_ms"]
+    print(f"{mesures['requetes']} requêtes en {mesures['duree_s']:.2f} s "
+          f"({mesures['debit_req_s']:.0f} req/s, {mesures['erreurs']} erreurs)")
+    print(f"latence : moyenne {latence['moyenne']:.2f} ms, p50 {latence['p50']:.2f} ms, "
+          f"p95 {latence['p95']:.2f} ms, p99 {latence['p99']:.2f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(mesures, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
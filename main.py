@@ -1,100 +1,36 @@
 # -*- coding: utf-8 -*-
 
-import praw
-import urllib.request
-import xmltodict
 import pandas as pd
 import os
-from datetime import datetime
 from Corpus import Corpus
-from DocumentFactory import DocumentFactory
 from SearchEngine import SearchEngine
+from Ingestion import Ingestion
 
 THEME = "machine learning"
 NB_DOCS_ARXIV = 25
 NB_DOCS_REDDIT = 25
 CACHE_FILE = "corpus.tsv"
+CHECKPOINT_FILE = "collecte.json" # état d'une collecte en cours (supprimé quand elle se termine)
+INDEX_DIR = "index_moteur" # index du moteur sauvegardé (réutilisé si corpus et réglages inchangés)
 
-# Si le fichier cache existe, charger depuis le fichier
-if os.path.exists(CACHE_FILE):
+# Si le fichier cache existe (et qu'aucune collecte n'est en cours), charger depuis le fichier
+if os.path.exists(CACHE_FILE) and not os.path.exists(CHECKPOINT_FILE):
     print(f"Chargement du corpus depuis '{CACHE_FILE}'...")
     corpus = Corpus.load(CACHE_FILE, nom="Mon Corpus ML")
     print(f"Corpus chargé : {corpus}")
 else:
-    # Sinon, créer un nouveau corpus et récupérer depuis les APIs
-    corpus = Corpus("Mon Corpus ML")
-
-    print("Récupérer des données depuis Reddit")
-    reddit = praw.Reddit(
-        client_id='G26th_edvZT5GcdyivWzcw',
-        client_secret='wh_cBVDMSUlCX0uJCVlt_Qjn4Cd-mA',
-        user_agent='monApp'
-    )
-    subreddit = reddit.subreddit("all")
-
-    for post in subreddit.search(THEME, limit=NB_DOCS_REDDIT):
-        titre = post.title
-        auteur = str(post.author)
-        date = datetime.fromtimestamp(post.created_utc)
-        url = f"https://reddit.com{post.permalink}"
-        texte = (post.title + " " + post.selftext).replace("\n", " ")
-        num_comments = post.num_comments
-        # filtrer des textes trop courts (< 20 caractères)
-        if len(texte.strip()) >= 20:
-            doc = DocumentFactory.create_document(
-                "reddit", titre, auteur, date, url, texte,
-                num_comments=num_comments
-            )
-            corpus.add(doc)
-
-    print(f"Reddit : {corpus.ndoc} documents récupérés")
-
-    print("Récupérer des données depuis Arxiv")
-    base_url = "http://export.arxiv.org/api/query?"
-    query = f"search_query=all:{THEME.replace(' ', '+')}&start=0&max_results={NB_DOCS_ARXIV}"
-    url = base_url + query
-
-    with urllib.request.urlopen(url) as response:
-        data = response.read()
-
-    parsed = xmltodict.parse(data)
-    entries = parsed["feed"].get("entry", [])
-
-    if isinstance(entries, dict):
-        entries = [entries]
-
-    for entry in entries:
-        titre = entry.get("title", "").replace("\n", " ")
-
-        authors_data = entry.get("author", [])
-        if isinstance(authors_data, dict):
-            authors_data = [authors_data]
-
-        authors_list = [a.get("name", "Unknown") for a in authors_data]
-        auteur = authors_list[0] if authors_list else "Unknown"
-        co_auteurs = authors_list[1:] if len(authors_list) > 1 else []
-
-        date_str = entry.get("published", "")
-        try:
-            date = datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%SZ")
-        except:
-            date = datetime.now()
-
-        url = entry.get("id", "")
-        texte = entry.get("summary", "").replace("\n", " ")
-
-        # filtrer des textes trop courts
-        if len(texte.strip()) >= 20:
-            doc = DocumentFactory.create_document(
-                "arxiv", titre, auteur, date, url, texte,
-                co_auteurs=co_auteurs
-            )
-            corpus.add(doc)
-
-    print(f"Arxiv : {len(entries)} documents ajoutés")
-
-    # sauvegarde du corpus sur disque
-    corpus.save(CACHE_FILE)
+    # Sinon, récupérer depuis les APIs (en reprenant une collecte interrompue s'il y en a une)
+    if os.path.exists(CACHE_FILE):
+        corpus = Corpus.load(CACHE_FILE, nom="Mon Corpus ML")
+        print(f"Reprise de la collecte : {corpus.ndoc} documents déjà récupérés")
+    else:
+        corpus = Corpus("Mon Corpus ML")
+
+    print("Récupérer des données depuis Reddit et Arxiv")
+    ingestion = Ingestion(corpus, THEME, nb_reddit=NB_DOCS_REDDIT, nb_arxiv=NB_DOCS_ARXIV,
+                          checkpoint=CHECKPOINT_FILE, fichier_corpus=CACHE_FILE)
+    nb_ajoutes = ingestion.lancer()
+    print(f"{nb_ajoutes} documents ajoutés")
     print(f"\nFichier '{CACHE_FILE}' sauvegardé avec succès.")
 
 # afficher le résumé du corpus
@@ -144,7 +80,8 @@ freq_table = corpus.stats(n=15)
 
 # TD7: moteur de recherche
 
-moteur = SearchEngine(corpus)
+# réutiliser l'index sauvegardé s'il correspond au corpus, sinon le reconstruire
+moteur = SearchEngine.charger_ou_construire(corpus, INDEX_DIR, CACHE_FILE)
 
 # Afficher les statistiques du vocabulaire
 print("\n--- Statistiques du vocabulaire ---")
@@ -168,15 +105,16 @@ while True:
     if requete_user.lower() == 'quit':
         break
     
-    resultats = moteur.search(requete_user, nb_resultats=5)
+    # résultats compacts : pas de DataFrame pour un simple affichage
+    resultats = moteur.search(requete_user, nb_resultats=5, dataframe=False)
     
     if len(resultats) > 0:
         print(f"\n{len(resultats)} résultats trouvés :")
-        for idx, row in resultats.iterrows():
-            print(f"\n{idx+1}. [{row['type']}] {row['titre']}")
-            print(f"   Auteur: {row['auteur']}")
-            print(f"   Score: {row['score']:.4f}")
-            print(f"   URL: {row['url']}")
+        for idx, row in enumerate(resultats):
+            print(f"\n{idx+1}. [{row.type}] {row.titre}")
+            print(f"   Auteur: {row.auteur}")
+            print(f"   Score: {row.score:.4f}")
+            print(f"   URL: {row.url}")
     else:
         print("Aucun résultat trouvé.")
 
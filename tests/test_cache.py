@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from Corpus import Corpus
+from SearchEngine import SearchEngine, CacheResultats
+from DocumentFactory import DocumentFactory
+
+
+def _document(texte, i=0):
+    return DocumentFactory.create_document("document", f"titre {i}", "auteur", "2024-01-01", f"u{i}", texte)
+
+
+def test_cache_lru():
+    cache = CacheResultats(taille_max=2)
+    cache.put("a", 1, version=0)
+    cache.put("b", 2, version=0)
+    assert cache.get("a", 0) == 1 # "a" devient le plus récent
+    cache.put("c", 3, version=0) # "b" est évincé
+    assert cache.get("b", 0) is None and cache.get("c", 0) == 3
+    assert cache.stats() == {"taille": 2, "taille_max": 2, "hits": 2, "misses": 1, "evictions": 1,
+                             "invalidations": 0}
+
+    # nouvelle version : toutes les entrées sont invalidées
+    assert cache.get("a", 1) is None
+    assert cache.stats()["taille"] == 0 and cache.stats()["invalidations"] == 1
+
+
+def test_cache_du_moteur():
+    corpus = Corpus("test")
+    corpus.add_documents(_document(texte, i) for i, texte in enumerate(
+        ["machine learning", "deep learning model", "the machine", "cooking"]))
+    moteur = SearchEngine(corpus)
+    sans_cache = SearchEngine(corpus, taille_cache=0)
+
+    premier = moteur.search("machine learning", 5, dataframe=False)
+    # même requête normalisée : servie par le cache, identique à une recherche sans cache
+    second = moteur.search("  Machine LEARNING! ", 5, dataframe=False)
+    assert second is premier and moteur.stats_cache()["hits"] == 1
+    attendu = sans_cache.search("machine learning", 5, dataframe=False)
+    assert second.doc_ids.tolist() == attendu.doc_ids.tolist() and np.allclose(second.scores, attendu.scores)
+
+    # k, filtres et réglage stopwords font partie de la clé
+    moteur.search("machine learning", 1, dataframe=False)
+    moteur.search("machine learning", 5, dataframe=False, auteur="auteur")
+    moteur.search("machine learning", 5, dataframe=False, stopwords=True)
+    assert moteur.stats_cache()["hits"] == 1
+
+    # ajout d'un document : nouvelle version du corpus, le résultat est recalculé
+    corpus.add(_document("machine learning machine learning", 4))
+    resultats = moteur.search("machine learning", 5, dataframe=False)
+    assert 4 in resultats.doc_ids.tolist() and moteur.stats_cache()["invalidations"] == 1
+    # réglage stopwords par défaut dans la clé, nouvelle liste de stopwords : nouvelle version
+    corpus.set_stopwords(not corpus.stopwords_enabled)
+    moteur.search("machine learning", 5, dataframe=False)
+    assert moteur.stats_cache()["hits"] == 1
+    corpus.set_liste_stopwords(["the"])
+    moteur.search("machine learning", 5, dataframe=False)
+    assert moteur.stats_cache()["invalidations"] == 2 and moteur.stats_cache()["hits"] == 1
+    assert sans_cache.stats_cache()["taille"] == 0
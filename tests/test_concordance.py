@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+import re
+import numpy as np
+import pytest
+from Corpus import Corpus
+from CorpusSynthetique import GenerateurCorpus
+from DocumentFactory import DocumentFactory
+
+
+def _occurrences(corpus, expression):
+    # parcours complet de tous les documents (référence)
+    motif = re.compile(re.escape(expression), re.IGNORECASE)
+    return [(doc_id, m.start()) for doc_id in corpus.id2doc for m in motif.finditer(corpus.id2doc[doc_id].texte)]
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    corpus = Corpus("test")
+    corpus.add_documents(GenerateurCorpus(graine=2).iter_documents(400))
+    for texte in ("Le machine-learning, c'est l'apprentissage2automatique !", "deep learning et MACHINE learning"):
+        corpus.add(DocumentFactory.create_document("document", "t", "a", "2020-01-01", "u", texte))
+    return corpus
+
+
+def test_expressions(corpus):
+    mots = corpus._termes[:40:7]
+    expressions = ["learn", "e-learn", "ine learning", "machine l", "apprentissage2auto", "ssage2",
+                   "c'est l'app", "zzzqq"]
+    expressions += [m[1:] for m in mots] + [f"{a[1:]} {b[:2]}" for a, b in zip(mots, mots[1:])]
+    for expression in expressions:
+        obtenues = [doc_id for doc_id, _ in corpus.iter_search(expression)]
+        assert obtenues == [doc_id for doc_id, _ in _occurrences(corpus, expression)], expression
+
+
+def test_postings_incrementaux(corpus):
+    corpus._documents_candidats("learning")
+    corpus.add_documents(GenerateurCorpus(graine=5).iter_documents(50))
+    corpus._documents_candidats("learning")
+    paires = sorted((int(t), doc_id) for doc_id in corpus.id2doc for t in np.unique(corpus.tokens_document(doc_id)))
+    assert list(zip(corpus._postings_termes.tolist(), corpus._postings_docs.tolist())) == paires
+    assert corpus._termes_tries == sorted(corpus._termes)
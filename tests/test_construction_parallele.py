@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from Corpus import Corpus
+from SearchEngine import SearchEngine
+from CorpusSynthetique import GenerateurCorpus
+
+
+def _corpus(documents):
+    corpus = Corpus("test")
+    corpus.add_documents(documents)
+    return corpus
+
+
+def _identiques(parallele, serie):
+    assert parallele.vocab.mots() == serie.vocab.mots()
+    assert np.array_equal(parallele.vocab.total_occurrences, serie.vocab.total_occurrences)
+    assert np.array_equal(parallele.vocab.nb_documents, serie.vocab.nb_documents)
+    for nom in ("data", "indices", "indptr"):
+        assert np.array_equal(getattr(parallele.mat_TF, nom), getattr(serie.mat_TF, nom)), nom
+    assert np.allclose(parallele.mat_TFxIDF_norm.toarray(), serie.mat_TFxIDF_norm.toarray())
+    # cache de tokens du corpus complété par les processus
+    for doc_id in range(0, serie.corpus.ndoc, 37):
+        assert np.array_equal(parallele.corpus.tokens_document(doc_id), serie.corpus.tokens_document(doc_id))
+
+
+def test_construction_parallele_identique_a_la_construction_en_serie():
+    documents = list(GenerateurCorpus(nb_mots=3000, graine=9).iter_documents(500))
+    serie = SearchEngine(_corpus(documents[:400]))
+    parallele = SearchEngine(_corpus(documents[:400]), n_workers=2, taille_shard=60)
+    _identiques(parallele, serie)
+
+    # ajout de plus d'un shard de documents : comptés en parallèle eux aussi
+    for moteur in (serie, parallele):
+        moteur.corpus.add_documents(documents[400:])
+        moteur.mettre_a_jour()
+    _identiques(parallele, serie)
+    requete = serie.vocab.mot(int(np.argmax(serie.vocab.nb_documents)))
+    assert parallele.search(requete, 10, dataframe=False).doc_ids.tolist() == \
+        serie.search(requete, 10, dataframe=False).doc_ids.tolist()
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+from datetime import datetime
+import pandas as pd
+import pytest
+from Corpus import Corpus
+from DocumentFactory import DocumentFactory
+
+
+def _documents():
+    # tabulations, retours à la ligne, guillemets et valeurs manquantes
+    return [
+        DocumentFactory.create_document("reddit", "t\tab", 'a"q', "2025-01-01 10:00:00", "u1",
+                                        'ligne\nsuivante \r x "cité" \t tab'),
+        DocumentFactory.create_document("arxiv", "n", None, datetime(2024, 5, 6, 7, 8, 9), float("nan"), "é µ"),
+    ] + [DocumentFactory.create_document("document", f"titre {i}", f"a{i % 3}", f"2024-01-{i + 1:02d}",
+                                         f"u{i}", f"texte numéro {i}") for i in range(20)]
+
+
+def _champs(doc):
+    # valeur manquante (None ou NaN) relue comme NaN : comparée comme absente
+    return tuple(None if pd.isna(v) else v for v in (doc.titre, doc.auteur, doc.date, doc.url, doc.texte,
+                                                     doc.getType()))
+
+
+@pytest.mark.parametrize("chunksize", [3, 10000])
+def test_sauvegarde_et_chargement_par_blocs(tmp_path, chunksize):
+    corpus = Corpus("test")
+    corpus.add_documents(_documents())
+    fichier = str(tmp_path / "corpus.tsv")
+    corpus.save(fichier)
+
+    # même fichier que l'écriture par DataFrame, relu à l'identique quelle que soit la taille des blocs
+    attendu = str(tmp_path / "attendu.tsv")
+    corpus.to_dataframe().to_csv(attendu, sep="\t", index=False)
+    with open(fichier, "rb") as f, open(attendu, "rb") as g:
+        assert f.read() == g.read()
+    relu = Corpus.load(fichier, chunksize=chunksize)
+    assert relu.ndoc == corpus.ndoc and relu.naut == corpus.naut
+    assert [_champs(d) for d in relu.id2doc.values()] == [_champs(d) for d in corpus.id2doc.values()]
+    assert [d.texte for d in Corpus.iter_tsv(fichier, chunksize)] == [d.texte for d in corpus.id2doc.values()]
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from Corpus import Corpus
+from SearchEngine import SearchEngine
+from CorpusSynthetique import GenerateurCorpus
+from DocumentFactory import DocumentFactory
+
+
+def _copie(doc, auteur):
+    # quasi-doublon : un mot changé, autres titre, auteur et url
+    mots = doc.texte.split()
+    mots[len(mots) // 2] = "motchange"
+    return DocumentFactory.create_document("reddit", "repost " + doc.titre, auteur, "2025-11-01", "u",
+                                           " ".join(mots))
+
+
+@pytest.fixture(scope="module")
+def documents():
+    generateur = GenerateurCorpus(nb_mots=2000, graine=14)
+    return [d for d in generateur.iter_documents(300) if len(d.texte.split()) >= 60][:40]
+
+
+@pytest.mark.parametrize("mode", ["supprimer", "regrouper"])
+def test_quasi_doublons(documents, mode):
+    corpus = Corpus("test")
+    corpus.add_documents(documents[:30])
+    corpus.set_deduplication(mode)
+    # documents déjà présents indexés : une copie retourne l'id de son canonique sans être ajoutée
+    assert corpus.add(_copie(documents[3], "a")) == 3 and corpus.ndoc == 30
+    ids = corpus.add_documents([documents[30], _copie(documents[30], "b"), _copie(documents[5], "c")])
+    assert ids == [30, 30, 5] and corpus.ndoc == 31 and corpus.nb_doublons == 3
+    assert corpus.add(documents[31]) == 31
+    if mode == "supprimer":
+        assert corpus.doublons == {}
+    else:
+        assert {cle: [d.auteur for d in liste] for cle, liste in corpus.doublons.items()} == \
+            {3: ["a"], 30: ["b"], 5: ["c"]}
+
+    # recherche : les doublons ne sont jamais indexés ; doublons=True les place sous leur document
+    moteur = SearchEngine(corpus, taille_cache=0)
+    assert moteur.mat_TF.shape[0] == corpus.ndoc
+    requete = " ".join(documents[3].texte.split()[:8])
+    resultats = moteur.search(requete, 5, dataframe=False)
+    regroupes = moteur.search(requete, 5, doublons=True)
+    assert resultats.doc_ids[0] == 3
+    attendus = []
+    for doc_id, score in zip(resultats.doc_ids.tolist(), resultats.scores.tolist()):
+        attendus.append((doc_id, corpus.id2doc[doc_id].auteur, score))
+        attendus += [(doc_id, d.auteur, score) for d in corpus.doublons.get(doc_id, ())]
+    assert list(zip(regroupes.doc_id, regroupes.auteur, regroupes.score)) == attendus
+    assert len(regroupes) == len(resultats) + (mode == "regrouper")
+
+
+def test_documents_distincts_gardes(documents):
+    corpus = Corpus("test")
+    corpus.set_deduplication("supprimer")
+    assert corpus.add_documents(documents) == list(range(len(documents))) and corpus.nb_doublons == 0
+    with pytest.raises(ValueError):
+        corpus.set_deduplication("inconnu")
+    corpus.set_deduplication(None)
+    assert corpus.add(_copie(documents[0], "a")) == len(documents)
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+from datetime import datetime
+import pandas as pd
+import pytest
+from Corpus import Corpus
+from SearchEngine import SearchEngine
+from CorpusSynthetique import GenerateurCorpus
+from DocumentFactory import DocumentFactory
+
+
+@pytest.fixture(scope="module")
+def moteur():
+    corpus = Corpus("test")
+    corpus.add_documents(GenerateurCorpus(nb_mots=300, nb_auteurs=5, graine=10).iter_documents(300))
+    corpus.add(DocumentFactory.create_document("arxiv", "sans date", "X", None, "u", "the and of"))
+    return SearchEngine(corpus, taille_cache=0)
+
+
+@pytest.mark.parametrize("backend", ["index", "matrice"])
+def test_filtres_avant_top_k(moteur, backend):
+    moteur.backend = backend
+    auteur = next(doc.auteur for doc in moteur.corpus.id2doc.values() if doc.getType() == "Reddit")
+    for requete in ("the", "and of", "a the"):
+        # tous les résultats, puis filtrés après coup : les filtres doivent donner les 5 premiers
+        tous = moteur.search(requete, 10 ** 6)
+        dates = pd.to_datetime(tous.date)
+        cas = [
+            ({"type_doc": "arxiv"}, tous.type == "Arxiv"),
+            ({"type_doc": ["Reddit"], "auteur": auteur}, (tous.type == "Reddit") & (tous.auteur == auteur)),
+            ({"auteur": [auteur, "inconnu"]}, tous.auteur == auteur),
+            ({"date_debut": "2020-01-01", "date_fin": datetime(2021, 6, 30)},
+             (dates >= "2020-01-01") & (dates <= "2021-06-30")),
+            ({"date_fin": "2019-03-01 12:00"}, dates <= "2019-03-01 12:00"),
+            ({"auteur": "inconnu"}, tous.doc_id < 0),
+        ]
+        for filtres, selection in cas:
+            attendus = tous[selection].doc_id.head(5).tolist()
+            assert len(attendus) > 0 or filtres == {"auteur": "inconnu"}
+            obtenus = moteur.search(requete, 5, dataframe=False, **filtres)
+            assert obtenus.doc_ids.tolist() == attendus, (requete, filtres)
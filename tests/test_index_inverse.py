@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+from Corpus import Corpus
+from SearchEngine import SearchEngine
+from CorpusSynthetique import GenerateurCorpus
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    corpus = Corpus("test")
+    corpus.add_documents(GenerateurCorpus(nb_mots=2000, graine=7).iter_documents(400))
+    return corpus
+
+
+def _requetes(moteur, nb=100):
+    # requêtes de 1 à 5 mots parmi les 300 mots les plus fréquents
+    hasard = np.random.default_rng(0)
+    mots = [moteur.vocab.mot(int(i)) for i in np.argsort(-moteur.vocab.nb_documents)[:300]]
+    return [" ".join(hasard.choice(mots, size=hasard.integers(1, 6))) for _ in range(nb)]
+
+
+def test_index_inverse_egal_produit_complet(corpus):
+    moteur = SearchEngine(corpus, taille_cache=0)
+    sans_elagage = SearchEngine(corpus, arret_anticipe=False, taille_cache=0)
+    complet = SearchEngine(corpus, backend="matrice", taille_cache=0)
+    for requete in _requetes(moteur):
+        for k in (1, 5, 10):
+            attendus = complet.search(requete, k, dataframe=False)
+            for autre in (moteur, sans_elagage):
+                obtenus = autre.search(requete, k, dataframe=False)
+                assert obtenus.doc_ids.tolist() == attendus.doc_ids.tolist(), requete
+                assert np.allclose(obtenus.scores, attendus.scores), requete
+
+
+def test_postings(corpus):
+    moteur = SearchEngine(corpus)
+    for mot_id in np.argsort(-moteur.vocab.nb_documents)[[0, 10, 100]]:
+        docs, poids = moteur.postings(moteur.vocab.mot(int(mot_id)))
+        colonne = moteur.mat_TFxIDF_norm[:, mot_id].toarray().ravel()
+        assert docs.tolist() == np.flatnonzero(moteur.mat_TF[:, mot_id].toarray().ravel()).tolist()
+        assert np.allclose(poids, colonne[docs])
+    assert len(moteur.postings("motabsent")[0]) == 0
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+import os
+import numpy as np
+import pytest
+from Corpus import Corpus
+from SearchEngine import SearchEngine
+from CorpusSynthetique import GenerateurCorpus
+
+
+def _corpus(nb_docs=300):
+    corpus = Corpus("test")
+    corpus.add_documents(GenerateurCorpus(graine=1).iter_documents(nb_docs))
+    return corpus
+
+
+def _requete(moteur):
+    return moteur.vocab.mot(int(np.argmax(moteur.vocab.nb_documents)))
+
+
+def test_sauvegarde_dans_son_propre_dossier(tmp_path):
+    corpus = _corpus()
+    dossier = str(tmp_path / "index")
+    moteur = SearchEngine(corpus, scorer="bm25")
+    moteur.save(dossier)
+    charge = SearchEngine.load(dossier, corpus, scorer="bm25")
+    attendu = charge.search(_requete(charge), 10, dataframe=False)
+
+    charge.save(dossier) # tableaux projetés en mémoire depuis ce même dossier
+    recharge = SearchEngine.load(dossier, corpus, scorer="bm25")
+    obtenu = recharge.search(_requete(charge), 10, dataframe=False)
+    assert list(obtenu.doc_ids) == list(attendu.doc_ids)
+    assert np.allclose(obtenu.scores, attendu.scores)
+    assert sorted(os.listdir(tmp_path)) == ["index"]
+
+
+def test_charger_ou_construire_options_du_constructeur(tmp_path):
+    corpus = _corpus()
+    fichier = str(tmp_path / "corpus.tsv")
+    corpus.save(fichier)
+    dossier = str(tmp_path / "index")
+    construit = SearchEngine.charger_ou_construire(corpus, dossier, fichier, taille_cache=8, scorer="bm25")
+    charge = SearchEngine.charger_ou_construire(corpus, dossier, fichier, taille_cache=8, scorer="bm25")
+    assert charge.mat_TF.shape == construit.mat_TF.shape
+    assert np.allclose(charge.search(_requete(charge), 5, dataframe=False).scores,
+                       construit.search(_requete(charge), 5, dataframe=False).scores)
+
+
+def test_load_transmet_les_options(tmp_path):
+    corpus = _corpus()
+    fichier = str(tmp_path / "corpus.tsv")
+    corpus.save(fichier)
+    dossier = str(tmp_path / "index")
+    SearchEngine.charger_ou_construire(corpus, dossier, fichier)
+
+    charge = SearchEngine.charger_ou_construire(corpus, dossier, fichier, taille_cache=0, positions=True,
+                                                derive_max=0)
+    assert (charge.cache.taille_max, charge.positions, charge.derive_max) == (0, True, 0)
+    assert charge._nb_docs_positionnels == corpus.ndoc # index positionnel construit au chargement
+    mots = corpus.id2doc[0].texte.split()[:2]
+    assert 0 in charge.search(f'"{mots[0]} {mots[1]}"', 1000, dataframe=False).doc_ids
+    assert charge.stats_cache()["taille"] == 0
+
+    with pytest.raises(TypeError):
+        SearchEngine.load(dossier, corpus, option_inconnue=1)
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+import json
+import urllib.parse
+import pytest
+from Corpus import Corpus
+from DocumentFactory import DocumentFactory
+from Ingestion import Ingestion
+
+NB_REDDIT, NB_ARXIV = 23, 17
+
+
+def _page_reddit(requete):
+    apres, limite = int(requete.get("after", ["0"])[0]), int(requete["limit"][0])
+    fin = min(apres + limite, NB_REDDIT)
+    enfants = [{"data": {"title": f"post {i}", "selftext": f"texte du post {i}", "author": f"a{i % 3}",
+                         "created_utc": 1700000000 + i, "permalink": f"/r/x/{i}", "num_comments": i}}
+               for i in range(apres, fin)]
+    return json.dumps({"data": {"children": enfants, "after": str(fin) if fin < NB_REDDIT else None}}).encode()
+
+
+def _page_arxiv(requete):
+    debut, nb = int(requete["start"][0]), int(requete["max_results"][0])
+    entrees = "".join(f"<entry><id>http://arxiv/{i}</id><title>T{i}</title><published>2024-01-01T00:00:00Z"
+                      f"</published><summary>résumé assez long numéro {i}</summary>"
+                      f"<author><name>A{i}</name></author></entry>"
+                      for i in range(debut, min(debut + nb, NB_ARXIV)))
+    return (f'<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom" '
+            f'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+            f'<opensearch:totalResults>{NB_ARXIV}</opensearch:totalResults>{entrees}</feed>').encode()
+
+
+async def _fetch(url):
+    adresse = urllib.parse.urlparse(url)
+    requete = urllib.parse.parse_qs(adresse.query)
+    return _page_reddit(requete) if adresse.path == "/reddit" else _page_arxiv(requete)
+
+
+@pytest.mark.parametrize("reprise", [False, True])
+def test_point_de_reprise_ajoute_les_nouveaux_documents(tmp_path, monkeypatch, reprise):
+    fichier = str(tmp_path / "corpus.tsv")
+    corpus = Corpus("test")
+    if reprise:
+        # collecte reprise : le corpus a été chargé depuis le fichier
+        for i in range(3):
+            corpus.add(DocumentFactory.create_document("document", f"ancien {i}", "x", "2020-01-01", f"u{i}",
+                                                       "texte"))
+        corpus.save(fichier)
+        corpus = Corpus.load(fichier)
+
+    sauvegardes = []
+    save = Corpus.save
+    monkeypatch.setattr(Corpus, "save", lambda self, f, depuis=0: (sauvegardes.append(depuis),
+                                                                   save(self, f, depuis)))
+    ingestion = Ingestion(corpus, "test", NB_REDDIT, NB_ARXIV, fetch=_fetch, fichier_corpus=fichier,
+                          checkpoint=str(tmp_path / "etat.json"), intervalle_reddit=0, intervalle_arxiv=0,
+                          taille_page_reddit=5, taille_page_arxiv=4, url_reddit="http://local/reddit",
+                          url_arxiv="http://local/arxiv")
+    assert ingestion.lancer() == NB_REDDIT + NB_ARXIV
+
+    # un seul fichier écrit en entier (la première fois), puis des ajouts de documents toujours nouveaux
+    assert sauvegardes[0] == 0 and all(depuis > 0 for depuis in sauvegardes[1:])
+    assert sauvegardes[1:] == sorted(set(sauvegardes[1:]))
+    monkeypatch.undo()
+    relu = Corpus.load(fichier)
+    assert relu.ndoc == corpus.ndoc == NB_REDDIT + NB_ARXIV + 3 * reprise
+    assert [(d.titre, d.url, d.texte) for d in relu.id2doc.values()] == \
+        [(d.titre, d.url, d.texte) for d in corpus.id2doc.values()]
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+from Corpus import Corpus
+from SearchEngine import SearchEngine
+from CorpusSynthetique import GenerateurCorpus
+from Instrumentation import Instrumentation, Histogramme, instrumentation
+
+
+def test_histogramme_et_etapes():
+    histogramme = Histogramme()
+    for duree in (1e-6, 3e-6, 1e-3, 2e-3):
+        histogramme.ajouter(duree)
+    resume = histogramme.resume()
+    assert resume["nombre"] == 4 and resume["min_ms"] == 1e-3 and resume["max_ms"] == 2
+    # percentiles : borne haute du seau, jamais au-delà du maximum
+    assert 3e-6 <= histogramme.percentile(50) <= 4e-6 and histogramme.percentile(99) == 2e-3
+    assert Histogramme().resume() == {"nombre": 0}
+
+    instr = Instrumentation()
+    # désactivée : rien n'est mesuré, l'étape est l'objet vide partagé
+    assert instr.etape("a") is instr.etape("b")
+    with instr.etape("a"):
+        instr.compter("n")
+    assert instr.instantane() == {"etapes": {}, "compteurs": {}}
+
+    appels = []
+    instr.ajouter_crochet(lambda nom, duree: appels.append(nom))
+    instr.activer()
+    for _ in range(3):
+        with instr.etape("a"):
+            with instr.etape("a.b"):
+                instr.compter("n", 2)
+    mesures = instr.instantane()
+    assert {nom: h["nombre"] for nom, h in mesures["etapes"].items()} == {"a": 3, "a.b": 3}
+    assert mesures["compteurs"] == {"n": 6} and appels == ["a.b", "a"] * 3
+    assert "a.b" in instr.rapport()
+    instr.reinitialiser()
+    assert instr.instantane() == {"etapes": {}, "compteurs": {}}
+
+
+def test_trace_d_une_requete():
+    corpus = Corpus("test")
+    corpus.add_documents(GenerateurCorpus(nb_mots=300, graine=13).iter_documents(100))
+    moteur = SearchEngine(corpus, taille_cache=0)
+    assert not instrumentation.actif
+
+    # trace sans activer l'instrumentation : étapes de la requête imbriquées, registre global intact
+    with instrumentation.tracer() as trace:
+        moteur.search("the and", 5, dataframe=False)
+    etapes = {nom: profondeur for nom, _, _, profondeur in trace.etapes()}
+    assert trace.etapes()[0][0] == "search" and etapes["search"] == 0
+    assert etapes["search.top_k"] > 0 and "search.top_k" in repr(trace)
+    assert instrumentation.instantane() == {"etapes": {}, "compteurs": {}}
+
+    instrumentation.activer()
+    try:
+        moteur.search("the and", 5, dataframe=False)
+        mesures = instrumentation.instantane()
+        assert mesures["etapes"]["search"]["nombre"] == 1 and mesures["compteurs"]["search.requetes"] == 1
+    finally:
+        instrumentation.desactiver()
+        instrumentation.reinitialiser()
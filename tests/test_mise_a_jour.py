@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+from Corpus import Corpus
+from SearchEngine import SearchEngine
+from CorpusSynthetique import GenerateurCorpus
+from DocumentFactory import DocumentFactory
+from Instrumentation import instrumentation
+
+
+def _reordonne(complet, moteur):
+    # colonnes de la construction complète (vocabulaire trié) remises dans l'ordre des ids du moteur mis à jour
+    ordre = complet.vocab.ids(moteur.vocab.mots())
+    for nom in ("mat_TFxIDF", "mat_poids", "mat_poids_sans_stopwords", "index_inverse",
+                "index_inverse_sans_stopwords"):
+        setattr(complet, nom, getattr(complet, nom)[:, ordre])
+    for nom in ("poids_max", "poids_max_sans_stopwords"):
+        setattr(complet, nom, getattr(complet, nom)[ordre])
+    return complet
+
+
+def _identiques(moteur, reference):
+    # poids, index inversés et bornes max-score égaux à ceux d'une construction complète
+    for nom in ("mat_TFxIDF", "mat_poids", "mat_poids_sans_stopwords", "index_inverse",
+                "index_inverse_sans_stopwords"):
+        obtenu, attendu = getattr(moteur, nom), getattr(reference, nom)
+        assert obtenu.shape == attendu.shape, nom
+        assert np.allclose(obtenu.toarray(), attendu.toarray()), nom
+    assert np.array_equal(moteur.index_inverse.indptr, reference.index_inverse.indptr)
+    assert np.array_equal(moteur.index_inverse.indices, reference.index_inverse.indices)
+    assert np.allclose(moteur.poids_max, reference.poids_max)
+    assert np.allclose(moteur.poids_max_sans_stopwords, reference.poids_max_sans_stopwords)
+
+
+def _coherent(moteur):
+    # index inversés et bornes max-score égaux à ceux recalculés depuis les matrices de poids
+    for mat_poids, index_inverse, poids_max in (moteur._poids(False), moteur._poids(True)):
+        attendu = mat_poids.tocsc()
+        attendu.sort_indices()
+        assert np.array_equal(index_inverse.indptr, attendu.indptr)
+        assert np.array_equal(index_inverse.indices, attendu.indices)
+        assert np.array_equal(index_inverse.data, attendu.data)
+        assert np.allclose(poids_max, attendu.max(axis=0).toarray().ravel())
+
+
+@pytest.mark.parametrize("scorer", ["tfidf", "bm25"])
+def test_mise_a_jour_egale_construction_complete(scorer):
+    documents = list(GenerateurCorpus(graine=3).iter_documents(260))
+    documents.append(DocumentFactory.create_document("document", "t", "a", "2024-01-01", "u",
+                                                     "motinedit the of motinedit"))
+    corpus = Corpus("test")
+    corpus.add_documents(documents[:200])
+    moteur = SearchEngine(corpus, scorer=scorer)
+
+    # ajouts successifs : seuls les documents ajoutés sont tokenisés et comptés
+    instrumentation.activer()
+    try:
+        for debut, fin in ((200, 201), (201, 240), (240, len(documents))):
+            corpus.add_documents(documents[debut:fin])
+            instrumentation.reinitialiser()
+            moteur.mettre_a_jour()
+            assert instrumentation.compteurs["index.documents"] == fin - debut
+            _coherent(moteur)
+    finally:
+        instrumentation.desactiver()
+        instrumentation.reinitialiser()
+    corpus.set_liste_stopwords(["the", "of", "motinedit"])
+    moteur.mettre_a_jour()
+
+    reference = Corpus("reference")
+    reference.add_documents(documents)
+    reference.set_liste_stopwords(["the", "of", "motinedit"])
+    complet = SearchEngine(reference, scorer=scorer)
+    for requete in ("motinedit", "learning data", "the model"):
+        for stopwords in (False, True):
+            obtenu = moteur.search(requete, 10, dataframe=False, stopwords=stopwords)
+            attendu = complet.search(requete, 10, dataframe=False, stopwords=stopwords)
+            assert np.allclose(obtenu.scores, attendu.scores)
+    _identiques(moteur, _reordonne(complet, moteur))
+
+
+@pytest.mark.parametrize("scorer", ["tfidf", "bm25"])
+def test_petit_ajout_ne_repondere_pas_l_index(scorer):
+    documents = list(GenerateurCorpus(graine=5).iter_documents(240))
+    nouveau = DocumentFactory.create_document("document", "t", "a", "2024-01-01", "u", "motinedit learning")
+    corpus = Corpus("test")
+    corpus.add_documents(documents[:200])
+    moteur = SearchEngine(corpus, scorer=scorer)
+    avant = {nom: getattr(moteur, nom).copy() for nom in ("mat_TFxIDF", "mat_poids", "mat_poids_sans_stopwords")}
+    idf = moteur.idf.copy()
+
+    # quelques documents (moins de derive_max de l'index) : seules leurs lignes sont pondérées, avec l'IDF
+    # de l'index ; les valeurs des documents existants ne changent pas
+    corpus.add_documents(documents[200:210] + [nouveau])
+    moteur.mettre_a_jour()
+    for nom, mat in avant.items():
+        obtenue = getattr(moteur, nom)
+        assert obtenue.shape[0] == 211, nom
+        assert np.array_equal(obtenue.indptr[:201], mat.indptr), nom
+        assert np.array_equal(obtenue.indices[:mat.nnz], mat.indices), nom
+        assert np.array_equal(obtenue.data[:mat.nnz], mat.data), nom
+    assert np.array_equal(moteur.idf[:len(idf)], idf)
+    _coherent(moteur)
+    assert moteur.search("motinedit", 5, dataframe=False).doc_ids.tolist() == [210]
+
+    # au-delà de derive_max : tous les poids sont recalculés, comme par une construction complète
+    corpus.add_documents(documents[210:])
+    moteur.mettre_a_jour()
+    reference = Corpus("reference")
+    reference.add_documents(documents[:210] + [nouveau] + documents[210:])
+    _identiques(moteur, _reordonne(SearchEngine(reference, scorer=scorer), moteur))
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+from Corpus import Corpus
+from SearchEngine import SearchEngine
+from MoteurDistribue import MoteurDistribue
+from DocumentFactory import DocumentFactory
+from CorpusSynthetique import GenerateurCorpus
+
+
+def _document(texte, i=0):
+    return DocumentFactory.create_document("document", f"titre {i}", "auteur", "2024-01-01", f"u{i}", texte)
+
+
+def test_top_k_ex_aequo_departages_par_id():
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        docs = rng.permutation(200)
+        scores = rng.integers(0, 4, size=200).astype(float)
+        for k in (1, 5, 37, 199):
+            obtenus, _ = SearchEngine._top_k(docs, scores, k)
+            attendus = sorted((-s, d) for d, s in zip(docs, scores) if s > 0)[:k]
+            assert obtenus.tolist() == [d for _, d in attendus]
+
+
+@pytest.mark.parametrize("backend", ["index", "matrice"])
+def test_resultats_ex_aequo(backend):
+    corpus = Corpus("test")
+    corpus.add_documents(_document("machine learning", i) for i in range(40))
+    corpus.add(_document("autre chose", 40))
+    moteur = SearchEngine(corpus, backend=backend)
+    resultats = moteur.search("learning", 5, dataframe=False)
+    assert resultats.doc_ids.tolist() == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.parametrize("scorer", ["tfidf", "bm25"])
+def test_search_many_statistiques_globales(scorer):
+    premier, second = Corpus("premier"), Corpus("second")
+    premier.add_documents(_document(texte, i) for i, texte in enumerate(
+        ["machine learning model", "deep learning", "learning to rank", "machine vision"]))
+    second.add_documents(_document(texte, i) for i, texte in enumerate(
+        ["quantum computing", "learning quantum models", "graph neural network"]))
+    distribue = MoteurDistribue([premier, second], scorer=scorer)
+    distribue.search("learning") # statistiques fusionnées puis fixées dans chaque shard
+
+    requetes = ["learning", "machine learning quantum", "quantum graph", "deep deep learning", "inconnu"]
+    for moteur in distribue.shards.values():
+        assert moteur._statistiques_globales()
+        for requete, resultats in zip(requetes, moteur.search_many(requetes, k=3)):
+            attendus = moteur.search(requete, 3, dataframe=False)
+            assert resultats.doc_ids.tolist() == attendus.doc_ids.tolist()
+            assert np.allclose(resultats.scores, attendus.scores)
+
+
+def test_cache_et_index_dense():
+    corpus = Corpus("test")
+    corpus.add_documents(GenerateurCorpus(graine=4).iter_documents(300))
+    moteur = SearchEngine(corpus, backend="dense")
+    moteur.construire_dense(dimension=4, nb_candidats=5)
+    requete = moteur.vocab.mot(int(np.argmax(moteur.vocab.nb_documents)))
+    moteur.search(requete, 10, dataframe=False)
+
+    # nouvel index dense : le résultat en cache n'est plus servi
+    moteur.construire_dense(dimension=32, nb_candidats=50)
+    obtenus = moteur.search(requete, 10, dataframe=False)
+    assert moteur.stats_cache()["hits"] == 0
+    sans_cache = SearchEngine(corpus, backend="dense", taille_cache=0)
+    sans_cache.construire_dense(dimension=32, nb_candidats=50)
+    attendus = sans_cache.search(requete, 10, dataframe=False)
+    assert obtenus.doc_ids.tolist() == attendus.doc_ids.tolist()
+
+    # changement de backend : clé différente
+    moteur.backend = "index"
+    assert moteur.search(requete, 10, dataframe=False).doc_ids.tolist() == \
+        SearchEngine(corpus).search(requete, 10, dataframe=False).doc_ids.tolist()
+
+
+def test_near_enchaine():
+    corpus = Corpus("test")
+    corpus.add_documents(_document(texte, i) for i, texte in enumerate([
+        "alpha beta gamma",
+        "alpha beta x x x x gamma beta", # chaque paire est proche, mais pas avec la même occurrence de beta
+        "alpha x beta gamma",
+        "gamma delta",
+    ]))
+    moteur = SearchEngine(corpus)
+
+    def trouves(requete):
+        return sorted(moteur.search(requete, 10, dataframe=False).doc_ids.tolist())
+
+    assert trouves("alpha NEAR/1 beta") == [0, 1]
+    assert trouves("alpha NEAR/1 beta NEAR/1 gamma") == [0]
+    assert trouves("alpha NEAR/2 beta NEAR/1 gamma") == [0, 2]
+    assert trouves("alpha NEAR/2 beta NEAR/1 gamma NEAR/1 delta") == []
+    assert trouves("alpha NEAR/1 beta gamma NEAR/1 delta") == []
+    assert trouves("beta NEAR/1 gamma gamma NEAR/1 delta") == []
+    assert trouves("x NEAR/1 gamma NEAR/1 beta") == [1]
+
+
+@pytest.mark.parametrize("backend", ["index", "dense"])
+def test_search_many_egale_search_avec_operateurs(backend):
+    corpus = Corpus("test")
+    corpus.add_documents(DocumentFactory.create_document("document", f"titre {i}", f"a{i % 2}", "2024-01-01",
+                                                         f"u{i}", texte)
+                         for i, texte in enumerate([
+                             "neural network training",
+                             "network of neural cells",
+                             "deep neural network model",
+                             "training a network",
+                             "neural nets and networks",
+                             "a model for training neural networks",
+                             "cooking recipes",
+                         ]))
+    moteur = SearchEngine(corpus, backend=backend, taille_cache=0)
+
+    requetes = ['"neural network"', "neural NEAR/1 network", "netw*", '"neural network" training',
+                "training NEAR/3 neural net*", "neural", '"inconnu mot"']
+    for filtres in ({}, {"auteur": "a0"}):
+        for requete, resultats in zip(requetes, moteur.search_many(requetes, k=3, **filtres)):
+            attendus = moteur.search(requete, 3, dataframe=False, **filtres)
+            assert resultats.doc_ids.tolist() == attendus.doc_ids.tolist(), requete
+            assert np.allclose(resultats.scores, attendus.scores), requete
+    assert moteur.search_many(['"neural network"'])[0].doc_ids.tolist() == [0, 2]
+
+
+def test_backend_dense_garde_les_documents_de_score_nul():
+    corpus = Corpus("test")
+    corpus.add_documents(_document(texte, i) for i, texte in enumerate([
+        "neural nets", "neural nets training", "neural network", "network training", "cooking pasta",
+        "pasta sauce recipes", "tomato sauce"]))
+    moteur = SearchEngine(corpus, backend="dense", taille_cache=0)
+    moteur.construire_dense(dimension=2)
+    dense = moteur.search("nets", 10, dataframe=False)
+    moteur.backend = "index"
+    exact = moteur.search("nets", 10, dataframe=False)
+
+    # mêmes documents de score positif, puis (backend dense seulement) des documents sans le mot de la requête
+    assert exact.doc_ids.tolist() == [0, 1]
+    assert dense.doc_ids[:2].tolist() == [0, 1] and np.allclose(dense.scores[:2], exact.scores)
+    assert 2 in dense.doc_ids.tolist() and np.all(dense.scores[2:] == 0)
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+from collections import Counter
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix
+from Corpus import Corpus
+from SearchEngine import SearchEngine
+from CorpusSynthetique import GenerateurCorpus
+
+# mots du corpus synthétique (graine 8), stopwords compris
+REQUETES = ["the bxub", "and of nzpdycwy", "vrtdsqkfn vrtdsqkfn the", "bxub vrtdsqkfn motabsent"]
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    corpus = Corpus("test")
+    corpus.add_documents(GenerateurCorpus(nb_mots=500, graine=8).iter_documents(200))
+    return corpus
+
+
+def _comptes_requete(moteur, requete):
+    comptes = np.zeros(moteur.mat_TF.shape[1])
+    for mot_id in moteur._colonnes_requete(requete):
+        comptes[mot_id] += 1
+    return comptes
+
+
+def test_normes_precalculees_et_cosinus(corpus):
+    moteur = SearchEngine(corpus, backend="matrice", taille_cache=0)
+    assert moteur.mat_TFxIDF.format == moteur.mat_TFxIDF_norm.format == "csr"
+
+    # TF x IDF et normes calculées sur la matrice dense
+    tf = moteur.mat_TF.toarray().astype(float)
+    df = (tf > 0).sum(axis=0)
+    tfidf = tf * np.log(tf.shape[0] / np.maximum(df, 1))
+    normes = np.linalg.norm(tfidf, axis=1)
+    assert np.allclose(moteur.mat_TFxIDF.toarray(), tfidf)
+    assert np.allclose(moteur.normes_docs, np.where(normes > 0, normes, 1))
+    assert np.allclose(np.linalg.norm(moteur.mat_TFxIDF_norm.toarray(), axis=1)[normes > 0], 1)
+
+    for requete in REQUETES:
+        comptes = _comptes_requete(moteur, requete)
+        requete_idf = comptes * moteur.idf
+        attendus = tfidf @ requete_idf / (np.where(normes > 0, normes, 1) * np.linalg.norm(requete_idf))
+        vecteur = csr_matrix(requete_idf)
+        assert np.allclose(moteur._similarite_cosinus(vecteur, moteur.mat_TFxIDF), attendus)
+        # autre matrice : normes calculées à la demande
+        assert np.allclose(moteur._similarite_cosinus(vecteur, csr_matrix(tfidf)), attendus)
+
+
+@pytest.mark.parametrize("k1, b", [(None, None), (1.2, 0.5)])
+def test_bm25_egal_formule(corpus, k1, b):
+    moteur = SearchEngine(corpus, scorer="bm25", k1=k1, b=b, taille_cache=0)
+    k1, b = k1 or 1.5, 0.75 if b is None else b
+    documents = [Counter(corpus.tokeniser(corpus.id2doc[i].texte)) for i in range(corpus.ndoc)]
+    longueurs = np.array([sum(tf.values()) for tf in documents])
+    df = Counter(mot for tf in documents for mot in tf)
+    nb_docs, avgdl = len(documents), longueurs.mean()
+
+    for requete in REQUETES:
+        scores = np.zeros(nb_docs)
+        for mot in corpus.tokeniser(requete):
+            idf = np.log((nb_docs - df[mot] + 0.5) / (df[mot] + 0.5) + 1)
+            f = np.array([tf[mot] for tf in documents], dtype=float)
+            scores += idf * f * (k1 + 1) / (f + k1 * (1 - b + b * longueurs / avgdl))
+        attendus = np.sort(scores[scores > 0])[::-1][:10]
+        for backend in ("index", "matrice"):
+            moteur.backend = backend
+            assert np.allclose(moteur.search(requete, 10, dataframe=False).scores, attendus), (requete, backend)
+        assert np.allclose(moteur.search_many([requete], k=10)[0].scores, attendus)
+
+
+def test_scoreur_par_defaut_tfidf(corpus, tmp_path):
+    moteur = SearchEngine(corpus)
+    tfidf = SearchEngine(corpus, scorer="tfidf")
+    assert moteur.mat_poids is moteur.mat_TFxIDF_norm
+    for requete in REQUETES:
+        assert np.allclose(moteur.search(requete, 10, dataframe=False).scores,
+                           tfidf.search(requete, 10, dataframe=False).scores)
+
+    # un index sauvegardé ne se recharge qu'avec son scoreur et ses paramètres
+    bm25 = SearchEngine(corpus, scorer="bm25", k1=1.2)
+    bm25.save(str(tmp_path / "index"))
+    SearchEngine.load(str(tmp_path / "index"), corpus, scorer="bm25", k1=1.2)
+    for options in ({}, {"scorer": "bm25"}):
+        with pytest.raises(ValueError):
+            SearchEngine.load(str(tmp_path / "index"), corpus, **options)
+    with pytest.raises(ValueError):
+        SearchEngine(corpus, scorer="inconnu")
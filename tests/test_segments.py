@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+from datetime import datetime
+from Corpus import Corpus
+from SearchEngine import SearchEngine
+from DocumentFactory import DocumentFactory
+
+
+def _documents(debut, fin):
+    documents = [
+        DocumentFactory.create_document("reddit", "t\tab", "zz", datetime(2024, 1, 2, 3, 4, 5), "u",
+                                        "x\ty\nz é 😀", num_comments=42),
+        DocumentFactory.create_document("arxiv", "p", "Alice", "2023-05-06", "http://a", "abc",
+                                        co_auteurs=["Bob", "Chloé"]),
+    ] + [DocumentFactory.create_document("document", f"titre {i}", f"a{i % 3}", f"2024-01-{i % 28 + 1:02d}",
+                                         f"u{i}", f"texte numéro {i}") for i in range(20)]
+    return documents[debut:fin]
+
+
+def _champs(corpus):
+    return [(doc.titre, doc.auteur, doc.date, doc.url, doc.texte, doc.getType(),
+             getattr(doc, "num_comments", None), getattr(doc, "co_auteurs", None))
+            for doc in corpus.id2doc.values()]
+
+
+def test_segments_ajout_et_compaction(tmp_path):
+    dossier = str(tmp_path / "segments")
+    corpus = Corpus("test")
+    corpus.add_documents(_documents(0, 10))
+    premier = corpus.save_segment(dossier)
+    assert premier is not None and corpus.save_segment(dossier) is None # rien de nouveau
+
+    # ajout : seuls les nouveaux documents vont dans un second segment
+    corpus.add_documents(_documents(10, 22))
+    second = corpus.save_segment(dossier)
+    assert sorted(os.listdir(dossier)) == [os.path.basename(premier), os.path.basename(second)]
+    relu = Corpus.load_segment(dossier)
+    assert _champs(relu) == _champs(corpus)
+    assert relu.ndoc == corpus.ndoc and relu.naut == corpus.naut
+    assert list(relu.authors["Alice"].doc_ids) == list(corpus.authors["Alice"].doc_ids)
+
+    # compaction : un seul segment, même contenu ; le corpus déjà ouvert reste lisible
+    anciens = str(tmp_path / "anciens")
+    shutil.copytree(dossier, anciens)
+    fusionne = Corpus.compacter_segments(dossier)
+    assert os.listdir(dossier) == [os.path.basename(fusionne)]
+    assert _champs(relu) == _champs(corpus)
+    compacte = Corpus.load_segment(dossier)
+    assert _champs(compacte) == _champs(corpus)
+    assert SearchEngine(compacte).search("numéro 7", 3, dataframe=False).doc_ids.tolist() == \
+        SearchEngine(corpus).search("numéro 7", 3, dataframe=False).doc_ids.tolist()
+
+    # compaction interrompue avant la suppression des anciens segments : ils sont ignorés
+    for nom in os.listdir(anciens):
+        shutil.copy(os.path.join(anciens, nom), dossier)
+    assert _champs(Corpus.load_segment(dossier)) == _champs(corpus)
+    Corpus.compacter_segments(dossier)
+    assert os.listdir(dossier) == [os.path.basename(fusionne)]
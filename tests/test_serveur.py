@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import threading
+import time
+import urllib.request
+from Corpus import Corpus
+from SearchEngine import SearchEngine
+from CorpusSynthetique import GenerateurCorpus
+from DocumentFactory import DocumentFactory
+from Serveur import ServeurRecherche
+
+
+def _get(port, chemin, methode="GET"):
+    requete = urllib.request.Request(f"http://127.0.0.1:{port}{chemin}", method=methode,
+                                     data=b"" if methode == "POST" else None)
+    with urllib.request.urlopen(requete, timeout=30) as reponse:
+        return reponse.status, json.loads(reponse.read())
+
+
+def test_recherche_et_remplacement_de_l_instantane():
+    corpus = Corpus("test")
+    corpus.add_documents(GenerateurCorpus(nb_mots=300, graine=12).iter_documents(200))
+    serveur = ServeurRecherche(corpus, taille_cache=0)
+    boucle = asyncio.new_event_loop()
+    ecoute = boucle.run_until_complete(serveur.demarrer("127.0.0.1", 0))
+    port = ecoute.sockets[0].getsockname()[1]
+    threading.Thread(target=boucle.run_forever, daemon=True).start()
+    try:
+        # mêmes résultats qu'une recherche directe, filtres compris
+        statut, reponse = _get(port, "/search?q=the+and&k=3&type_doc=Arxiv")
+        attendus = SearchEngine(corpus, taille_cache=0).search("the and", 3, dataframe=False, type_doc="Arxiv")
+        assert statut == 200 and reponse["instantane"] == 1
+        assert [r["doc_id"] for r in reponse["resultats"]] == attendus.doc_ids.tolist()
+        assert all(r["type"] == "Arxiv" for r in reponse["resultats"])
+
+        # nouveau document : invisible jusqu'à la reconstruction, puis servi par le nouvel instantané
+        corpus.add(DocumentFactory.create_document("document", "nouveau", "a", "2024-01-01", "u", "motinedit"))
+        assert _get(port, "/search?q=motinedit")[1]["resultats"] == []
+        assert _get(port, "/reconstruire", "POST")[0] == 202
+        for _ in range(300):
+            stats = _get(port, "/stats")[1]
+            if stats["taches"]["en_attente"] == 0:
+                break
+            time.sleep(0.1)
+        assert stats["instantane"] == 2 and stats["nb_docs_index"] == corpus.ndoc
+        assert stats["taches"]["derniere"] == "reconstruire" and stats["taches"]["derniere_erreur"] is None
+        reponse = _get(port, "/search?q=motinedit")[1]
+        assert reponse["instantane"] == 2 and [r["doc_id"] for r in reponse["resultats"]] == [corpus.ndoc - 1]
+    finally:
+        boucle.call_soon_threadsafe(ecoute.close)
+        boucle.call_soon_threadsafe(boucle.stop)
+        serveur.fermer()
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+import warnings
+from datetime import datetime
+import pytest
+from Corpus import Corpus
+from DocumentFactory import DocumentFactory
+from StockDocuments import StockDocuments, NAT, _timestamp
+
+
+def _doc(date, texte="un texte", num_comments=0):
+    doc = DocumentFactory.create_document("reddit", "titre", "auteur", date, "url", texte)
+    doc.num_comments = num_comments
+    return doc
+
+
+@pytest.mark.parametrize("date", ["inconnue", "", None, float("nan"), datetime(1, 1, 1), datetime(9999, 12, 31)])
+def test_date_invalide_ou_hors_plage(date):
+    assert _timestamp(date) == NAT
+
+
+def test_date_valide():
+    assert _timestamp("2020-01-01") == _timestamp(datetime(2020, 1, 1)) == 1577836800 * 10**9
+
+
+@pytest.mark.parametrize("date", ["Wed, 01 Jan 2020 01:00:00 +0100", "Wed, 01 Jan 2020 00:00:00 GMT",
+                                  "01/01/2020", "2020-01-01T00:00:00Z", "January 1, 2020"])
+def test_date_autres_formats(date):
+    # formats non ISO (RSS, API) analysés par pandas, sans avertissement
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert _timestamp(date) == 1577836800 * 10**9
+
+
+def test_ajout_apres_date_invalide():
+    corpus = Corpus("test")
+    assert corpus.add(_doc("inconnue")) == 0
+    assert corpus.add(_doc(datetime(1, 1, 1), num_comments=10**30)) == 1
+    assert corpus.add(_doc("2021-05-06 07:08:09")) == 2
+    assert corpus.id2doc[0].date is None and corpus.id2doc[1].date is None
+    assert corpus.id2doc[1].num_comments == 0
+    assert corpus.id2doc[2].date == datetime(2021, 5, 6, 7, 8, 9)
+
+
+def test_erreur_a_l_ajout_ne_desaligne_pas_les_colonnes():
+    stock = StockDocuments()
+    with pytest.raises(UnicodeEncodeError):
+        stock.ajouter(_doc("2020-01-01", texte="\ud800"))
+    assert len(stock) == 0 and len(stock.auteurs) == len(stock.dates) == len(stock.textes.fins) == 0
+    stock[0] = _doc("2020-01-01")
+    assert stock[0].texte == "un texte"
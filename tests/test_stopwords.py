@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+from Corpus import Corpus
+from SearchEngine import SearchEngine
+from CorpusSynthetique import GenerateurCorpus
+from DocumentFactory import DocumentFactory
+
+REQUETES = ["the bxub", "and of nzpdycwy the", "vrtdsqkfn bxub"]
+
+
+def _corpus(documents):
+    corpus = Corpus("test")
+    corpus.add_documents(documents)
+    return corpus
+
+
+@pytest.fixture(scope="module")
+def documents():
+    return list(GenerateurCorpus(nb_mots=500, graine=8).iter_documents(200))
+
+
+@pytest.mark.parametrize("scorer", ["tfidf", "bm25"])
+def test_reglage_stopwords_egal_moteur_sans_stopwords(documents, scorer):
+    corpus = _corpus(documents)
+    moteur = SearchEngine(corpus, scorer=scorer, taille_cache=0)
+    # référence : mêmes documents, textes déjà nettoyés de leurs stopwords
+    sans = _corpus(DocumentFactory.create_document("document", d.titre, d.auteur, d.date, d.url,
+                                                   corpus.nettoyer_texte(d.texte, remove_stopwords=True))
+                   for d in documents)
+    reference = SearchEngine(sans, scorer=scorer, taille_cache=0)
+    for requete in REQUETES:
+        attendu = reference.search(corpus.nettoyer_texte(requete, True), 10, dataframe=False)
+        for backend in ("index", "matrice"):
+            moteur.backend = backend
+            obtenu = moteur.search(requete, 10, dataframe=False, stopwords=True)
+            assert np.allclose(obtenu.scores, attendu.scores), (requete, backend)
+            assert obtenu.doc_ids.tolist() == attendu.doc_ids.tolist()
+        # réglage du corpus par défaut, identique au paramètre de la requête
+        corpus.set_stopwords(True)
+        assert moteur.search(requete, 10, dataframe=False).doc_ids.tolist() == attendu.doc_ids.tolist()
+        corpus.set_stopwords(False)
+        assert moteur.search(requete, 10, dataframe=False).doc_ids.tolist() == \
+            moteur.search(requete, 10, dataframe=False, stopwords=False).doc_ids.tolist()
+
+
+def test_nouvelle_liste_de_stopwords(documents):
+    corpus = _corpus(documents)
+    moteur = SearchEngine(corpus, taille_cache=0)
+    avant = moteur.search("bxub vrtdsqkfn", 10, dataframe=False, stopwords=True)
+    # "bxub" devient un stopword : ignoré par le réglage sans stopwords, sans re-tokenisation
+    corpus.set_liste_stopwords(set(corpus.stopwords) | {"bxub"})
+    obtenu = moteur.search("bxub vrtdsqkfn", 10, dataframe=False, stopwords=True)
+    attendu = SearchEngine(corpus, taille_cache=0).search("vrtdsqkfn", 10, dataframe=False, stopwords=True)
+    assert obtenu.doc_ids.tolist() == attendu.doc_ids.tolist() and np.allclose(obtenu.scores, attendu.scores)
+    assert obtenu.doc_ids.tolist() != avant.doc_ids.tolist()
+    # le réglage avec stopwords garde le mot
+    assert len(moteur.search("bxub", 10, dataframe=False, stopwords=False)) > 0
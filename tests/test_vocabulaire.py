@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from Vocabulaire import Vocabulaire
+
+
+def _mots(hasard, nombre):
+    lettres = np.array(list("abcdeéfghij"))
+    return ["".join(hasard.choice(lettres, size=hasard.integers(1, 7))) for _ in range(nombre)]
+
+
+def test_ajouts_incrementaux():
+    hasard = np.random.default_rng(0)
+    vocab = Vocabulaire()
+    connus = {}
+    for _ in range(30):
+        lot = _mots(hasard, 50)
+        ids = vocab.ajouter(lot)
+        for mot, mot_id in zip(lot, ids.tolist()):
+            assert connus.setdefault(mot, mot_id) == mot_id
+    assert vocab.mots() == sorted(connus, key=connus.get)
+    assert [vocab.mot(i) for i in vocab.tri()] == sorted(connus, key=lambda mot: mot.encode("utf-8"))
+    assert all(vocab.id(mot) == mot_id for mot, mot_id in connus.items())
+    attendus = sorted((m for m in connus if m.startswith("ab")), key=lambda mot: mot.encode("utf-8"))
+    assert [vocab.mot(i) for i in vocab.prefixe("ab")] == attendus
+
+
+def test_tri_puis_ajout():
+    vocab = Vocabulaire()
+    vocab.ajouter(["zeta", "alpha", "mu"])
+    ancien = vocab.trier()
+    assert vocab.mots() == ["alpha", "mu", "zeta"] and list(ancien) == [1, 2, 0]
+    assert list(vocab.ajouter(["beta", "mu"])) == [3, 1]
+    assert [vocab.mot(i) for i in vocab.tri()] == ["alpha", "beta", "mu", "zeta"]
+    copie = Vocabulaire.depuis_buffer(vocab.buffer(), tri=vocab.tri())
+    assert copie.mots() == vocab.mots() and copie.id("beta") == 3
+    copie.ajouter(["gamma"])
+    assert copie.id("gamma") == 4 and vocab.id("gamma") == -1